@@ -0,0 +1,81 @@
+"""Image pipeline benchmarks; run through benchmarks/run.py."""
+import argparse
+import os
+
+from common import BENCH_METADATA, copy_to_temp, emit, install_bench_keyring, log, measure, use_pipeline
+
+use_pipeline("image")
+
+import cv2  # noqa: E402
+
+from canonicalization.pipeline import canonicalize  # noqa: E402
+from corpus import IMAGE_SIZES, QUICK_IMAGE_SIZES, still_path  # noqa: E402
+from hashing.combine import create_message  # noqa: E402
+from hashing.crypto_hash import sha256_hash  # noqa: E402
+from signing.sign import sign_message, signing_key_id  # noqa: E402
+from storage.metadata_embed import embed_metadata, extract_metadata  # noqa: E402
+from utils.constants import CANONICAL_PROFILE, CANONICAL_PROFILE_NORMALIZE_FIRST  # noqa: E402
+from verify.verify_image import verify_image  # noqa: E402
+
+def bench_still(width, height, repeat):
+    """Time every capture and verify stage on one synthetic still."""
+    results = {}
+    label = f"image/{width}x{height}"
+    path = still_path(width, height)
+    cheap = repeat * 10
+
+    img = cv2.imread(path)
+    results[f"{label}/decode"] = measure(lambda: cv2.imread(path), repeat)
+    results[f"{label}/canonicalize"] = measure(lambda: canonicalize(img, CANONICAL_PROFILE), repeat)
+    results[f"{label}/canonicalize_normalize_first"] = measure(
+        lambda: canonicalize(img, CANONICAL_PROFILE_NORMALIZE_FIRST), repeat
+    )
+
+    canon = canonicalize(img, CANONICAL_PROFILE)
+    results[f"{label}/sha256_hash"] = measure(lambda: sha256_hash(canon.tobytes()), cheap)
+    hash_val = sha256_hash(canon.tobytes())
+
+    key_id = signing_key_id()
+    canonical = {"profile": CANONICAL_PROFILE}
+    results[f"{label}/create_message"] = measure(
+        lambda: create_message(hash_val, BENCH_METADATA, canonical, key_id=key_id), cheap
+    )
+    message = create_message(hash_val, BENCH_METADATA, canonical, key_id=key_id)
+    results[f"{label}/sign_message"] = measure(lambda: sign_message(message), cheap)
+    signature = sign_message(message)
+
+    copies = []
+
+    def fresh_copy():
+        copies.append(copy_to_temp(path))
+        return copies[-1]
+
+    results[f"{label}/embed_metadata"] = measure(
+        lambda p: embed_metadata(p, hash_val, signature, message), repeat, setup=fresh_copy
+    )
+
+    signed_path = fresh_copy()
+    embed_metadata(signed_path, hash_val, signature, message)
+    results[f"{label}/extract_metadata"] = measure(lambda: extract_metadata(signed_path), cheap)
+    results[f"{label}/verify"] = measure(lambda: verify_image(signed_path), repeat)
+
+    valid, reason = verify_image(signed_path)
+    if not valid:
+        raise RuntimeError(f"Benchmark still failed verification: {reason}")
+
+    for copy in copies:
+        os.remove(copy)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    install_bench_keyring()
+    results = {}
+    for width, height in (QUICK_IMAGE_SIZES if args.quick else IMAGE_SIZES):
+        log(f"image {width}x{height}")
+        results.update(bench_still(width, height, args.repeat))
+    emit(results)
@@ -0,0 +1,95 @@
+"""Video pipeline benchmarks; run through benchmarks/run.py."""
+import argparse
+import os
+
+from common import BENCH_METADATA, copy_to_temp, emit, install_bench_keyring, log, measure, use_pipeline
+
+use_pipeline("video")
+
+from canonicalization.ffmpeg_source import find_ffmpeg  # noqa: E402
+from canonicalization.process_video import canonical_params, process_video_file  # noqa: E402
+from capture.camera import record  # noqa: E402
+from capture.sources import SyntheticSource  # noqa: E402
+from corpus import QUICK_VIDEO_SPECS, VIDEO_SPECS, clip_path  # noqa: E402
+from hashing.combine import create_message  # noqa: E402
+from hashing.crypto_hash import sha256_hash  # noqa: E402
+from signing.sign import sign_message, signing_key_id  # noqa: E402
+from storage.metadata_embed import embed_metadata, extract_metadata  # noqa: E402
+from utils.constants import CANONICAL_PROFILE, CANONICAL_PROFILE_DECODER_SCALE, CAPTURE_FOURCC  # noqa: E402
+from verify.verify_video import verify_video  # noqa: E402
+
+try:
+    find_ffmpeg()
+    HAS_FFMPEG = True
+except ValueError:
+    HAS_FFMPEG = False
+
+def bench_clip(width, height, fps, seconds, repeat):
+    """Time every capture and verify stage on one synthetic clip."""
+    results = {}
+    label = f"video/{width}x{height}@{fps}x{seconds}s"
+    path = clip_path(width, height, fps, seconds)
+    cheap = repeat * 10
+
+    def record_clip(output_path):
+        source = SyntheticSource(width, height, fps, realtime=False, max_frames=fps * seconds)
+        record(source, output_path, None, CAPTURE_FOURCC, drop_when_full=False, progress=False)
+
+    copies = []
+
+    def temp_output():
+        copies.append(copy_to_temp(path))
+        return copies[-1]
+
+    results[f"{label}/capture_record"] = measure(record_clip, repeat, setup=temp_output)
+
+    canonical = canonical_params(None, CANONICAL_PROFILE)
+    results[f"{label}/process_video_file"] = measure(lambda: process_video_file(path, canonical), repeat)
+    results[f"{label}/process_video_file_legacy"] = measure(lambda: process_video_file(path), repeat)
+    if HAS_FFMPEG:
+        decoder_scale = canonical_params(None, CANONICAL_PROFILE_DECODER_SCALE)
+        results[f"{label}/process_video_file_ffmpeg"] = measure(
+            lambda: process_video_file(path, decoder_scale), repeat
+        )
+
+    combined = process_video_file(path, canonical)
+    results[f"{label}/sha256_hash"] = measure(lambda: sha256_hash(combined.tobytes()), cheap)
+    hash_val = sha256_hash(combined.tobytes())
+
+    key_id = signing_key_id()
+    results[f"{label}/create_message"] = measure(
+        lambda: create_message(hash_val, BENCH_METADATA, canonical, key_id=key_id), cheap
+    )
+    message = create_message(hash_val, BENCH_METADATA, canonical, key_id=key_id)
+    results[f"{label}/sign_message"] = measure(lambda: sign_message(message), cheap)
+    signature = sign_message(message)
+
+    results[f"{label}/embed_metadata"] = measure(
+        lambda p: embed_metadata(p, hash_val, signature, message), repeat, setup=temp_output
+    )
+
+    signed_path = temp_output()
+    embed_metadata(signed_path, hash_val, signature, message)
+    results[f"{label}/extract_metadata"] = measure(lambda: extract_metadata(signed_path), cheap)
+    results[f"{label}/verify"] = measure(lambda: verify_video(signed_path), repeat)
+
+    valid, reason = verify_video(signed_path)
+    if not valid:
+        raise RuntimeError(f"Benchmark clip failed verification: {reason}")
+
+    for copy in copies:
+        os.remove(copy)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    install_bench_keyring()
+    results = {}
+    for width, height, fps, seconds in (QUICK_VIDEO_SPECS if args.quick else VIDEO_SPECS):
+        log(f"video {width}x{height} {fps}fps {seconds}s")
+        results.update(bench_clip(width, height, fps, seconds, args.repeat))
+    emit(results)
@@ -0,0 +1,110 @@
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACK_ROOT = os.path.dirname(BENCH_DIR)
+
+# Synthetic corpus is generated here once and reused by later runs
+CORPUS_DIR = os.path.join(tempfile.gettempdir(), "trueshot_bench_corpus")
+
+# Fixed metadata so signed messages are identical between runs
+BENCH_METADATA = {"timestamp": 0, "platform": "bench", "platform_version": "0"}
+
+def use_pipeline(name):
+    """Put a pipeline root (image or video) first on sys.path."""
+    sys.path.insert(0, os.path.join(BACK_ROOT, name))
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+def install_bench_keyring():
+    """
+    Generate a throwaway Ed25519 key pair and make it the process-wide
+    keyring, so benchmarks never touch (or need) the real keys.
+
+    Returns:
+        Temporary directory holding the keys
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    import signing.keyring as keyring
+
+    key_dir = tempfile.mkdtemp(prefix="trueshot_bench_keys_")
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    with open(os.path.join(key_dir, "private_key.pem"), "wb") as f:
+        f.write(private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    with open(os.path.join(key_dir, "public_key.pem"), "wb") as f:
+        f.write(private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ))
+
+    keyring._default_keyring = keyring.KeyRing(
+        os.path.join(key_dir, "private_key.pem"),
+        os.path.join(key_dir, "public_key.pem"),
+        trusted_dir=None
+    )
+
+    # Sign locally even if a signing daemon happens to be running
+    import signing.daemon_client as daemon_client
+    daemon_client.SIGNING_SOCKET_PATH = os.path.join(key_dir, "no-daemon.sock")
+    return key_dir
+
+def measure(fn, repeat, setup=None):
+    """
+    Time fn() `repeat` times after one warm-up call.
+
+    Args:
+        fn: Callable to time; receives setup()'s result if setup is given
+        repeat: Timed runs
+        setup: Optional untimed callable run before every call
+
+    Returns:
+        Dict with median_ms, min_ms, max_ms and runs
+    """
+    samples = []
+    for i in range(repeat + 1):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        elapsed = time.perf_counter() - start
+        if i:
+            samples.append(elapsed * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "runs": repeat
+    }
+
+def copy_to_temp(path):
+    """Fresh copy of a corpus file (for stages that modify the file)."""
+    fd, temp_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1], prefix="trueshot_bench_")
+    os.close(fd)
+    shutil.copyfile(path, temp_path)
+    return temp_path
+
+def environment():
+    import cv2
+    import numpy as np
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "opencv_threads": cv2.getNumThreads(),
+        "numpy": np.__version__,
+    }
+
+def emit(results):
+    """Write results as JSON on stdout for run.py."""
+    json.dump(results, sys.stdout, sort_keys=True)
+    sys.stdout.write("\n")
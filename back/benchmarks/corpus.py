@@ -0,0 +1,51 @@
+import os
+
+import cv2
+import numpy as np
+
+from common import CORPUS_DIR, log
+
+# (width, height) of synthetic stills
+IMAGE_SIZES = [(640, 480), (1920, 1080), (4000, 3000)]
+QUICK_IMAGE_SIZES = [(640, 480), (1920, 1080)]
+
+# (width, height, fps, seconds) of synthetic clips
+VIDEO_SPECS = [(640, 480, 30, 2), (1280, 720, 30, 3), (1920, 1080, 60, 2)]
+QUICK_VIDEO_SPECS = [(640, 480, 30, 2)]
+
+def synthetic_frame(width, height, index, seed=0):
+    """
+    Deterministic test frame: a moving gradient plus seeded noise, with a
+    brightness range that leaves the luminance stretch real work to do.
+    """
+    rng = np.random.default_rng(seed * 100003 + index)
+    x = np.linspace(40, 200, width, dtype=np.float32)
+    y = np.linspace(0, 30, height, dtype=np.float32)[:, None]
+    base = np.roll(x, index * 8)[None, :] + y
+    frame = np.repeat(base[:, :, None], 3, axis=2)
+    frame[:, :, 0] *= 0.8
+    frame += rng.normal(0, 6, frame.shape).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+def still_path(width, height):
+    """Generate (once) and return a synthetic PNG still."""
+    path = os.path.join(CORPUS_DIR, f"still_{width}x{height}.png")
+    if not os.path.exists(path):
+        os.makedirs(CORPUS_DIR, exist_ok=True)
+        log(f"generating {path}")
+        cv2.imwrite(path, synthetic_frame(width, height, 0))
+    return path
+
+def clip_path(width, height, fps, seconds, fourcc="mp4v"):
+    """Generate (once) and return a synthetic MP4 clip."""
+    path = os.path.join(CORPUS_DIR, f"clip_{width}x{height}_{fps}fps_{seconds}s_{fourcc}.mp4")
+    if not os.path.exists(path):
+        os.makedirs(CORPUS_DIR, exist_ok=True)
+        log(f"generating {path}")
+        temp_path = path + ".tmp.mp4"
+        out = cv2.VideoWriter(temp_path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+        for i in range(fps * seconds):
+            out.write(synthetic_frame(width, height, i))
+        out.release()
+        os.replace(temp_path, path)
+    return path
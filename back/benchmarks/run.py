@@ -0,0 +1,121 @@
+"""
+Run the TrueShot benchmark suite and compare it against a stored baseline.
+
+Examples (from back/):
+    python benchmarks/run.py --output benchmarks/results/latest.json
+    python benchmarks/run.py --save-baseline benchmarks/baselines/my-machine.json
+    python benchmarks/run.py --baseline benchmarks/baselines/my-machine.json --threshold 0.15
+"""
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+
+from common import BENCH_DIR, CORPUS_DIR, environment, log
+
+SUITES = {
+    "image": os.path.join(BENCH_DIR, "bench_image.py"),
+    "video": os.path.join(BENCH_DIR, "bench_video.py"),
+}
+
+# A stage regresses when its fastest run (least sensitive to noise from
+# other processes) is this much slower than the baseline's...
+DEFAULT_THRESHOLD = 0.20
+# ...and at least this many milliseconds slower (ignores timer noise on tiny stages)
+DEFAULT_MIN_DELTA_MS = 0.05
+
+def run_suite(name, args):
+    """Run one suite in its own interpreter (the pipelines share module names)."""
+    command = [sys.executable, SUITES[name]]
+    if args.quick:
+        command.append("--quick")
+    if args.repeat:
+        command += ["--repeat", str(args.repeat)]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output)
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Compare each stage's fastest run with the baseline's.
+
+    Returns:
+        List of (stage, baseline_ms, current_ms, ratio, regressed) for
+        stages present in both
+    """
+    rows = []
+    for stage, current in sorted(results.items()):
+        base = baseline.get(stage)
+        if base is None:
+            continue
+        base_ms, cur_ms = base["min_ms"], current["min_ms"]
+        ratio = cur_ms / base_ms if base_ms > 0 else float("inf")
+        regressed = ratio > 1 + threshold and cur_ms - base_ms > min_delta_ms
+        rows.append((stage, base_ms, cur_ms, ratio, regressed))
+    return rows
+
+def write_json(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="TrueShot benchmark suite")
+    parser.add_argument("--suite", choices=sorted(SUITES), action="append", help="Suite(s) to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="Smaller corpus for a fast check")
+    parser.add_argument("--repeat", type=int, default=None, help="Timed runs per stage")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write the results as a baseline here")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.suite or sorted(SUITES):
+        log(f"== {name} suite (corpus: {CORPUS_DIR})")
+        results.update(run_suite(name, args))
+
+    report = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "quick": args.quick,
+        "results": results,
+    }
+
+    for stage, timing in sorted(results.items()):
+        print(f"{stage:<60} {timing['median_ms']:>10.3f} ms  (min {timing['min_ms']:.3f})")
+
+    if args.output:
+        write_json(args.output, report)
+    if args.save_baseline:
+        write_json(args.save_baseline, report)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != report["environment"]:
+        print("\n⚠️  Baseline was recorded in a different environment; differences may not be regressions")
+    rows = compare(results, baseline["results"], args.threshold, args.min_delta_ms)
+    regressions = [row for row in rows if row[4]]
+
+    print(f"\nCompared {len(rows)} stages with {args.baseline} (threshold +{args.threshold:.0%})")
+    for stage, base_ms, cur_ms, ratio, regressed in rows:
+        if regressed or ratio < 1 - args.threshold:
+            marker = "REGRESSION" if regressed else "faster"
+            print(f"  {marker:<10} {stage:<60} {base_ms:.3f} -> {cur_ms:.3f} ms ({ratio:.2f}x)")
+
+    if regressions:
+        print(f"❌ {len(regressions)} stage(s) regressed")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import runpy
+import sys
+
+BACK_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# The image and video pipelines use the same top-level package names, so
+# only the pipeline a command needs is put on sys.path (and imported)
+PIPELINE_ROOTS = {
+    "image": os.path.join(BACK_ROOT, "image"),
+    "video": os.path.join(BACK_ROOT, "video"),
+}
+
+EXIT_VALID = 0
+EXIT_INVALID = 1
+
+def _use_pipeline(kind, args):
+    sys.path.insert(0, PIPELINE_ROOTS[kind])
+    if args.metrics:
+        from utils import metrics
+        metrics.enable(memory=args.metrics_memory, log=args.metrics_log)
+
+def _print_metrics(args):
+    if not args.metrics:
+        return
+    from utils import metrics
+    if args.metrics == "prometheus":
+        print(metrics.prometheus_text(), end="", file=sys.stderr)
+    else:
+        print(json.dumps(metrics.snapshot(), indent=2, sort_keys=True), file=sys.stderr)
+
+def cmd_verify(args):
+    """Verify one image or video; the exit code is 0 only if it is authentic."""
+    path = os.path.abspath(args.path)
+    _use_pipeline(args.kind, args)
+
+    if args.signature_only:
+        # Payload and signature only: nothing that decodes pixels is imported
+        from verify.signature_only import verify_embedded_signature
+        if args.kind == "image":
+            if args.signature:
+                raise SystemExit("--signature-only checks the embedded image payload; drop --signature")
+            valid, reason = verify_embedded_signature(path)
+        else:
+            valid, reason = verify_embedded_signature(path, args.signature)
+    elif args.kind == "image":
+        from verify.verify_image import verify_image
+        valid, reason = verify_image(path, args.signature)
+    else:
+        from verify.verify_video import verify_video
+        valid, reason = verify_video(path, args.signature, workers=args.workers)
+
+    print("✅" if valid else "❌", reason)
+    _print_metrics(args)
+    return EXIT_VALID if valid else EXIT_INVALID
+
+def cmd_verify_stream(args):
+    """Verify a fragmented live recording fragment by fragment (video only)."""
+    path = os.path.abspath(args.path)
+    _use_pipeline("video", args)
+    from verify.verify_stream import iter_verify_fragments
+
+    with open(path, "rb") as f:
+        for result in iter_verify_fragments(f, follow=args.follow, idle_timeout=args.idle_timeout):
+            if result["sequence"] is not None:
+                print("✅" if result["valid"] else "❌", f"Fragment {result['sequence']}:", result["reason"])
+    print("✅" if result["valid"] else "❌", result["reason"])
+    _print_metrics(args)
+    return EXIT_VALID if result["valid"] else EXIT_INVALID
+
+def cmd_lookup(args):
+    """List signed originals that a file is a near-duplicate of; exit 0 if any."""
+    path = os.path.abspath(args.path)
+    _use_pipeline(args.kind, args)
+    from utils.constants import PHASH_MATCH_RADIUS
+    from verify.lookup import find_originals
+    radius = PHASH_MATCH_RADIUS if args.radius is None else args.radius
+
+    matches = find_originals(path, radius)
+    if not matches:
+        print("❌ No signed original within", radius, "bits")
+    for match in matches:
+        if args.kind == "image":
+            print(f"✅ {match['canonical_hash']}  distance {match['distance']}  {match['source'] or ''}")
+        else:
+            print(
+                f"✅ {match['canonical_hash']}  {match['matched_seconds']}/{match['query_seconds']} seconds"
+                f"  mean distance {match['mean_distance']:.1f}  {match['source'] or ''}"
+            )
+    _print_metrics(args)
+    return EXIT_VALID if matches else EXIT_INVALID
+
+def cmd_register(args):
+    """Add already signed files to the perceptual index (only those that verify)."""
+    paths = [os.path.abspath(p) for p in args.paths]
+    _use_pipeline(args.kind, args)
+    if args.kind == "image":
+        from verify.lookup import register_signed_image as register
+    else:
+        from verify.lookup import register_signed_video as register
+
+    failed = 0
+    for path in paths:
+        registered, reason = register(path)
+        print("✅" if registered else "❌", path, "" if registered else f"({reason})")
+        failed += not registered
+    _print_metrics(args)
+    return EXIT_VALID if not failed else EXIT_INVALID
+
+def cmd_import_signatures(args):
+    """Move legacy signature.json files into the pipeline's signature registry."""
+    paths = [os.path.abspath(p) for p in args.paths]
+    _use_pipeline(args.kind, args)
+    from storage.signature_store import get_registry
+
+    registry = get_registry()
+    added = registry.import_signature_files(paths)
+    print(f"✅ Imported {added} new signatures ({registry.count()} registered)")
+    return EXIT_VALID
+
+def cmd_capture(args):
+    """Run a pipeline's capture script (paths are relative to the pipeline root)."""
+    _use_pipeline(args.kind, args)
+    os.chdir(PIPELINE_ROOTS[args.kind])
+    runpy.run_path("main_capture.py", run_name="__main__")
+    _print_metrics(args)
+    return EXIT_VALID
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="trueshot", description="TrueShot capture and verification")
+    parser.add_argument("--metrics", choices=("json", "prometheus"), default=None,
+                        help="Collect per-stage metrics and print them to stderr when done")
+    parser.add_argument("--metrics-memory", action="store_true",
+                        help="With --metrics, also track peak memory per stage (slower)")
+    parser.add_argument("--metrics-log", action="store_true",
+                        help="With --metrics, log one JSON record per finished stage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    verify = commands.add_parser("verify", help="Verify an image or video")
+    verify.add_argument("kind", choices=sorted(PIPELINE_ROOTS))
+    verify.add_argument("path")
+    verify.add_argument("--signature", default=None, help="Signature JSON file (fallback when nothing is embedded)")
+    verify.add_argument("--signature-only", action="store_true",
+                        help="Only check the embedded payload and signature; pixels are not decoded or compared")
+    verify.add_argument("--workers", type=int, default=None, help="Video decode processes")
+    verify.set_defaults(handler=cmd_verify)
+
+    verify_stream = commands.add_parser("verify-stream", help="Verify a live (fragmented) video recording")
+    verify_stream.add_argument("path")
+    verify_stream.add_argument("--follow", action="store_true",
+                               help="Keep reading while the recording is still being written")
+    verify_stream.add_argument("--idle-timeout", type=float, default=10.0,
+                               help="With --follow, seconds without new data before giving up")
+    verify_stream.set_defaults(handler=cmd_verify_stream)
+
+    lookup = commands.add_parser("lookup", help="Find signed originals a (re-encoded) copy came from")
+    lookup.add_argument("kind", choices=sorted(PIPELINE_ROOTS))
+    lookup.add_argument("path")
+    lookup.add_argument("--radius", type=int, default=None,
+                        help="Maximum differing perceptual-hash bits (default: PHASH_MATCH_RADIUS)")
+    lookup.set_defaults(handler=cmd_lookup)
+
+    register = commands.add_parser("register", help="Add signed files to the perceptual index")
+    register.add_argument("kind", choices=sorted(PIPELINE_ROOTS))
+    register.add_argument("paths", nargs="+")
+    register.set_defaults(handler=cmd_register)
+
+    import_signatures = commands.add_parser("import-signatures", help="Move signature JSON files into the registry")
+    import_signatures.add_argument("kind", choices=sorted(PIPELINE_ROOTS))
+    import_signatures.add_argument("paths", nargs="+")
+    import_signatures.set_defaults(handler=cmd_import_signatures)
+
+    capture = commands.add_parser("capture", help="Capture and sign an image or video")
+    capture.add_argument("kind", choices=sorted(PIPELINE_ROOTS))
+    capture.set_defaults(handler=cmd_capture)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if (args.metrics_memory or args.metrics_log) and not args.metrics:
+        args.metrics = "json"
+    if args.metrics_log:
+        import logging
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import cv2
+import numpy as np
+
+from utils.constants import CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST
+from .normalize import luminance_offsets, normalize_lut
+from .resize import CANONICAL_SIZE
+
+class BatchCanonicalizer:
+    """
+    Canonicalize N same-sized frames held in one (N, H, W, 3) array.
+
+    Color conversions run once over the whole batch (viewed as one tall
+    image), the per-frame luminance stretch is a per-frame LUT lookup, and
+    resizes write straight into a preallocated output. Buffers are kept
+    and reused while the batch shape stays the same. Results are
+    bit-identical to canonicalizing each frame on its own.
+    """
+
+    def __init__(self, profile=CANONICAL_PROFILE_NORMALIZE_FIRST):
+        if profile not in (CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST):
+            raise ValueError(f"Unsupported canonical profile: {profile}")
+        self.profile = profile
+        self._buffers = {}
+
+    def _buffer(self, name, shape, dtype=np.uint8):
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self._buffers[name] = np.empty(shape, dtype)
+        return buf
+
+    def __call__(self, frames):
+        """
+        Args:
+            frames: uint8 array of shape (N, H, W, 3), or a sequence of
+                same-sized (H, W, 3) frames (copied into a reused buffer)
+
+        Returns:
+            uint8 array of shape (N, 256, 256, 3). It is a reused buffer,
+            valid until the next call; copy it to keep it.
+        """
+        if not isinstance(frames, np.ndarray):
+            frames = list(frames)
+            if not frames:
+                raise ValueError("No frames to canonicalize")
+            batch = self._buffer("input", (len(frames),) + frames[0].shape)
+            np.stack(frames, out=batch)
+            frames = batch
+        if frames.ndim != 4 or frames.shape[3] != 3 or frames.dtype != np.uint8:
+            raise ValueError("Expected a uint8 array of shape (N, H, W, 3)")
+        frames = np.ascontiguousarray(frames)
+
+        if self.profile == CANONICAL_PROFILE_RESIZE_FIRST:
+            return self._stretch(self._resize(frames))
+        return self._resize(self._normalize(frames))
+
+    def _resize(self, frames):
+        width, height = CANONICAL_SIZE
+        out = self._buffer("resized", (len(frames), height, width, 3))
+        if frames.shape[1:3] == (height, width):
+            np.copyto(out, frames)
+            return out
+        for i, frame in enumerate(frames):
+            resized = cv2.resize(frame, CANONICAL_SIZE, dst=out[i], interpolation=cv2.INTER_AREA)
+            if not np.shares_memory(resized, out[i]):
+                out[i] = resized
+        return out
+
+    def _normalize(self, frames):
+        """Batched normalize_brightness."""
+        n, h, w, _ = frames.shape
+        ycrcb = self._buffer("ycrcb", frames.shape)
+        cv2.cvtColor(frames.reshape(n * h, w, 3), cv2.COLOR_BGR2YCrCb, dst=ycrcb.reshape(n * h, w, 3))
+
+        # Stretch each frame's luma plane through its own LUT
+        luma = self._buffer("luma", (n, h, w))
+        np.copyto(luma, ycrcb[..., 0])
+        for i in range(n):
+            lo, hi, _, _ = cv2.minMaxLoc(luma[i])
+            cv2.LUT(luma[i], normalize_lut(lo, hi), dst=luma[i])
+        ycrcb[..., 0] = luma
+
+        out = self._buffer("normalized", frames.shape)
+        cv2.cvtColor(ycrcb.reshape(n * h, w, 3), cv2.COLOR_YCrCb2BGR, dst=out.reshape(n * h, w, 3))
+        return out
+
+    def _stretch(self, frames):
+        """Batched stretch_luminance."""
+        n, h, w, _ = frames.shape
+        gray = self._buffer("gray", (n, h, w))
+        cv2.cvtColor(frames.reshape(n * h, w, 3), cv2.COLOR_BGR2GRAY, dst=gray.reshape(n * h, w))
+
+        offsets = self._buffer("offsets", (n, h, w), np.int16)
+        for i in range(n):
+            lo, hi, _, _ = cv2.minMaxLoc(gray[i])
+            cv2.LUT(gray[i], luminance_offsets(lo, hi), dst=offsets[i])
+
+        work = self._buffer("work", frames.shape, np.int16)
+        np.add(frames, offsets[..., None], out=work)
+        np.clip(work, 0, 255, out=work)
+        out = self._buffer("stretched", frames.shape)
+        np.copyto(out, work, casting="unsafe")
+        return out
+
+def canonicalize_batch(frames, profile=CANONICAL_PROFILE_NORMALIZE_FIRST):
+    """
+    Canonicalize a batch of same-sized frames (see BatchCanonicalizer).
+
+    Returns:
+        New uint8 array of shape (N, 256, 256, 3)
+    """
+    return BatchCanonicalizer(profile)(frames).copy()
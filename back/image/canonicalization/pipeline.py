@@ -1,7 +1,32 @@
-from .normalize import normalize_brightness
+from utils import metrics
+from utils.constants import CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST
+from .normalize import normalize_brightness, stretch_luminance
 from .resize import resize_image
 
-def canonicalize(img):
+def profile_from_params(canonical):
+    """
+    Read the canonical profile from signed canonicalization parameters.
+
+    Args:
+        canonical: Parameter dict from the signed message, or None
+
+    Returns:
+        Profile name (normalize-first when absent)
+
+    Raises:
+        ValueError: If the profile is not supported
+    """
+    profile = (canonical or {}).get("profile", CANONICAL_PROFILE_NORMALIZE_FIRST)
+    if profile not in (CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST):
+        raise ValueError(f"Unsupported canonical profile: {profile}")
+    return profile
+
+@metrics.timed("canonicalize")
+def canonicalize(img, profile=CANONICAL_PROFILE_NORMALIZE_FIRST):
+    if profile == CANONICAL_PROFILE_RESIZE_FIRST:
+        # Downscale first, then stretch luminance on the 256x256 image
+        return stretch_luminance(resize_image(img))
+
     img = normalize_brightness(img)
     img = resize_image(img)
     return img
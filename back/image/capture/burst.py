@@ -0,0 +1,134 @@
+import os
+import queue
+import secrets
+import threading
+import time
+
+from canonicalization.pipeline import canonicalize
+from hashing.combine import create_message
+from hashing.crypto_hash import sha256_hash
+from hashing.perceptual import perceptual_hash
+from metadata.collect import collect_metadata
+from signing.sign import sign_message, signing_key_id
+from storage.image_store import save_signed_image
+from storage.phash_index import get_index
+from storage.signature_store import get_registry
+from utils.constants import CANONICAL_PROFILE
+
+_END = object()
+
+def sign_still(img, output_path, metadata=None, profile=CANONICAL_PROFILE, register=True):
+    """
+    Canonicalize, hash, sign and save one captured still.
+
+    Args:
+        img: Captured BGR frame
+        output_path: PNG to write (with the signed payload embedded)
+        metadata: Extra fields merged into the collected metadata
+        profile: Canonical profile (recorded in the signed message)
+        register: Add the signature to the registry and the perceptual hash
+            to the index; otherwise the returned record carries both
+
+    Returns:
+        Dict with path, hash, message, signature and phash
+    """
+    canon = canonicalize(img, profile)
+    hash_val = sha256_hash(canon.tobytes())
+
+    info = collect_metadata()
+    info.update(metadata or {})
+    message = create_message(hash_val, info, {"profile": profile}, key_id=signing_key_id())
+    signature = sign_message(message)
+    save_signed_image(canon, output_path, hash_val, signature, message)
+
+    record = {
+        "path": os.path.abspath(output_path),
+        "hash": hash_val,
+        "message": message,
+        "signature": signature,
+        "phash": perceptual_hash(canon),
+    }
+    if register:
+        _register([record])
+    return record
+
+def _register(records):
+    get_registry().add_many((r["message"], r["signature"], r["path"]) for r in records)
+    get_index().add_many((r["phash"], r["hash"], r["path"], None) for r in records)
+
+def capture_burst(session, count, output_dir, fps=None, prefix="burst", queue_size=8, register=True):
+    """
+    Capture a burst of stills and sign each one while the next are taken.
+
+    A capture thread pulls frames from the warm session at the target rate
+    into a bounded buffer; this thread canonicalizes, hashes, signs and
+    saves them as they arrive. Frames are never dropped: if signing falls
+    behind and the buffer is full, capture waits. Each signed message
+    records the burst id, the frame's index and its capture time, so the
+    stills of one burst can be told apart and put back in order.
+
+    Args:
+        session: Open (or openable) CameraSession
+        count: Number of stills
+        output_dir: Directory for the PNGs ({prefix}_{burst_id}_{index}.png)
+        fps: Target capture rate (None = as fast as the camera delivers)
+        prefix: File name prefix
+        queue_size: Frames buffered between capture and signing
+        register: Register all stills (in one transaction each) at the end
+
+    Returns:
+        Stats dict: burst_id, paths, capture_seconds, capture_fps, elapsed
+    """
+    burst_id = secrets.token_hex(8)
+    frames = queue.Queue(maxsize=queue_size)
+    errors = []
+    capture_time = {}
+
+    def capturer():
+        start = time.perf_counter()
+        try:
+            for item in session.burst(count, fps):
+                frames.put(item)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            capture_time["seconds"] = time.perf_counter() - start
+            frames.put(_END)
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=capturer, daemon=True)
+    thread.start()
+
+    records = []
+    while True:
+        item = frames.get()
+        if item is _END:
+            break
+        if errors:
+            continue  # drain so the capture thread is never blocked
+        index, taken, frame = item
+        path = os.path.join(output_dir, f"{prefix}_{burst_id}_{index:03d}.png")
+        try:
+            records.append(sign_still(
+                frame,
+                path,
+                metadata={"burst_id": burst_id, "burst_index": index, "captured_at": round(taken, 3)},
+                register=False
+            ))
+        except Exception as e:
+            errors.append(e)
+    thread.join()
+
+    if records and register:
+        _register(records)
+    if errors:
+        raise errors[0]
+
+    capture_seconds = capture_time["seconds"]
+    return {
+        "burst_id": burst_id,
+        "paths": [r["path"] for r in records],
+        "capture_seconds": capture_seconds,
+        "capture_fps": len(records) / capture_seconds if capture_seconds > 0 else 0.0,
+        "elapsed": time.perf_counter() - start,
+    }
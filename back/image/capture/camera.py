@@ -1,14 +1,121 @@
+import time
+
 import cv2
 
-def capture_image(camera_id=0):
-    cap = cv2.VideoCapture(camera_id)
-    if not cap.isOpened():
-        raise RuntimeError("Camera not accessible")
+from utils import metrics
+from utils.constants import CAMERA_IDLE_FLUSH_SECONDS, CAMERA_WARMUP_FRAMES
+
+class CameraSession:
+    """
+    Keeps a camera open between shots.
+
+    Opening a device and letting auto-exposure settle costs hundreds of
+    milliseconds, so a session pays for it once: open() discards
+    `warmup_frames` frames and later captures read straight from the warm
+    device. Use it as a context manager, or call open() and release().
+
+    Args:
+        camera_id: Camera device ID (or anything cv2.VideoCapture can open)
+        warmup_frames: Frames read and discarded once after opening
+    """
+
+    def __init__(self, camera_id=0, warmup_frames=CAMERA_WARMUP_FRAMES):
+        self.camera_id = camera_id
+        self.warmup_frames = warmup_frames
+        self.cap = None
+        self.fps = None
+        self._buffered = 0
+        self._last_read = None
+
+    def open(self):
+        if self.cap is not None:
+            return self
+        with metrics.stage("camera_open"):
+            cap = cv2.VideoCapture(self.camera_id)
+            if not cap.isOpened():
+                raise RuntimeError("Camera not accessible")
+
+            # Keep as few stale frames queued in the driver as it allows
+            # (V4L2 queues 4 unless told otherwise)
+            self._buffered = 1 if cap.set(cv2.CAP_PROP_BUFFERSIZE, 1) else 4
+            self.fps = cap.get(cv2.CAP_PROP_FPS)
+            if self.fps <= 0:
+                self.fps = 30  # Default fallback
+
+            for _ in range(self.warmup_frames):
+                if not cap.grab():
+                    break
+        self.cap = cap
+        self._last_read = time.perf_counter()
+        return self
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
 
-    ret, frame = cap.read()
-    cap.release()
+    def __enter__(self):
+        return self.open()
 
-    if not ret:
-        raise RuntimeError("Failed to capture image")
+    def __exit__(self, *exc):
+        self.release()
 
-    return frame
+    def _read(self):
+        ret, frame = self.cap.read()
+        self._last_read = time.perf_counter()
+        if not ret:
+            raise RuntimeError("Failed to capture image")
+        metrics.count("frames_captured")
+        return frame
+
+    @metrics.timed("capture")
+    def capture(self):
+        """
+        Capture one still from the warm device.
+
+        After an idle gap the frames still queued in the driver show the
+        scene from before the gap, so they are dropped first.
+
+        Returns:
+            BGR frame
+        """
+        self.open()
+        if time.perf_counter() - self._last_read > CAMERA_IDLE_FLUSH_SECONDS:
+            for _ in range(self._buffered):
+                self.cap.grab()
+        return self._read()
+
+    def burst(self, count, fps=None):
+        """
+        Capture `count` stills at a target rate.
+
+        Frames are paced against a fixed schedule, so a slow consumer of
+        one frame does not shift the rest; if the consumer falls behind,
+        the next frame is taken immediately.
+
+        Args:
+            count: Number of frames
+            fps: Target frames per second (None = as fast as the camera delivers)
+
+        Yields:
+            Tuple of (index, capture time from time.time(), frame)
+        """
+        self.open()
+        interval = 1.0 / fps if fps else 0.0
+        next_time = time.perf_counter()
+        for index in range(count):
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if index == 0:
+                frame = self.capture()
+            else:
+                with metrics.stage("capture"):
+                    frame = self._read()
+            yield index, time.time(), frame
+            next_time = max(next_time, time.perf_counter() - interval) + interval
+
+def capture_image(camera_id=0):
+    """Capture a single still, opening and releasing the camera (see CameraSession for repeated shots)."""
+    with CameraSession(camera_id, warmup_frames=0) as session:
+        return session.capture()
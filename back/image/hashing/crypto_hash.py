@@ -1,4 +1,7 @@
 import hashlib
 
+from utils import metrics
+
+@metrics.timed("hash")
 def sha256_hash(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
@@ -0,0 +1,36 @@
+import argparse
+
+from capture.burst import capture_burst
+from capture.camera import CameraSession
+from utils.constants import CAMERA_WARMUP_FRAMES
+
+if __name__ == "__main__":
+    # Keep the camera open and capture signed stills back to back: one burst,
+    # or (with --kiosk) one burst each time Enter is pressed
+    parser = argparse.ArgumentParser(description="TrueShot burst / kiosk capture with a persistent camera")
+    parser.add_argument("--count", type=int, default=1, help="Stills per burst")
+    parser.add_argument("--fps", type=float, default=None, help="Target burst rate (default: camera rate)")
+    parser.add_argument("--output-dir", default="storage/burst")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--warmup-frames", type=int, default=CAMERA_WARMUP_FRAMES)
+    parser.add_argument("--kiosk", action="store_true", help="Capture on every Enter until 'q' or EOF")
+    args = parser.parse_args()
+
+    with CameraSession(args.camera, warmup_frames=args.warmup_frames) as session:
+        print("✅ Camera ready")
+        while True:
+            if args.kiosk:
+                try:
+                    if input("Press Enter to capture ('q' to quit): ").strip().lower() == "q":
+                        break
+                except EOFError:
+                    break
+
+            stats = capture_burst(session, args.count, args.output_dir, fps=args.fps)
+            print(f"✅ {len(stats['paths'])} stills captured and signed in {stats['elapsed']:.2f}s "
+                  f"({stats['capture_fps']:.1f} fps captured)")
+            for path in stats["paths"]:
+                print("  ", path)
+
+            if not args.kiosk:
+                break
@@ -0,0 +1,25 @@
+import argparse
+
+from verify.batch import verify_batch
+
+if __name__ == "__main__":
+    # Verify a directory, glob or manifest of images and stream a JSONL report
+    parser = argparse.ArgumentParser(description="Bulk-verify TrueShot images")
+    parser.add_argument("source", help="Directory, glob pattern (quote it) or manifest file")
+    parser.add_argument("--report", default="storage/verify_report.jsonl", help="JSONL report path")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--prefetch", type=int, default=None, help="Max files in flight (default: 4 per worker)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Files per worker task; small images in a task are canonicalized as one batch")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the report instead of resuming it")
+    args = parser.parse_args()
+
+    counts = verify_batch(
+        args.source,
+        args.report,
+        workers=args.workers,
+        prefetch=args.prefetch,
+        resume=not args.no_resume,
+        batch_size=args.batch_size
+    )
+    print(f"✅ {counts['authentic']} authentic, ❌ {counts['invalid']} invalid, ⚠️ {counts['error']} errors")
+    print(f"   Report: {args.report}")
@@ -0,0 +1,205 @@
+import asyncio
+import collections
+import json
+import os
+import socket
+import stat
+import struct
+import time
+
+from utils.constants import SIGNING_SOCKET_PATH
+from .daemon_client import OP_KEY_ID, OP_SIGN, OP_STATS, STATUS_ERROR, STATUS_OK, pack_frame
+from .keyring import get_keyring, key_id_for, message_key_id
+
+# Upper bound on signatures computed in one batch
+MAX_BATCH_SIZE = 256
+
+# Largest accepted request frame
+MAX_FRAME_BYTES = 1024 * 1024
+
+# Latency samples kept for the percentile counters
+LATENCY_WINDOW = 4096
+
+class SigningDaemon:
+    """
+    Long-lived signing service on a Unix socket.
+
+    The private key stays in memory (KeyRing). Sign requests from all
+    connections go into one queue; a batcher takes everything queued (up to
+    MAX_BATCH_SIZE) and signs it in a single executor call, so batches grow
+    with load while an idle daemon answers each request immediately.
+    """
+
+    def __init__(self, socket_path=SIGNING_SOCKET_PATH, keyring=None, max_batch=MAX_BATCH_SIZE):
+        self.socket_path = str(socket_path)
+        self.keyring = keyring or get_keyring()
+        self.max_batch = max_batch
+        self._queue = asyncio.Queue()
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._started = time.monotonic()
+        self.counters = {
+            "requests": 0,
+            "signed": 0,
+            "errors": 0,
+            "batches": 0,
+            "largest_batch": 0,
+            "connections": 0,
+        }
+
+    async def start(self):
+        # Fail early (and load the key) before accepting connections
+        self.keyring.private_key()
+        self._remove_stale_socket()
+        self._batcher = asyncio.create_task(self._run_batches())
+        # Create the socket owner-only; a chmod after bind would leave a
+        # window in which other users could connect
+        old_umask = os.umask(0o177)
+        try:
+            self.server = await asyncio.start_unix_server(self._handle, self.socket_path)
+        finally:
+            os.umask(old_umask)
+        return self.server
+
+    def _remove_stale_socket(self):
+        """Remove a socket left behind by a daemon that is gone; never replace a live one."""
+        try:
+            mode = os.lstat(self.socket_path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise RuntimeError(f"{self.socket_path} exists and is not a socket")
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except ConnectionRefusedError:
+            os.remove(self.socket_path)  # nobody is listening
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"A signing daemon is already listening on {self.socket_path}")
+
+    def close(self):
+        self.server.close()
+        self._batcher.cancel()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def stats(self):
+        """Counters plus throughput and latency percentiles (milliseconds)."""
+        uptime = time.monotonic() - self._started
+        latencies = sorted(self._latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+
+        stats = dict(self.counters)
+        stats.update({
+            "uptime_seconds": round(uptime, 3),
+            "signs_per_second": round(self.counters["signed"] / uptime, 3) if uptime > 0 else 0.0,
+            "mean_batch_size": round(self.counters["signed"] / self.counters["batches"], 3) if self.counters["batches"] else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p99": percentile(0.99),
+        })
+        return stats
+
+    def _sign_batch(self, messages):
+        """
+        Executor: sign a batch with one key lookup.
+
+        A message whose key_id names another key gets an error instead of
+        a signature, so the key id it records always matches its signature.
+        """
+        private_key = self.keyring.private_key()
+        key_id = key_id_for(private_key.public_key())
+        results = []
+        for message in messages:
+            named = message_key_id(message)
+            if named is not None and named != key_id:
+                results.append(ValueError(f"Message names key {named} but the daemon's key is {key_id}"))
+            else:
+                results.append(private_key.sign(message))
+        return results
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                signatures = await loop.run_in_executor(None, self._sign_batch, [m for m, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            self.counters["batches"] += 1
+            self.counters["signed"] += sum(not isinstance(s, Exception) for s in signatures)
+            self.counters["largest_batch"] = max(self.counters["largest_batch"], len(batch))
+            for (_, future, queued_at), signature in zip(batch, signatures):
+                self._latencies.append(now - queued_at)
+                if future.done():
+                    continue
+                if isinstance(signature, Exception):
+                    future.set_exception(signature)
+                else:
+                    future.set_result(signature)
+
+    async def _sign(self, message):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future, time.perf_counter()))
+        return await future
+
+    async def _handle(self, reader, writer):
+        self.counters["connections"] += 1
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(4)
+                except asyncio.IncompleteReadError:
+                    break
+                length = struct.unpack(">I", header)[0]
+                if not 1 <= length <= MAX_FRAME_BYTES:
+                    break
+                frame = await reader.readexactly(length)
+                op, payload = frame[:1], frame[1:]
+
+                self.counters["requests"] += 1
+                try:
+                    if op == OP_SIGN:
+                        body = await self._sign(payload)
+                    elif op == OP_KEY_ID:
+                        body = self.keyring.signing_key_id().encode()
+                    elif op == OP_STATS:
+                        body = json.dumps(self.stats(), sort_keys=True).encode()
+                    else:
+                        raise ValueError(f"Unknown op: {op!r}")
+                    response = STATUS_OK + body
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    response = STATUS_ERROR + f"{type(e).__name__}: {e}".encode()
+
+                writer.write(pack_frame(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.counters["connections"] -= 1
+            writer.close()
+
+async def serve(socket_path=SIGNING_SOCKET_PATH):
+    daemon = SigningDaemon(socket_path)
+    await daemon.start()
+    print(f"✅ Signing daemon listening on {daemon.socket_path} (key id {daemon.keyring.signing_key_id()})")
+    try:
+        async with daemon.server:
+            await daemon.server.serve_forever()
+    finally:
+        daemon.close()
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from utils.constants import PRIVATE_KEY_PATH, PUBLIC_KEY_PATH, TRUSTED_KEYS_DIR
+
+# Seconds between checks of key file modification times
+RELOAD_INTERVAL_SECONDS = 1.0
+
+logger = logging.getLogger("trueshot.keyring")
+
+def key_id_for(public_key) -> str:
+    """Short stable identifier for a public key (first 16 hex chars of SHA-256 of its raw bytes)."""
+    raw = public_key.public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
+    )
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+def message_key_id(message: bytes):
+    """Key id carried in a signed message, or None for messages without one."""
+    try:
+        payload = json.loads(message.decode())
+    except (UnicodeDecodeError, ValueError):
+        return None
+    return payload.get("key_id") if isinstance(payload, dict) else None
+
+class KeyRing:
+    """
+    In-memory cache of the signing key and all trusted public keys.
+
+    Keys are parsed once and served from memory. Public keys are indexed by
+    key id so several signing devices can be trusted at once: the default
+    public key plus every *.pem file in the trusted keys directory. Key files
+    are re-checked at most every `reload_interval` seconds and reloaded when
+    they are added, removed or modified. A key file that cannot be parsed
+    (malformed, or caught half-written) is skipped with a warning; if it
+    loaded before, its previous key is kept until the file parses again.
+    """
+
+    def __init__(self, private_key_path=PRIVATE_KEY_PATH, public_key_path=PUBLIC_KEY_PATH,
+                 trusted_dir=TRUSTED_KEYS_DIR, reload_interval=RELOAD_INTERVAL_SECONDS):
+        self.private_key_path = Path(private_key_path)
+        self.public_key_path = Path(public_key_path)
+        self.trusted_dir = Path(trusted_dir) if trusted_dir else None
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked_at = 0.0
+        self._private_key = None
+        self._private_key_id = None
+        self._private_key_error = None
+        self._public_keys = {}
+        self._keys_by_path = {}
+        self._default_key_id = None
+
+    def _public_key_files(self):
+        files = [self.public_key_path] if self.public_key_path.exists() else []
+        if self.trusted_dir and self.trusted_dir.is_dir():
+            files.extend(sorted(self.trusted_dir.glob("*.pem")))
+        return files
+
+    def _file_stamp(self):
+        stamp = []
+        for path in [self.private_key_path] + self._public_key_files():
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stamp.append((str(path), st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def _read_key(self, path, parse):
+        """Parse one PEM file; None (with a warning) if it cannot be read."""
+        try:
+            with open(path, "rb") as f:
+                return parse(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Skipping unreadable key file %s: %s", path, e)
+            return None
+
+    def _load(self, stamp):
+        private_key = private_key_id = private_key_error = None
+        if self.private_key_path.exists():
+            private_key = self._read_key(
+                self.private_key_path, lambda data: serialization.load_pem_private_key(data, password=None)
+            )
+            if private_key is None:
+                private_key, private_key_id = self._private_key, self._private_key_id
+                if private_key is None:
+                    private_key_error = f"Private key could not be loaded: {self.private_key_path}"
+            else:
+                private_key_id = key_id_for(private_key.public_key())
+
+        public_keys = {}
+        keys_by_path = {}
+        default_key_id = None
+        for path in self._public_key_files():
+            public_key = self._read_key(path, serialization.load_pem_public_key)
+            if public_key is not None:
+                entry = (key_id_for(public_key), public_key)
+            else:
+                entry = self._keys_by_path.get(path)
+                if entry is None:
+                    continue
+            key_id, public_key = keys_by_path[path] = entry
+            public_keys[key_id] = public_key
+            if path == self.public_key_path:
+                default_key_id = key_id
+
+        self._private_key = private_key
+        self._private_key_id = private_key_id
+        self._private_key_error = private_key_error
+        self._public_keys = public_keys
+        self._keys_by_path = keys_by_path
+        self._default_key_id = default_key_id
+        self._stamp = stamp
+
+    def refresh(self, force=False):
+        """Reload keys if any key file changed since the last load."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._stamp is not None and now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            stamp = self._file_stamp()
+            if force or stamp != self._stamp:
+                self._load(stamp)
+
+    def private_key(self):
+        self.refresh()
+        if self._private_key_error is not None:
+            raise ValueError(self._private_key_error)
+        if self._private_key is None:
+            raise FileNotFoundError(f"Private key not found: {self.private_key_path}")
+        return self._private_key
+
+    def signing_key_id(self) -> str:
+        """Key id of the local signing key."""
+        self.private_key()
+        return self._private_key_id
+
+    def public_key(self, key_id=None):
+        """
+        Look up a trusted public key.
+
+        Args:
+            key_id: Key id from the signed message, or None for the default key
+
+        Returns:
+            Public key, or None if key_id is not trusted
+        """
+        self.refresh()
+        if key_id is None:
+            if self._default_key_id is None:
+                raise FileNotFoundError(f"Public key not found: {self.public_key_path}")
+            return self._public_keys[self._default_key_id]
+        return self._public_keys.get(key_id)
+
+    def key_ids(self):
+        """Ids of all trusted public keys."""
+        self.refresh()
+        return sorted(self._public_keys)
+
+    def trust_digest(self) -> str:
+        """
+        Digest of the trusted key set (all key ids and the default key).
+
+        Changes whenever a trusted key is added, removed or replaced, so it
+        can be used to invalidate cached verification results.
+        """
+        self.refresh()
+        ids = ",".join(sorted(self._public_keys)) + "|" + (self._default_key_id or "")
+        return hashlib.sha256(ids.encode()).hexdigest()
+
+    def sign(self, message: bytes, key_id=None) -> bytes:
+        """
+        Sign with the local key.
+
+        Args:
+            message: Bytes to sign
+            key_id: Key id the message records; signing fails if the local
+                key has another id (None = any key)
+
+        Raises:
+            ValueError: If the local key is not the one named by key_id
+        """
+        private_key = self.private_key()
+        if key_id is not None:
+            local_key_id = key_id_for(private_key.public_key())
+            if local_key_id != key_id:
+                raise ValueError(f"Message names key {key_id} but the signing key is {local_key_id}")
+        return private_key.sign(message)
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        """Verify a signature with the public key named by the message's key id."""
+        public_key = self.public_key(message_key_id(message))
+        if public_key is None:
+            return False
+        try:
+            public_key.verify(signature, message)
+            return True
+        except Exception:
+            return False
+
+_default_keyring = None
+
+def get_keyring() -> KeyRing:
+    """Process-wide KeyRing for the pipeline's default key paths."""
+    global _default_keyring
+    if _default_keyring is None:
+        _default_keyring = KeyRing()
+    return _default_keyring
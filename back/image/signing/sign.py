@@ -1,7 +1,27 @@
-from cryptography.hazmat.primitives import serialization
-from utils.constants import PRIVATE_KEY_PATH
+from utils import metrics
+from .daemon_client import get_daemon_client
+from .keyring import get_keyring, message_key_id
 
+@metrics.timed("sign")
 def sign_message(message: bytes) -> bytes:
-    with open(PRIVATE_KEY_PATH, "rb") as f:
-        private_key = serialization.load_pem_private_key(f.read(), password=None)
-    return private_key.sign(message)
+    # Prefer the signing daemon when one is running; it keeps the key in memory.
+    # Both signers refuse a message whose key_id names another key, so a
+    # message prepared with the daemon's key id is never signed with a
+    # different local key (or the other way round)
+    client = get_daemon_client()
+    if client is not None:
+        try:
+            return client.sign(message)
+        except OSError:
+            pass  # stale socket: sign locally
+    return get_keyring().sign(message, message_key_id(message))
+
+def signing_key_id() -> str:
+    """Key id of the signing key (the daemon's, if one is running), recorded in the signed message."""
+    client = get_daemon_client()
+    if client is not None:
+        try:
+            return client.signing_key_id()
+        except OSError:
+            pass
+    return get_keyring().signing_key_id()
@@ -1,12 +1,7 @@
-from cryptography.hazmat.primitives import serialization
-from utils.constants import PUBLIC_KEY_PATH
+from utils import metrics
+from .keyring import get_keyring
 
+@metrics.timed("signature")
 def verify_signature(message: bytes, signature: bytes) -> bool:
-    with open(PUBLIC_KEY_PATH, "rb") as f:
-        public_key = serialization.load_pem_public_key(f.read())
-
-    try:
-        public_key.verify(signature, message)
-        return True
-    except Exception:
-        return False
+    # Public key is picked by the message's key id (default key if it has none)
+    return get_keyring().verify(message, signature)
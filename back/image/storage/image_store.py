@@ -2,14 +2,12 @@ import cv2
 import os
 import numpy as np
 from PIL import Image
+from PIL.PngImagePlugin import PngInfo
 
-def save_image(img, path):
-    """
-    Save image and return path for metadata embedding.
-    Note: For PNG files, we'll use PIL to save so we can embed metadata.
-    """
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    
+from utils import metrics
+from .metadata_embed import metadata_text_chunks
+
+def _to_pil(img):
     # Convert BGR to RGB if needed (OpenCV uses BGR, PIL uses RGB)
     if len(img.shape) == 3 and img.shape[2] == 3:
         img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
@@ -17,9 +15,42 @@ def save_image(img, path):
         img_rgb = img
     
     # Convert numpy array to PIL Image
-    pil_img = Image.fromarray(img_rgb)
+    return Image.fromarray(img_rgb)
+
+def save_image(img, path):
+    """
+    Save image and return path for metadata embedding.
+    Note: For PNG files, we'll use PIL to save so we can embed metadata.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
     
     # Save with PIL (supports metadata embedding)
-    pil_img.save(path)
+    _to_pil(img).save(path)
+    
+    return path
+
+@metrics.timed("embed")
+def save_signed_image(img, path, hash_value, signature, message_bytes):
+    """
+    Save a canonical image as PNG with the TrueShot metadata already embedded.
+    The file is encoded exactly once; no reopen, decode or recompression.
+    
+    Args:
+        img: BGR image array
+        path: Output PNG path
+        hash_value: SHA256 hash string
+        signature: Signature bytes
+        message_bytes: Original message bytes that was signed
+        
+    Returns:
+        Path to the saved image
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    png_info = PngInfo()
+    for keyword, text in metadata_text_chunks(hash_value, signature, message_bytes):
+        png_info.add_text(keyword, text)
+    
+    _to_pil(img).save(path, format='PNG', pnginfo=png_info)
     
     return path
@@ -1,9 +1,11 @@
 import base64
 import json
-from PIL import Image
-from PIL.ExifTags import TAGS
-from PIL.PngImagePlugin import PngInfo
-import io
+
+from utils import metrics
+from .png_chunks import is_png, iter_png_text, splice_text_chunks
+
+# PIL is imported only on the JPEG paths; PNG metadata is read and written
+# with the chunk scanner, so signature-only checks never load it
 
 try:
     import piexif
@@ -11,10 +13,39 @@ try:
 except ImportError:
     HAS_PIEXIF = False
 
+def metadata_text_chunks(hash_value, signature, message_bytes):
+    """
+    Build the TrueShot text fields stored in an image.
+    
+    Returns:
+        List of (keyword, text) pairs: the JSON blob plus redundant individual fields
+    """
+    # Convert signature and message to base64 strings for storage
+    signature_b64 = base64.b64encode(signature).decode()
+    message_b64 = base64.b64encode(message_bytes).decode()
+    
+    # Create metadata dictionary
+    metadata_dict = {
+        "hash": hash_value,
+        "signature": signature_b64,
+        "message": message_b64
+    }
+    
+    return [
+        ("TrueShot", json.dumps(metadata_dict, sort_keys=True)),
+        ("TrueShotHash", hash_value),
+        ("TrueShotSignature", signature_b64),
+        ("TrueShotMessage", message_b64)
+    ]
+
+
+@metrics.timed("embed")
 def embed_metadata(image_path, hash_value, signature, message_bytes):
     """
     Embed hash and signature into image metadata.
     Uses PNG text chunks for PNG files, EXIF for JPEG files.
+    PNG chunks are spliced in before IEND without decoding or
+    recompressing the image data.
     
     Args:
         image_path: Path to image file
@@ -25,48 +56,26 @@ def embed_metadata(image_path, hash_value, signature, message_bytes):
     Returns:
         Path to image with embedded metadata
     """
-    # Load image
-    img = Image.open(image_path)
+    texts = metadata_text_chunks(hash_value, signature, message_bytes)
     
-    # Convert signature and message to base64 strings for storage
-    signature_b64 = base64.b64encode(signature).decode()
-    message_b64 = base64.b64encode(message_bytes).decode()
+    if is_png(image_path):
+        # PNG: Replace any previous TrueShot chunks, keep everything else byte-for-byte
+        splice_text_chunks(image_path, texts, replace_prefix="TrueShot")
+        return image_path
     
-    # Create metadata dictionary
-    metadata_dict = {
-        "hash": hash_value,
-        "signature": signature_b64,
-        "message": message_b64
-    }
+    # Load image
+    from PIL import Image
+    img = Image.open(image_path)
     
-    # Convert to JSON string
-    metadata_json = json.dumps(metadata_dict, sort_keys=True)
+    fields = dict(texts)
+    metadata_json = fields["TrueShot"]
+    signature_b64 = fields["TrueShotSignature"]
+    message_b64 = fields["TrueShotMessage"]
     
     # Determine file format
     file_format = img.format.lower() if img.format else image_path.split('.')[-1].lower()
     
-    if file_format == 'png':
-        # PNG: Use explicit tEXt chunks to ensure persistence on save
-        png_info = PngInfo()
-
-        # Preserve any existing text chunks
-        for k, v in img.info.items():
-            if isinstance(v, bytes):
-                # Avoid bytes; convert to str to satisfy add_text
-                v = v.decode("utf-8", errors="ignore")
-            png_info.add_text(k, str(v))
-
-        # Add our fields
-        png_info.add_text("TrueShot", metadata_json)
-        png_info.add_text("TrueShotHash", hash_value)
-        png_info.add_text("TrueShotSignature", signature_b64)
-        png_info.add_text("TrueShotMessage", message_b64)
-        
-        # Save PNG with explicit metadata
-        img.save(image_path, format='PNG', pnginfo=png_info)
-        return image_path
-        
-    elif file_format in ['jpeg', 'jpg']:
+    if file_format in ['jpeg', 'jpg']:
         # JPEG: Use EXIF data
         if HAS_PIEXIF:
             # Use piexif for better EXIF handling
@@ -97,15 +106,85 @@ def embed_metadata(image_path, hash_value, signature, message_bytes):
                 img.save(image_path, format='JPEG')
         return image_path
     
-    # Default: Save image (shouldn't reach here for PNG/JPEG)
+    # Default: Save image (shouldn't reach here for JPEG)
     img.save(image_path, format=file_format.upper())
     
     return image_path
 
 
+def _scan_png_metadata(image_path):
+    """
+    Find the TrueShot payload in a PNG by walking its chunk headers.
+
+    Stops at the first complete TrueShot JSON chunk; otherwise collects the
+    individual TrueShot* fields. No pixel data is read or inflated.
+
+    Returns:
+        Metadata dict with hash/signature/message, or None if not found
+    """
+    fields = {}
+    for key, value in iter_png_text(image_path, prefix="TrueShot"):
+        if key == "TrueShot":
+            try:
+                metadata_dict = json.loads(value)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(metadata_dict, dict) and all(
+                metadata_dict.get(k) for k in ("hash", "signature", "message")
+            ):
+                return metadata_dict
+        else:
+            fields[key] = value
+
+    hash_value = fields.get('TrueShotHash')
+    signature_b64 = fields.get('TrueShotSignature')
+    message_b64 = fields.get('TrueShotMessage')
+
+    if hash_value and signature_b64 and message_b64:
+        return {
+            "hash": hash_value,
+            "signature": signature_b64,
+            "message": message_b64
+        }
+    return None
+
+
+def _decode_metadata(metadata_dict):
+    """Decode a metadata dict into (hash_value, signature_bytes, message_bytes), or None."""
+    hash_value = metadata_dict.get("hash")
+    signature_b64 = metadata_dict.get("signature")
+    message_b64 = metadata_dict.get("message")
+
+    if not all([hash_value, signature_b64, message_b64]):
+        return None
+
+    return hash_value, base64.b64decode(signature_b64), base64.b64decode(message_b64)
+
+
+def _jpeg_may_have_payload(image_path):
+    """
+    Cheap pre-check: look for the payload's JSON keys in the JPEG header
+    segments (everything before the image data) without decoding anything.
+    """
+    with open(image_path, "rb") as f:
+        head = f.read(2)
+        if head != b"\xff\xd8":
+            return True  # not a JPEG; let PIL decide
+        header = bytearray()
+        while True:
+            marker = f.read(4)
+            if len(marker) < 4 or marker[0] != 0xFF or marker[1] == 0xDA:
+                break  # start of scan (image data) or malformed
+            length = int.from_bytes(marker[2:], "big")
+            header += f.read(max(length - 2, 0))
+    return b'"signature"' in header and b'"message"' in header
+
+
+@metrics.timed("extract")
 def extract_metadata(image_path):
     """
     Extract hash and signature from image metadata.
+    PNG files are read with a chunk scanner that never decodes pixels.
     
     Args:
         image_path: Path to image file
@@ -114,49 +193,18 @@ def extract_metadata(image_path):
         Tuple of (hash_value, signature_bytes, message_bytes) or None if not found
     """
     try:
+        if is_png(image_path):
+            metadata_dict = _scan_png_metadata(image_path)
+            return _decode_metadata(metadata_dict) if metadata_dict else None
+
+        if not _jpeg_may_have_payload(image_path):
+            return None
+
+        from PIL import Image
         img = Image.open(image_path)
         file_format = img.format.lower() if img.format else image_path.split('.')[-1].lower()
         
-        if file_format == 'png':
-            # Extract from PNG text chunks
-            # PIL loads PNG text chunks into img.info dict
-            if not img.info:
-                return None
-                
-            metadata_json = img.info.get('TrueShot')
-            if metadata_json:
-                try:
-                    metadata_dict = json.loads(metadata_json)
-                except json.JSONDecodeError:
-                    # Try individual fields if JSON parsing fails
-                    hash_value = img.info.get('TrueShotHash')
-                    signature_b64 = img.info.get('TrueShotSignature')
-                    message_b64 = img.info.get('TrueShotMessage')
-                    
-                    if hash_value and signature_b64 and message_b64:
-                        metadata_dict = {
-                            "hash": hash_value,
-                            "signature": signature_b64,
-                            "message": message_b64
-                        }
-                    else:
-                        return None
-            else:
-                # Try individual fields
-                hash_value = img.info.get('TrueShotHash')
-                signature_b64 = img.info.get('TrueShotSignature')
-                message_b64 = img.info.get('TrueShotMessage')
-                
-                if hash_value and signature_b64 and message_b64:
-                    metadata_dict = {
-                        "hash": hash_value,
-                        "signature": signature_b64,
-                        "message": message_b64
-                    }
-                else:
-                    return None
-            
-        elif file_format in ['jpeg', 'jpg']:
+        if file_format in ['jpeg', 'jpg']:
             # Try to extract from EXIF first
             if HAS_PIEXIF:
                 try:
@@ -198,19 +246,8 @@ def extract_metadata(image_path):
         else:
             return None
         
-        # Extract values
-        hash_value = metadata_dict.get("hash")
-        signature_b64 = metadata_dict.get("signature")
-        message_b64 = metadata_dict.get("message")
-        
-        if not all([hash_value, signature_b64, message_b64]):
-            return None
-        
-        # Decode base64
-        signature_bytes = base64.b64decode(signature_b64)
-        message_bytes = base64.b64decode(message_b64)
-        
-        return hash_value, signature_bytes, message_bytes
+        # Extract and decode values
+        return _decode_metadata(metadata_dict)
         
     except Exception as e:
         print(f"Error extracting metadata: {e}")
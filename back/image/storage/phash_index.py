@@ -0,0 +1,183 @@
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+from hashing.perceptual import PHASH_BITS, hamming_distance
+from utils.constants import PHASH_INDEX_PATH, PHASH_MATCH_RADIUS
+
+# Multi-index hashing: each 64-bit hash is split into CHUNKS 16-bit
+# substrings, each with its own SQLite index. If two hashes differ in at
+# most r bits, at least one substring differs in at most r // CHUNKS bits
+# (pigeonhole), so a search only visits rows whose substring lies in that
+# small neighbourhood and never scans the table
+CHUNKS = 4
+CHUNK_BITS = PHASH_BITS // CHUNKS
+_CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+# Largest radius accepted by search(); r // CHUNKS = 3 already probes
+# 697 substrings per chunk
+MAX_SEARCH_RADIUS = 15
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS originals (
+    id INTEGER PRIMARY KEY,
+    phash INTEGER NOT NULL,
+    c0 INTEGER NOT NULL,
+    c1 INTEGER NOT NULL,
+    c2 INTEGER NOT NULL,
+    c3 INTEGER NOT NULL,
+    canonical_hash TEXT NOT NULL,
+    second INTEGER,
+    source TEXT,
+    added REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS originals_c0 ON originals (c0);
+CREATE INDEX IF NOT EXISTS originals_c1 ON originals (c1);
+CREATE INDEX IF NOT EXISTS originals_c2 ON originals (c2);
+CREATE INDEX IF NOT EXISTS originals_c3 ON originals (c3);
+CREATE INDEX IF NOT EXISTS originals_canonical_hash ON originals (canonical_hash);
+"""
+
+# One row per (original, second, hash); second is NULL for stills and NULLs
+# never collide in a UNIQUE constraint, hence the expression index
+_UNIQUE_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS originals_unique "
+    "ON originals (canonical_hash, IFNULL(second, -1), phash)"
+)
+
+def _chunks(phash):
+    return [(phash >> (CHUNK_BITS * i)) & _CHUNK_MASK for i in range(CHUNKS)]
+
+def _to_sqlite(phash):
+    # SQLite integers are signed 64-bit
+    return phash - (1 << 64) if phash >= 1 << 63 else phash
+
+def _from_sqlite(value):
+    return value + (1 << 64) if value < 0 else value
+
+def _neighbours(value, radius):
+    """All CHUNK_BITS-bit values within `radius` bits of value."""
+    found = [value]
+    for flips in range(1, radius + 1):
+        for bits in itertools.combinations(range(CHUNK_BITS), flips):
+            mask = 0
+            for bit in bits:
+                mask |= 1 << bit
+            found.append(value ^ mask)
+    return found
+
+class PerceptualIndex:
+    """
+    On-disk (SQLite) index of perceptual hashes of signed originals.
+
+    Each row links a perceptual hash to the signed canonical hash of the
+    original (and, for video, the second it was taken from). search()
+    returns every original within a Hamming radius using multi-index
+    hashing, so lookups stay sublinear in the number of originals.
+    """
+
+    def __init__(self, db_path=PHASH_INDEX_PATH):
+        self.db_path = str(db_path)
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+        self._ensure_unique()
+
+    def _ensure_unique(self):
+        """Add the uniqueness index, dropping duplicates registered before it existed."""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'originals_unique'"
+        ).fetchone()
+        if exists:
+            return
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM originals WHERE id NOT IN "
+                "(SELECT MIN(id) FROM originals GROUP BY canonical_hash, IFNULL(second, -1), phash)"
+            )
+            self._conn.execute(_UNIQUE_INDEX)
+
+    def add(self, phash, canonical_hash, source=None, second=None):
+        self.add_many([(phash, canonical_hash, source, second)])
+
+    def add_many(self, entries):
+        """
+        Insert many originals in one transaction; entries already in the
+        index (same canonical hash, second and perceptual hash) are skipped.
+
+        Args:
+            entries: Iterable of (phash, canonical_hash, source, second)
+        """
+        now = time.time()
+        rows = (
+            (_to_sqlite(phash), *_chunks(phash), canonical_hash, second, source, now)
+            for phash, canonical_hash, source, second in entries
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO originals (phash, c0, c1, c2, c3, canonical_hash, second, source, added) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def search(self, phash, radius=PHASH_MATCH_RADIUS):
+        """
+        Find originals whose perceptual hash is within `radius` bits.
+
+        Returns:
+            List of dicts (distance, phash, canonical_hash, second, source),
+            nearest first
+        """
+        if not 0 <= radius <= MAX_SEARCH_RADIUS:
+            raise ValueError(f"radius must be between 0 and {MAX_SEARCH_RADIUS}")
+
+        sub_radius = radius // CHUNKS
+        matches = {}
+        with self._lock:
+            for i, value in enumerate(_chunks(phash)):
+                candidates = _neighbours(value, sub_radius)
+                placeholders = ",".join("?" * len(candidates))
+                rows = self._conn.execute(
+                    f"SELECT id, phash, canonical_hash, second, source FROM originals "
+                    f"WHERE c{i} IN ({placeholders})",
+                    candidates
+                )
+                for row_id, stored, canonical_hash, second, source in rows:
+                    if row_id in matches:
+                        continue
+                    stored = _from_sqlite(stored)
+                    distance = hamming_distance(phash, stored)
+                    if distance <= radius:
+                        matches[row_id] = {
+                            "distance": distance,
+                            "phash": stored,
+                            "canonical_hash": canonical_hash,
+                            "second": second,
+                            "source": source,
+                        }
+        return sorted(matches.values(), key=lambda m: (m["distance"], m["canonical_hash"], m["second"] or 0))
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM originals").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_default_index = None
+
+def get_index() -> PerceptualIndex:
+    """Process-wide PerceptualIndex at the pipeline's default path."""
+    global _default_index
+    if _default_index is None:
+        _default_index = PerceptualIndex()
+    return _default_index
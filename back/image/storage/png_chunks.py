@@ -0,0 +1,194 @@
+import mmap
+import os
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+TEXT_CHUNK_TYPES = (b"tEXt", b"iTXt", b"zTXt")
+# Largest decompressed zTXt / iTXt text accepted (PIL's PngImagePlugin.MAX_TEXT_CHUNK)
+MAX_TEXT_CHUNK = 1024 * 1024
+COPY_CHUNK_SIZE = 1 << 20
+
+def is_png(path):
+    """Check the PNG signature without reading the rest of the file."""
+    with open(path, "rb") as f:
+        return f.read(len(PNG_SIGNATURE)) == PNG_SIGNATURE
+
+def _inflate(data):
+    """Decompress a zlib stream, refusing to inflate past MAX_TEXT_CHUNK bytes."""
+    decompressor = zlib.decompressobj()
+    text = decompressor.decompress(data, MAX_TEXT_CHUNK)
+    if decompressor.unconsumed_tail:
+        raise ValueError("Decompressed text chunk too large")
+    return text
+
+def _decode_text_chunk(chunk_type, data, prefix=None):
+    """
+    Decode a tEXt / zTXt / iTXt chunk body.
+
+    The keyword is read first; chunks whose keyword does not start with
+    `prefix` are skipped without being decompressed.
+
+    Returns:
+        Tuple of (keyword, text), or None if the keyword does not match
+
+    Raises:
+        ValueError: If the chunk is malformed or inflates past MAX_TEXT_CHUNK
+    """
+    keyword, _, rest = data.partition(b"\x00")
+    keyword = keyword.decode("latin-1")
+    if prefix is not None and not keyword.startswith(prefix):
+        return None
+
+    if chunk_type == b"tEXt":
+        return keyword, rest.decode("latin-1")
+
+    if chunk_type == b"zTXt":
+        # compression method byte, then zlib stream
+        return keyword, _inflate(rest[1:]).decode("latin-1")
+
+    # iTXt: compression flag, method, language\0, translated keyword\0, text
+    compressed = rest[0]
+    rest = rest[2:]
+    _, _, rest = rest.partition(b"\x00")
+    _, _, text = rest.partition(b"\x00")
+    if compressed:
+        text = _inflate(text)
+    return keyword, text.decode("utf-8")
+
+def iter_png_text(path, prefix=None):
+    """
+    Yield text chunks of a PNG by walking chunk headers over a memory map.
+
+    Only chunk headers are read for non-text chunks (IDAT is skipped, never
+    inflated), so the cost is independent of image size. The generator can
+    be closed as soon as the caller has what it needs.
+
+    Args:
+        path: Path to PNG file
+        prefix: Only yield keywords starting with this prefix
+
+    Yields:
+        Tuples of (keyword, text)
+
+    Raises:
+        ValueError: If the file is not a PNG
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError("Empty file")
+
+        with mm:
+            if mm[:len(PNG_SIGNATURE)] != PNG_SIGNATURE:
+                raise ValueError("Not a PNG file")
+
+            pos = len(PNG_SIGNATURE)
+            size = len(mm)
+            while pos + 8 <= size:
+                length, chunk_type = struct.unpack(">I4s", mm[pos:pos + 8])
+                data_start = pos + 8
+                data_end = data_start + length
+                if data_end + 4 > size:
+                    break  # truncated file
+
+                if chunk_type == b"IEND":
+                    break
+
+                if chunk_type in TEXT_CHUNK_TYPES:
+                    data = mm[data_start:data_end]
+                    crc = struct.unpack(">I", mm[data_end:data_end + 4])[0]
+                    if zlib.crc32(data, zlib.crc32(chunk_type)) == crc:
+                        try:
+                            decoded = _decode_text_chunk(chunk_type, data, prefix)
+                        except (IndexError, ValueError, zlib.error):
+                            decoded = None  # malformed or oversized: skipped
+                        if decoded is not None:
+                            yield decoded
+
+                pos = data_end + 4
+
+def build_text_chunk(keyword, text):
+    """Serialize a tEXt chunk (length, type, data, CRC)."""
+    data = keyword.encode("latin-1") + b"\x00" + text.encode("latin-1")
+    crc = zlib.crc32(data, zlib.crc32(b"tEXt"))
+    return struct.pack(">I4s", len(data), b"tEXt") + data + struct.pack(">I", crc)
+
+def _scan_chunks(f):
+    """
+    Walk chunk headers of an open PNG.
+
+    Returns:
+        Tuple of (list of (offset, total_length, type, keyword or None), IEND offset)
+    """
+    f.seek(0)
+    if f.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+        raise ValueError("Not a PNG file")
+
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("PNG has no IEND chunk")
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type == b"IEND":
+            return chunks, pos
+
+        keyword = None
+        if chunk_type in TEXT_CHUNK_TYPES:
+            keyword = f.read(min(length, 80)).partition(b"\x00")[0].decode("latin-1")
+        chunks.append((pos, length + 12, chunk_type, keyword))
+        pos += length + 12
+        f.seek(pos)
+
+def _copy_range(src, dst, start, end):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        block = src.read(min(remaining, COPY_CHUNK_SIZE))
+        if not block:
+            raise ValueError("PNG ended early")
+        dst.write(block)
+        remaining -= len(block)
+
+def splice_text_chunks(path, texts, replace_prefix=None):
+    """
+    Add tEXt chunks to a PNG without touching its compressed image data.
+
+    New chunks go right before IEND. The other chunks are copied
+    byte-for-byte into a temporary file, which is synced and then renamed
+    over the original, so a crash leaves either the old or the new file.
+
+    Args:
+        path: Path to PNG file
+        texts: Iterable of (keyword, text) pairs
+        replace_prefix: Drop existing text chunks whose keyword starts with this
+    """
+    new_chunks = b"".join(build_text_chunk(k, v) for k, v in texts)
+
+    temp_path = f"{path}.tmp"
+    try:
+        with open(path, "rb") as f, open(temp_path, "wb") as out:
+            chunks, iend_pos = _scan_chunks(f)
+
+            # Copy everything before IEND except the replaced text chunks,
+            # in as few runs as possible
+            pos = 0
+            for offset, total, _, keyword in chunks:
+                if replace_prefix is not None and keyword is not None and keyword.startswith(replace_prefix):
+                    _copy_range(f, out, pos, offset)
+                    pos = offset + total
+            _copy_range(f, out, pos, iend_pos)
+
+            out.write(new_chunks)
+            f.seek(iend_pos)
+            out.write(f.read())
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -1,8 +1,15 @@
 import json
 import base64
 import os
+import sqlite3
+import threading
+
+from utils.constants import SIGNATURE_REGISTRY_PATH
 
 def save_signature(path, message, signature):
+    """
+    Write one signature JSON file (legacy; new captures use SignatureRegistry).
+    """
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
     data = {
@@ -12,3 +19,165 @@ def save_signature(path, message, signature):
 
     with open(path, "w") as f:
         json.dump(data, f, indent=2)
+
+def load_signature_file(path):
+    """
+    Read a signature JSON file written by save_signature.
+
+    Returns:
+        Tuple of (message_bytes, signature_bytes)
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return base64.b64decode(data["message"]), base64.b64decode(data["signature"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    id INTEGER PRIMARY KEY,
+    canonical_hash TEXT NOT NULL,
+    key_id TEXT,
+    timestamp INTEGER,
+    message BLOB NOT NULL,
+    signature BLOB NOT NULL,
+    source TEXT,
+    UNIQUE (canonical_hash, signature)
+);
+CREATE INDEX IF NOT EXISTS signatures_key_id ON signatures (key_id, timestamp);
+CREATE INDEX IF NOT EXISTS signatures_timestamp ON signatures (timestamp);
+"""
+
+def _row(message, signature, source):
+    payload = json.loads(message.decode())
+    timestamp = payload.get("metadata", {}).get("timestamp")
+    return payload["hash"], payload.get("key_id"), timestamp, message, signature, source
+
+class SignatureRegistry:
+    """
+    On-disk (SQLite, WAL mode) registry of signed messages.
+
+    Replaces one signature.json per capture. Rows are indexed by the signed
+    canonical hash, so the signature of a file whose embedded metadata was
+    stripped is found from its recomputed hash, and by key id and
+    timestamp for audits. Stored signatures are not trusted: callers
+    still check them with signing.verify.verify_signature.
+    """
+
+    def __init__(self, db_path=SIGNATURE_REGISTRY_PATH):
+        self.db_path = str(db_path)
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def add(self, message, signature, source=None):
+        return self.add_many([(message, signature, source)])
+
+    def add_many(self, entries):
+        """
+        Insert many signed messages in one transaction; duplicates are skipped.
+
+        Args:
+            entries: Iterable of (message_bytes, signature_bytes, source)
+
+        Returns:
+            Number of new rows
+        """
+        rows = (_row(message, signature, source) for message, signature, source in entries)
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO signatures "
+                "(canonical_hash, key_id, timestamp, message, signature, source) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return self._conn.total_changes - before
+
+    def find(self, canonical_hash):
+        """
+        Signed messages for a canonical hash, newest first.
+
+        Returns:
+            List of (message_bytes, signature_bytes)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message, signature FROM signatures WHERE canonical_hash = ? "
+                "ORDER BY timestamp DESC, id DESC",
+                (canonical_hash,)
+            ).fetchall()
+        return [(bytes(message), bytes(signature)) for message, signature in rows]
+
+    def query(self, key_id=None, since=None, until=None, limit=None):
+        """
+        List registered captures by signing key and/or time range.
+
+        Args:
+            key_id: Only captures signed with this key id
+            since: Only captures with timestamp >= since (Unix seconds)
+            until: Only captures with timestamp < until
+            limit: Maximum number of rows
+
+        Returns:
+            List of dicts (canonical_hash, key_id, timestamp, source), newest first
+        """
+        clauses, params = [], []
+        if key_id is not None:
+            clauses.append("key_id = ?")
+            params.append(key_id)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        sql = "SELECT canonical_hash, key_id, timestamp, source FROM signatures"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"canonical_hash": h, "key_id": k, "timestamp": t, "source": s}
+            for h, k, t, s in rows
+        ]
+
+    def import_signature_files(self, paths):
+        """
+        Move legacy signature JSON files into the registry (files are left in place).
+
+        Returns:
+            Number of new rows
+        """
+        return self.add_many(
+            (*load_signature_file(path), os.path.abspath(path)) for path in paths
+        )
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_default_registry = None
+
+def get_registry() -> SignatureRegistry:
+    """Process-wide SignatureRegistry at the pipeline's default path."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = SignatureRegistry()
+    return _default_registry
+
+def registry_exists():
+    """Whether the pipeline's default registry has been created yet."""
+    return _default_registry is not None or os.path.exists(SIGNATURE_REGISTRY_PATH)
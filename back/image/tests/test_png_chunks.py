@@ -0,0 +1,112 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from storage.png_chunks import MAX_TEXT_CHUNK, build_text_chunk, iter_png_text, splice_text_chunks
+
+def _chunk(chunk_type, data):
+    crc = zlib.crc32(data, zlib.crc32(chunk_type))
+    return struct.pack(">I4s", len(data), chunk_type) + data + struct.pack(">I", crc)
+
+def _png(tmp_path, *chunks):
+    """Small PNG with the given raw chunks inserted right before IEND."""
+    path = tmp_path / "image.png"
+    Image.fromarray(np.zeros((4, 4, 3), dtype=np.uint8)).save(path)
+    data = path.read_bytes()
+    iend = data.rindex(b"IEND") - 4
+    path.write_bytes(data[:iend] + b"".join(chunks) + data[iend:])
+    return str(path)
+
+def test_reads_text_ztxt_and_itxt(tmp_path):
+    path = _png(
+        tmp_path,
+        build_text_chunk("TrueShotHash", "abc"),
+        _chunk(b"zTXt", b"TrueShotMessage\x00\x00" + zlib.compress(b"message")),
+        _chunk(b"iTXt", b"TrueShotSignature\x00\x01\x00en\x00\x00" + zlib.compress("sigé".encode())),
+        build_text_chunk("Comment", "other"),
+    )
+    assert list(iter_png_text(path)) == [
+        ("TrueShotHash", "abc"),
+        ("TrueShotMessage", "message"),
+        ("TrueShotSignature", "sigé"),
+        ("Comment", "other"),
+    ]
+    assert [k for k, _ in iter_png_text(path, prefix="TrueShot")] == [
+        "TrueShotHash", "TrueShotMessage", "TrueShotSignature"
+    ]
+
+def test_oversized_compressed_text_is_skipped(tmp_path):
+    bomb = zlib.compress(b"\x00" * (MAX_TEXT_CHUNK + 1), 9)
+    path = _png(
+        tmp_path,
+        _chunk(b"zTXt", b"TrueShotMessage\x00\x00" + bomb),
+        _chunk(b"iTXt", b"TrueShot\x00\x01\x00\x00\x00" + bomb),
+        build_text_chunk("TrueShotHash", "abc"),
+    )
+    assert list(iter_png_text(path, prefix="TrueShot")) == [("TrueShotHash", "abc")]
+
+def test_chunks_outside_the_prefix_are_not_decompressed(tmp_path, monkeypatch):
+    import storage.png_chunks as png_chunks
+
+    path = _png(tmp_path, _chunk(b"zTXt", b"Comment\x00\x00" + zlib.compress(b"x")))
+
+    def fail(data):
+        raise AssertionError("decompressed a chunk outside the prefix")
+    monkeypatch.setattr(png_chunks, "_inflate", fail)
+    assert list(iter_png_text(path, prefix="TrueShot")) == []
+
+def test_bad_crc_and_malformed_chunks_are_skipped(tmp_path):
+    bad_crc = bytearray(build_text_chunk("TrueShotHash", "abc"))
+    bad_crc[-1] ^= 0xFF
+    path = _png(
+        tmp_path,
+        bytes(bad_crc),
+        _chunk(b"zTXt", b"TrueShotMessage\x00\x00not zlib"),
+        _chunk(b"iTXt", b"TrueShotSignature\x00"),
+    )
+    assert list(iter_png_text(path)) == []
+
+def _idat(path):
+    return b"".join(data for chunk_type, data in _chunks(path) if chunk_type == b"IDAT")
+
+def _chunks(path):
+    data = open(path, "rb").read()
+    pos = 8
+    while pos < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        yield chunk_type, data[pos + 8:pos + 8 + length]
+        pos += length + 12
+
+def test_splice_adds_and_replaces_text_without_touching_image_data(tmp_path):
+    path = _png(tmp_path, build_text_chunk("TrueShotHash", "old"), build_text_chunk("Comment", "kept"))
+    idat = _idat(path)
+
+    splice_text_chunks(path, [("TrueShotHash", "new"), ("TrueShotSignature", "sig")], replace_prefix="TrueShot")
+    assert list(iter_png_text(path)) == [
+        ("Comment", "kept"), ("TrueShotHash", "new"), ("TrueShotSignature", "sig")
+    ]
+    splice_text_chunks(path, [("Author", "a")])
+    assert [k for k, _ in iter_png_text(path)] == ["Comment", "TrueShotHash", "TrueShotSignature", "Author"]
+
+    assert _idat(path) == idat
+    assert [t for t, _ in _chunks(path)][-1] == b"IEND"
+    Image.open(path).load()
+
+@pytest.mark.parametrize("replace_prefix", [None, "TrueShot"])
+def test_failed_splice_leaves_the_original_file(tmp_path, monkeypatch, replace_prefix):
+    import storage.png_chunks as png_chunks
+
+    path = _png(tmp_path, build_text_chunk("TrueShotHash", "old"))
+    original = open(path, "rb").read()
+
+    def crash(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(png_chunks.os, "fsync", crash)
+    with pytest.raises(OSError):
+        splice_text_chunks(path, [("TrueShotHash", "new")], replace_prefix=replace_prefix)
+
+    assert open(path, "rb").read() == original
+    assert not (tmp_path / "image.png.tmp").exists()
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import os
+import socket
+import stat
+
+import pytest
+
+from hashing.combine import create_message
+from signing.daemon import SigningDaemon
+from signing.daemon_client import DaemonError, SigningClient
+from signing.sign import sign_message
+from signing.verify import verify_signature
+
+def test_local_signing_refuses_a_message_naming_another_key(keyring):
+    message = create_message("ab" * 32, {}, key_id=keyring.signing_key_id())
+    assert verify_signature(message, sign_message(message))
+
+    with pytest.raises(ValueError):
+        sign_message(create_message("ab" * 32, {}, key_id="0123456789abcdef"))
+
+def test_daemon_socket_is_private_and_never_replaced_while_live(tmp_path, keyring):
+    path = str(tmp_path / "signing.sock")
+
+    async def scenario():
+        daemon = SigningDaemon(path, keyring=keyring)
+        await daemon.start()
+        try:
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+            with pytest.raises(RuntimeError):
+                await SigningDaemon(path, keyring=keyring).start()
+
+            client = SigningClient(path)
+            try:
+                message = create_message("ab" * 32, {}, key_id=keyring.signing_key_id())
+                signature = await asyncio.to_thread(client.sign, message)
+                assert verify_signature(message, signature)
+                foreign = create_message("ab" * 32, {}, key_id="0123456789abcdef")
+                with pytest.raises(DaemonError):
+                    await asyncio.to_thread(client.sign, foreign)
+                assert json.loads(await asyncio.to_thread(client.stats))["signed"] == 1
+            finally:
+                client.close()
+        finally:
+            daemon.close()
+
+    asyncio.run(scenario())
+
+def test_daemon_replaces_a_stale_socket_but_not_other_files(tmp_path, keyring):
+    stale = str(tmp_path / "stale.sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(stale)
+    sock.close()  # bound but nobody listening
+
+    regular = tmp_path / "regular"
+    regular.write_text("not a socket")
+
+    async def scenario():
+        daemon = SigningDaemon(stale, keyring=keyring)
+        await daemon.start()
+        daemon.close()
+        with pytest.raises(RuntimeError):
+            await SigningDaemon(str(regular), keyring=keyring).start()
+
+    asyncio.run(scenario())
+    assert regular.read_text() == "not a socket"
@@ -0,0 +1,47 @@
+import numpy as np
+
+from canonicalization.pipeline import canonicalize
+from hashing.combine import create_message
+from hashing.crypto_hash import sha256_hash
+from signing.sign import sign_message
+from storage.image_store import save_signed_image
+from utils.constants import CANONICAL_PROFILE
+from verify.cache import VerificationCache, cached_verify_image
+
+def _signed_png(path, canon, hash_val=None):
+    hash_val = hash_val or sha256_hash(canon.tobytes())
+    message = create_message(hash_val, {"timestamp": 0}, canonical={"profile": CANONICAL_PROFILE})
+    save_signed_image(canon, str(path), hash_val, sign_message(message), message)
+    return str(path)
+
+def _canon(seed):
+    rng = np.random.default_rng(seed)
+    return canonicalize(rng.integers(0, 256, (240, 320, 3), dtype=np.uint8), CANONICAL_PROFILE)
+
+def test_only_definitive_verdicts_are_cached(tmp_path, keyring):
+    cache = VerificationCache(tmp_path / "cache.sqlite3", keyring=keyring)
+
+    authentic = _signed_png(tmp_path / "authentic.png", _canon(1))
+    # Signed for other pixels: a content mismatch
+    mismatch = _signed_png(tmp_path / "mismatch.png", _canon(2), hash_val=sha256_hash(b"other"))
+    # Valid payload, but the image data cannot be decoded
+    broken = _signed_png(tmp_path / "broken.png", _canon(3))
+    data = bytearray(open(broken, "rb").read())
+    idat = data.index(b"IDAT") + 4
+    data[idat:idat + 64] = bytes(64)
+    open(broken, "wb").write(bytes(data))
+
+    expected = {
+        authentic: (True, "Image is authentic"),
+        mismatch: (False, "Image content mismatch"),
+        broken: (False, "Failed to load image"),
+    }
+    for path, verdict in expected.items():
+        details = {}
+        assert cached_verify_image(path, cache=cache, details=details) == verdict
+        assert details["cached"] is False
+
+    for path, verdict in expected.items():
+        details = {}
+        assert cached_verify_image(path, cache=cache, details=details) == verdict
+        assert details["cached"] is (path != broken)
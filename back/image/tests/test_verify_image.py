@@ -0,0 +1,42 @@
+import numpy as np
+
+from canonicalization.pipeline import canonicalize
+from hashing.combine import create_message
+from hashing.crypto_hash import sha256_hash
+from signing.sign import sign_message
+from storage.image_store import save_signed_image
+from utils.constants import CANONICAL_PROFILE
+from verify.signature_only import verify_embedded_signature
+from verify.verify_image import verify_image
+
+def _capture():
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+
+def _sign(canon):
+    hash_val = sha256_hash(canon.tobytes())
+    message = create_message(hash_val, {"timestamp": 0}, canonical={"profile": CANONICAL_PROFILE})
+    return hash_val, message, sign_message(message)
+
+def test_signed_capture_verifies(tmp_path, keyring):
+    canon = canonicalize(_capture(), CANONICAL_PROFILE)
+    hash_val, message, signature = _sign(canon)
+    path = str(tmp_path / "canonical.png")
+    save_signed_image(canon, path, hash_val, signature, message)
+
+    assert verify_image(path) == (True, "Image is authentic")
+    assert verify_embedded_signature(path)[0]
+
+def test_embedded_hash_must_match_the_signed_message(tmp_path, keyring):
+    # A genuine message and signature copied onto other pixels, with the
+    # unsigned TrueShotHash field set to the hash of those pixels
+    _, message, signature = _sign(canonicalize(_capture(), CANONICAL_PROFILE))
+    red = np.zeros((256, 256, 3), dtype=np.uint8)
+    red[:, :, 2] = 255
+    path = str(tmp_path / "forged.png")
+    save_signed_image(red, path, sha256_hash(red.tobytes()), signature, message)
+
+    valid, reason = verify_image(path)
+    assert not valid
+    assert reason == "Embedded hash does not match the signed message"
+    assert not verify_embedded_signature(path)[0]
@@ -5,3 +5,39 @@ IMAGE_ROOT = Path(__file__).resolve().parents[1]
 
 PRIVATE_KEY_PATH = IMAGE_ROOT / "private_key.pem"
 PUBLIC_KEY_PATH = IMAGE_ROOT / "public_key.pem"
+
+# Extra trusted public keys (one *.pem per signing device), indexed by key id
+TRUSTED_KEYS_DIR = IMAGE_ROOT / "trusted_keys"
+
+# Camera sessions (capture/camera.py::CameraSession): frames discarded once
+# after opening while auto-exposure settles, and the idle time after which
+# frames queued in the driver are considered stale and dropped
+CAMERA_WARMUP_FRAMES = 10
+CAMERA_IDLE_FLUSH_SECONDS = 0.5
+
+# Canonical profiles (order of the canonicalization steps), recorded in the
+# signed message under "canonical"; messages without one use normalize-first
+# normalize-first: brightness normalize at full resolution, then resize (legacy)
+# resize-first: resize to 256x256, then a fused luminance stretch on the small image
+CANONICAL_PROFILE_NORMALIZE_FIRST = "normalize-first"
+CANONICAL_PROFILE_RESIZE_FIRST = "resize-first"
+
+# Profile used for new captures
+CANONICAL_PROFILE = CANONICAL_PROFILE_RESIZE_FIRST
+
+# Persistent cache of verification results (see verify/cache.py)
+VERIFY_CACHE_PATH = IMAGE_ROOT / "storage" / "verify_cache.sqlite3"
+VERIFY_CACHE_MAX_ENTRIES = 10000
+
+# Unix socket of the signing daemon (main_signing_daemon.py); while it
+# exists, sign_message asks the daemon instead of loading the key locally
+SIGNING_SOCKET_PATH = IMAGE_ROOT / "signing.sock"
+
+# Perceptual-hash index of signed originals (see storage/phash_index.py);
+# copies within PHASH_MATCH_RADIUS differing bits (of 64) count as matches
+PHASH_INDEX_PATH = IMAGE_ROOT / "storage" / "phash_index.sqlite3"
+PHASH_MATCH_RADIUS = 10
+
+# Registry of signed messages, indexed by canonical hash, key id and time
+# (see storage/signature_store.py); replaces per-capture signature.json files
+SIGNATURE_REGISTRY_PATH = IMAGE_ROOT / "storage" / "signatures.sqlite3"
@@ -0,0 +1,218 @@
+import glob
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from canonicalization.batch import BatchCanonicalizer
+from canonicalization.pipeline import canonicalize
+from verify.verify_image import check_canonical, load_signed_image
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Images up to this many pixels are canonicalized together in one batch
+# array; larger ones are canonicalized one at a time to bound memory
+BATCH_MAX_PIXELS = 1024 * 1024
+
+# One canonicalizer per profile and worker process, so buffers are reused
+_batch_canonicalizers = {}
+
+def iter_image_paths(source):
+    """
+    Yield image paths from a directory, glob pattern or manifest file.
+
+    A manifest is a text file with one path per line (relative paths are
+    resolved against the manifest's directory); blank lines and lines
+    starting with '#' are skipped.
+
+    Args:
+        source: Directory, glob pattern or manifest path
+
+    Yields:
+        Image paths, lazily, so huge archives are never listed up front
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name)
+    elif os.path.isfile(source):
+        base_dir = os.path.dirname(source)
+        with open(source) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line if os.path.isabs(line) else os.path.join(base_dir, line)
+    else:
+        yield from glob.iglob(source, recursive=True)
+
+def load_completed(report_path):
+    """
+    Read paths already recorded in a partially written report.
+
+    A trailing line cut off by an interrupted run is truncated away so the
+    report stays valid JSONL when appended to.
+
+    Returns:
+        Set of paths that already have a result
+    """
+    completed = set()
+    if not os.path.exists(report_path):
+        return completed
+
+    with open(report_path, "rb+") as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            valid_end += len(line)
+            try:
+                completed.add(json.loads(line)["path"])
+            except (ValueError, KeyError):
+                continue
+        f.truncate(valid_end)
+    return completed
+
+def _record(image_path, status, reason, timings):
+    return {
+        "path": image_path,
+        "status": status,
+        "reason": reason,
+        "timings": {stage: round(seconds, 6) for stage, seconds in timings.items()}
+    }
+
+def verify_group(image_paths):
+    """
+    Verify several images, canonicalizing small same-sized images that
+    share a profile as one vectorized batch.
+
+    Results are the same as verify_image on each path. A batch's
+    canonicalize time is split evenly over its images.
+
+    Returns:
+        List of report records, in input order
+    """
+    records = {}
+    groups = {}
+
+    def finish(path, canon, stored_hash, timings, elapsed):
+        start = time.perf_counter()
+        try:
+            valid, reason = check_canonical(canon, stored_hash, timings)
+            status = "authentic" if valid else "invalid"
+        except Exception as e:
+            status, reason = "error", f"{type(e).__name__}: {e}"
+        timings["total"] = elapsed + time.perf_counter() - start
+        records[path] = _record(path, status, reason, timings)
+
+    for path in image_paths:
+        timings = {}
+        start = time.perf_counter()
+        try:
+            loaded = load_signed_image(path, timings=timings)
+            if isinstance(loaded, str):
+                timings["total"] = time.perf_counter() - start
+                records[path] = _record(path, "invalid", loaded, timings)
+                continue
+            img, stored_hash, profile = loaded
+
+            if profile is not None and img.shape[0] * img.shape[1] <= BATCH_MAX_PIXELS:
+                # Defer: canonicalized together with same-sized images below
+                groups.setdefault((img.shape, profile), []).append(
+                    (path, img, stored_hash, timings, time.perf_counter() - start)
+                )
+                continue
+
+            canon_start = time.perf_counter()
+            canon = img if profile is None else canonicalize(img, profile)
+            timings["canonicalize"] = timings.get("canonicalize", 0.0) + time.perf_counter() - canon_start
+        except Exception as e:
+            timings["total"] = time.perf_counter() - start
+            records[path] = _record(path, "error", f"{type(e).__name__}: {e}", timings)
+            continue
+        finish(path, canon, stored_hash, timings, time.perf_counter() - start)
+
+    for (_, profile), members in groups.items():
+        start = time.perf_counter()
+        try:
+            canonicalizer = _batch_canonicalizers.get(profile)
+            if canonicalizer is None:
+                canonicalizer = _batch_canonicalizers[profile] = BatchCanonicalizer(profile)
+            canons = canonicalizer([img for _, img, _, _, _ in members])
+        except Exception as e:
+            for path, _, _, timings, elapsed in members:
+                timings["total"] = elapsed
+                records[path] = _record(path, "error", f"{type(e).__name__}: {e}", timings)
+            continue
+        share = (time.perf_counter() - start) / len(members)
+
+        for (path, _, stored_hash, timings, elapsed), canon in zip(members, canons):
+            timings["canonicalize"] = share
+            finish(path, canon, stored_hash, timings, elapsed + share)
+
+    return [records[path] for path in image_paths]
+
+def verify_batch(source, report_path, workers=None, prefetch=None, resume=True, batch_size=1):
+    """
+    Verify many images over a process pool, streaming one JSON line per file.
+
+    At most `prefetch` files are in flight at once, so memory stays bounded
+    no matter how many paths the source yields. Records are written in
+    completion order and flushed as they arrive. With batch_size > 1 each
+    task verifies that many files with verify_group, so small images are
+    canonicalized in vectorized batches.
+
+    Args:
+        source: Directory, glob pattern or manifest (see iter_image_paths)
+        report_path: JSONL report to write
+        workers: Worker processes (defaults to os.cpu_count())
+        prefetch: Maximum in-flight files (defaults to 4 per worker)
+        resume: Skip paths already in report_path and append to it
+        batch_size: Files per worker task
+
+    Returns:
+        Dict of counts per status for this run
+    """
+    workers = workers or os.cpu_count() or 1
+    prefetch = prefetch or workers * 4
+
+    completed = load_completed(report_path) if resume else set()
+    report_dir = os.path.dirname(report_path)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+
+    counts = {"authentic": 0, "invalid": 0, "error": 0}
+    paths = (p for p in iter_image_paths(source) if p not in completed)
+
+    with open(report_path, "a" if resume else "w") as report, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+
+        def drain(done):
+            for future in done:
+                for record in future.result():
+                    counts[record["status"]] += 1
+                    report.write(json.dumps(record, sort_keys=True) + "\n")
+            report.flush()
+
+        def submit(chunk):
+            nonlocal pending
+            if len(pending) >= max(1, prefetch // batch_size):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                drain(done)
+            pending.add(executor.submit(verify_group, chunk))
+
+        chunk = []
+        for path in paths:
+            chunk.append(path)
+            if len(chunk) >= batch_size:
+                submit(chunk)
+                chunk = []
+        if chunk:
+            submit(chunk)
+
+        done, _ = wait(pending)
+        drain(done)
+
+    return counts
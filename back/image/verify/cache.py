@@ -0,0 +1,208 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from signing.keyring import get_keyring
+from utils.constants import VERIFY_CACHE_MAX_ENTRIES, VERIFY_CACHE_PATH
+from verify.verify_image import verify_image
+
+# Bump when verification semantics change so old results are ignored
+CACHE_SCHEMA_VERSION = 3
+
+READ_CHUNK_SIZE = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    content_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    trust TEXT NOT NULL,
+    valid INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    canonical_hash TEXT,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (content_hash, kind)
+);
+CREATE INDEX IF NOT EXISTS fingerprints_last_used ON fingerprints (last_used);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+def file_content_hash(path):
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class VerificationCache:
+    """
+    On-disk (SQLite) cache of verification results.
+
+    Results are keyed by the SHA-256 of the file's bytes, so a copy or a
+    renamed file reuses them too. A cheap fingerprint (path, size, mtime,
+    inode) maps a path to its content hash; while it still matches, a
+    lookup does not read the file at all. Results are tagged with the
+    trusted key set and ignored once it changes. Both tables are bounded
+    to max_entries rows, evicting the least recently used.
+    """
+
+    def __init__(self, db_path=VERIFY_CACHE_PATH, max_entries=VERIFY_CACHE_MAX_ENTRIES, keyring=None):
+        self.db_path = str(db_path)
+        self.max_entries = max_entries
+        self.keyring = keyring or get_keyring()
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != CACHE_SCHEMA_VERSION:
+                self._conn.execute("DELETE FROM results")
+                self._conn.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+
+    def _trust(self):
+        return f"{CACHE_SCHEMA_VERSION}:{self.keyring.trust_digest()}"
+
+    def content_hash(self, path):
+        """
+        Content hash of a file, from its fingerprint when it is unchanged.
+
+        Returns:
+            Hex SHA-256 of the file's bytes
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, content_hash FROM fingerprints WHERE path = ?", (path,)
+            ).fetchone()
+            if row is not None and tuple(row[:3]) == (st.st_size, st.st_mtime_ns, st.st_ino):
+                with self._conn:
+                    self._conn.execute("UPDATE fingerprints SET last_used = ? WHERE path = ?", (now, path))
+                return row[3]
+
+        content_hash = file_content_hash(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, st.st_ino, content_hash, now)
+            )
+            self._evict("fingerprints")
+        return content_hash
+
+    def get(self, content_hash, kind):
+        """
+        Cached result for a content hash, if it was verified with the
+        current trusted key set.
+
+        Returns:
+            Tuple of (is_valid, reason, canonical_hash), or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT valid, reason, canonical_hash FROM results "
+                "WHERE content_hash = ? AND kind = ? AND trust = ?",
+                (content_hash, kind, self._trust())
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE results SET last_used = ? WHERE content_hash = ? AND kind = ?",
+                    (time.time(), content_hash, kind)
+                )
+        return bool(row[0]), row[1], row[2]
+
+    def put(self, content_hash, kind, valid, reason, canonical_hash=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (content_hash, kind, self._trust(), int(valid), reason, canonical_hash, time.time())
+            )
+            self._evict("results")
+
+    def _evict(self, table):
+        """Drop the least recently used rows beyond max_entries (lock held)."""
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN "
+                f"(SELECT rowid FROM {table} ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM fingerprints")
+            self._conn.execute("DELETE FROM results")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_default_cache = None
+
+def get_cache() -> VerificationCache:
+    """Process-wide VerificationCache at the pipeline's default path."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = VerificationCache()
+    return _default_cache
+
+# Failures that depend only on the file's bytes. Anything else (a decode
+# error, a missing dependency) may go away and is verified again next time
+DEFINITIVE_FAILURES = (
+    "Invalid signature (forged or wrong key)",
+    "Signed message is malformed",
+    "Embedded hash does not match the signed message",
+    "Image content mismatch",
+)
+
+def cached_verify_image(image_path, cache=None, details=None):
+    """
+    verify_image with results cached across runs (see VerificationCache).
+
+    Only definitive outcomes that rest on the embedded payload are stored
+    (authentic, invalid signature, content mismatch); images verified
+    through the signature registry (or not found in it) are verified again
+    next time, since the registry can change, and so are decode errors.
+
+    Args:
+        image_path: Path to image file
+        cache: VerificationCache (defaults to the pipeline's cache)
+        details: Optional dict that receives canonical_hash and cached (bool)
+
+    Returns:
+        Tuple of (is_valid: bool, reason: str)
+    """
+    details = {} if details is None else details
+    cache = cache or get_cache()
+    content_hash = cache.content_hash(image_path)
+    hit = cache.get(content_hash, "image")
+    if hit is not None:
+        valid, reason, details["canonical_hash"] = hit
+        details["cached"] = True
+        return valid, reason
+
+    valid, reason = verify_image(image_path, details=details)
+    if details.get("payload") == "embedded" and (valid or reason in DEFINITIVE_FAILURES):
+        cache.put(content_hash, "image", valid, reason, details.get("canonical_hash"))
+    details["cached"] = False
+    return valid, reason
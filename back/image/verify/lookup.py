@@ -0,0 +1,60 @@
+import os
+
+import cv2
+
+from canonicalization.pipeline import canonicalize
+from canonicalization.resize import CANONICAL_SIZE
+from hashing.perceptual import perceptual_hash
+from storage.phash_index import get_index
+from utils.constants import CANONICAL_PROFILE, PHASH_MATCH_RADIUS
+from verify.verify_image import check_canonical, load_signed_image
+
+def image_perceptual_hash(image_path):
+    """
+    Perceptual hash of any image file (signed or not), taken over its
+    canonical form so it is comparable with the hashes of originals.
+
+    Raises:
+        ValueError: If the image cannot be decoded
+    """
+    img = cv2.imread(image_path)
+    if img is None:
+        raise ValueError(f"Failed to load image: {image_path}")
+    canon = img if img.shape[:2] == CANONICAL_SIZE else canonicalize(img, CANONICAL_PROFILE)
+    return perceptual_hash(canon)
+
+def find_originals(image_path, radius=PHASH_MATCH_RADIUS, index=None):
+    """
+    Find signed originals that an image is a (possibly re-encoded or
+    edited) copy of.
+
+    Args:
+        image_path: Image to trace; it does not need to carry a payload
+        radius: Maximum Hamming distance between perceptual hashes
+        index: PerceptualIndex (defaults to the pipeline's index)
+
+    Returns:
+        List of matches (distance, phash, canonical_hash, second, source), nearest first
+    """
+    index = index or get_index()
+    return index.search(image_perceptual_hash(image_path), radius)
+
+def register_signed_image(image_path, index=None):
+    """
+    Add an existing signed image to the perceptual index, after checking
+    that it verifies (so only genuine originals are indexed).
+
+    Returns:
+        Tuple of (registered: bool, reason: str)
+    """
+    loaded = load_signed_image(image_path)
+    if isinstance(loaded, str):
+        return False, loaded
+    img, stored_hash, profile = loaded
+    canon = img if profile is None else canonicalize(img, profile)
+    valid, reason = check_canonical(canon, stored_hash)
+    if not valid:
+        return False, reason
+
+    (index or get_index()).add(perceptual_hash(canon), stored_hash, source=os.path.abspath(image_path))
+    return True, "Registered"
@@ -0,0 +1,36 @@
+import json
+
+from signing.verify import verify_signature
+from storage.metadata_embed import extract_metadata
+from utils import metrics
+
+# Imports nothing that decodes pixels (no OpenCV, numpy or PIL for PNGs),
+# so short-lived processes can run this check cheaply
+
+def verify_embedded_signature(image_path):
+    """
+    Check that an image carries a TrueShot payload with a valid signature,
+    without decoding pixels. Does not prove the pixels match the signed hash.
+    Files without a payload are rejected after a header scan.
+    
+    Returns:
+        Tuple of (is_valid: bool, reason: str)
+    """
+    with metrics.file_labels(image_path), metrics.stage("verify_signature_only"):
+        metadata_result = extract_metadata(image_path)
+        if not metadata_result:
+            return False, "No metadata found in image"
+        
+        stored_hash, signature, stored_message = metadata_result
+        if not verify_signature(stored_message, signature):
+            return False, "Invalid signature (forged or wrong key)"
+        
+        # The embedded hash field is not signed; it must match the message
+        try:
+            signed_hash = json.loads(stored_message.decode())["hash"]
+        except (ValueError, KeyError, TypeError):
+            return False, "Signed message is malformed"
+        if stored_hash != signed_hash:
+            return False, "Embedded hash does not match the signed message"
+        
+        return True, "Embedded signature is valid"
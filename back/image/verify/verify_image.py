@@ -1,82 +1,219 @@
+import json
+import os
+import time
+
 import cv2
 import numpy as np
 
-from canonicalization.pipeline import canonicalize
+from canonicalization.pipeline import canonicalize, profile_from_params
 from canonicalization.resize import CANONICAL_SIZE
 from hashing.crypto_hash import sha256_hash
 from signing.verify import verify_signature
 from storage.metadata_embed import extract_metadata
+from storage.signature_store import get_registry, load_signature_file, registry_exists
+from utils import metrics
+from utils.constants import CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST
+from verify.signature_only import verify_embedded_signature  # noqa: F401 (re-exported)
+
+class _StageTimer:
+    """Record wall time per verification stage into an optional dict."""
+
+    def __init__(self, timings):
+        self.timings = timings
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        if self.timings is not None:
+            self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last)
+        self._last = now
 
-def verify_image(image_path, signature_path=None):
+def load_signed_image(image_path, signature_path=None, timings=None, details=None):
     """
-    Verify image authenticity by extracting metadata from image itself.
-    If signature_path is provided, it will be used as fallback.
+    Find and check the signed payload of an image, then decode its pixels.
+    The embedded payload and signature are checked before any pixels are
+    decoded, so files without a valid payload are rejected cheaply.
+    Without embedded metadata (or signature_path), the signature is looked
+    up in the signature registry by the image's recomputed canonical hash.
     
     Args:
         image_path: Path to image file
         signature_path: Optional path to signature JSON file (for backward compatibility)
+        timings: Optional dict that receives seconds spent per stage
+            (extract, signature, decode)
+        details: Optional dict that receives where the signed payload came
+            from under "payload" (embedded, file or registry)
         
     Returns:
-        Tuple of (is_valid: bool, reason: str)
+        Tuple of (image, stored_hash, profile), where profile is None if the
+        image is already canonical, or a failure reason string
     """
-    # Load image for processing
-    img = cv2.imread(image_path)
-    if img is None:
-        return False, "Failed to load image"
-    
-    # Check if image is already canonical (256x256)
-    # If so, use it directly; otherwise canonicalize it
-    if img.shape[:2] == CANONICAL_SIZE:
-        # Image is already canonical, use it directly
-        canon = img
-    else:
-        # Image needs to be canonicalized (e.g., raw image)
-        canon = canonicalize(img)
-    
-    # Compute hash from pixel data
-    recomputed_hash = sha256_hash(canon.tobytes())
+    timer = _StageTimer(timings)
+    details = {} if details is None else details
 
     # Try to extract metadata from image
     metadata_result = extract_metadata(image_path)
+    timer.mark("extract")
     
     if metadata_result:
         # Metadata found in image
         stored_hash, signature, stored_message = metadata_result
+        details["payload"] = "embedded"
     elif signature_path:
         # Fallback to separate signature file (backward compatibility)
+        if not os.path.exists(signature_path):
+            return f"No metadata found in image and signature file not found: {signature_path}"
         try:
-            import json
-            import base64
-            import os
-            if os.path.exists(signature_path):
-                with open(signature_path) as f:
-                    data = json.load(f)
-                
-                stored_message = base64.b64decode(data["message"])
-                signature = base64.b64decode(data["signature"])
-                
-                # Extract hash from message
-                signed_payload = json.loads(stored_message.decode())
-                stored_hash = signed_payload["hash"]
-            else:
-                return False, f"No metadata found in image and signature file not found: {signature_path}"
+            stored_message, signature = load_signature_file(signature_path)
+            # Extract hash from message
+            stored_hash = json.loads(stored_message.decode())["hash"]
         except Exception as e:
-            return False, f"Error reading signature file: {e}"
+            return f"Error reading signature file: {e}"
+        details["payload"] = "file"
     else:
-        # Try to find signature.json in the same directory as the image
-        import os
-        image_dir = os.path.dirname(image_path) or '.'
-        default_sig_path = os.path.join(image_dir, 'signature.json')
-        if os.path.exists(default_sig_path):
-            return verify_image(image_path, default_sig_path)
-        return False, "No metadata found in image. Please re-capture the image with the new code, or provide a signature file."
+        return _load_from_registry(image_path, timer, details)
 
     # 1️⃣ Verify signature on ORIGINAL message
-    if not verify_signature(stored_message, signature):
-        return False, "Invalid signature (forged or wrong key)"
+    signature_ok = verify_signature(stored_message, signature)
+    timer.mark("signature")
+    if not signature_ok:
+        return "Invalid signature (forged or wrong key)"
+
+    # Only the signed message is trusted; the embedded hash field is not
+    # covered by the signature, so it must agree with the message
+    try:
+        signed = json.loads(stored_message.decode())
+        signed_hash = signed["hash"]
+    except (ValueError, KeyError, TypeError):
+        return "Signed message is malformed"
+    if stored_hash != signed_hash:
+        return "Embedded hash does not match the signed message"
+
+    # 2️⃣ Load image for processing (only once the payload is known to be genuine)
+    with metrics.stage("decode"):
+        img = cv2.imread(image_path)
+    timer.mark("decode")
+    if img is None:
+        return "Failed to load image"
+    
+    # Check if image is already canonical (256x256)
+    # If so, use it directly; otherwise canonicalize it with the signed profile
+    if img.shape[:2] == CANONICAL_SIZE:
+        return img, signed_hash, None
+    try:
+        profile = profile_from_params(signed.get("canonical"))
+    except ValueError as e:
+        return f"Failed to canonicalize image: {e}"
+    return img, signed_hash, profile
+
+def _load_from_registry(image_path, timer, details):
+    """
+    Find the signature of an image without embedded metadata by looking up
+    its canonical hash (under each known profile) in the signature registry.
+
+    Returns:
+        Tuple of (canonical image, stored_hash, None), or a failure reason string
+    """
+    if not registry_exists():
+        return "No metadata found in image. Please re-capture the image with the new code, or provide a signature file."
+
+    with metrics.stage("decode"):
+        img = cv2.imread(image_path)
+    timer.mark("decode")
+    if img is None:
+        return "Failed to load image"
+
+    if img.shape[:2] == CANONICAL_SIZE:
+        profiles = [None]
+    else:
+        profiles = [CANONICAL_PROFILE_RESIZE_FIRST, CANONICAL_PROFILE_NORMALIZE_FIRST]
+
+    registry = get_registry()
+    for profile in profiles:
+        canon = img if profile is None else canonicalize(img, profile)
+        timer.mark("canonicalize")
+        canonical_hash = sha256_hash(canon.tobytes())
+        timer.mark("hash")
+        entries = registry.find(canonical_hash)
+        timer.mark("extract")
+
+        forged = False
+        for stored_message, signature in entries:
+            try:
+                signed_profile = profile_from_params(json.loads(stored_message.decode()).get("canonical"))
+            except ValueError:
+                continue
+            if profile not in (None, signed_profile):
+                continue
+            signature_ok = verify_signature(stored_message, signature)
+            timer.mark("signature")
+            if signature_ok:
+                details["payload"] = "registry"
+                return canon, canonical_hash, None
+            forged = True
+        if forged:
+            return "Invalid signature (forged or wrong key)"
+
+    return "No metadata found in image and no registered signature matches its content"
+
+def check_canonical(canon, stored_hash, timings=None, details=None):
+    """
+    Compare a canonical image with the signed hash.
+    
+    Args:
+        canon: Canonical 256x256 image
+        stored_hash: Hash from the signed message
+        timings: Optional dict that receives seconds spent hashing
+        details: Optional dict that receives the recomputed canonical_hash
+    
+    Returns:
+        Tuple of (is_valid: bool, reason: str)
+    """
+    timer = _StageTimer(timings)
+    
+    # Compute hash from pixel data
+    recomputed_hash = sha256_hash(canon.tobytes())
+    timer.mark("hash")
+    if details is not None:
+        details["canonical_hash"] = recomputed_hash
 
-    # 2️⃣ Compare hashes
+    # 3️⃣ Compare hashes
     if stored_hash != recomputed_hash:
         return False, "Image content mismatch"
 
     return True, "Image is authentic"
+
+def verify_image(image_path, signature_path=None, timings=None, details=None):
+    """
+    Verify image authenticity by extracting metadata from image itself.
+    If signature_path is provided, it will be used as fallback; otherwise
+    images without metadata are looked up in the signature registry.
+    The embedded payload and signature are checked before any pixels are
+    decoded, so files without a valid payload are rejected cheaply.
+    
+    Args:
+        image_path: Path to image file
+        signature_path: Optional path to signature JSON file (for backward compatibility)
+        timings: Optional dict that receives seconds spent per stage
+            (decode, canonicalize, hash, extract, signature)
+        details: Optional dict that receives the recomputed canonical_hash
+            (only set once pixels were decoded and hashed) and the payload
+            source (see load_signed_image)
+        
+    Returns:
+        Tuple of (is_valid: bool, reason: str)
+    """
+    with metrics.file_labels(image_path), metrics.stage("verify"):
+        return _verify_image(image_path, signature_path, timings, details)
+
+def _verify_image(image_path, signature_path, timings, details):
+    loaded = load_signed_image(image_path, signature_path, timings, details)
+    if isinstance(loaded, str):
+        return False, loaded
+    img, stored_hash, profile = loaded
+
+    timer = _StageTimer(timings)
+    canon = img if profile is None else canonicalize(img, profile)
+    timer.mark("canonicalize")
+
+    return check_canonical(canon, stored_hash, timings, details)
@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+BACK_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# The image and video pipelines use the same top-level package names, so
+# each gets its own pool whose workers only have that pipeline on sys.path
+PIPELINE_ROOTS = {
+    "image": os.path.join(BACK_ROOT, "image"),
+    "video": os.path.join(BACK_ROOT, "video"),
+}
+UPLOAD_SUFFIXES = {"image": ".img", "video": ".mp4"}
+
+# Largest accepted upload per media kind
+MAX_UPLOAD_BYTES = {"image": 64 * 1024 * 1024, "video": 1024 * 1024 * 1024}
+
+# Bytes read from the socket per step; at most this much of a body is held
+# in memory per request, the rest goes straight to a temporary file
+READ_CHUNK_SIZE = 64 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+# Seconds a request may wait for a free slot before getting 503
+QUEUE_TIMEOUT_SECONDS = 10.0
+
+# Seconds a single body read may stall once a request holds a slot;
+# slower clients get 408 so a stalled upload cannot hold its slot forever
+READ_TIMEOUT_SECONDS = 30.0
+
+# After rejecting an upload, its body is read and dropped for up to this
+# long so the client sees the response instead of a connection reset
+DISCARD_TIMEOUT_SECONDS = 5.0
+
+_STATUS_TEXT = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+def _init_worker(kind):
+    """
+    Pool initializer: import the pipeline and load its keys once per worker,
+    so requests never pay for OpenCV import or key parsing.
+    """
+    sys.path.insert(0, PIPELINE_ROOTS[kind])
+    import cv2  # noqa: F401
+    import verify.cache  # noqa: F401
+    from signing.keyring import get_keyring
+    get_keyring().key_ids()
+
+def _ping():
+    return os.getpid()
+
+def _verify_in_worker(kind, path):
+    """Worker: verify one uploaded file through the pipeline's result cache."""
+    details = {}
+    start = time.perf_counter()
+    if kind == "image":
+        from verify.cache import cached_verify_image
+        valid, reason = cached_verify_image(path, details=details)
+    else:
+        from verify.cache import cached_verify_video
+        valid, reason = cached_verify_video(path, details=details)
+    return {
+        "valid": valid,
+        "reason": reason,
+        "canonical_hash": details.get("canonical_hash"),
+        "cached": details.get("cached", False),
+        "seconds": round(time.perf_counter() - start, 6)
+    }
+
+class HttpError(Exception):
+    def __init__(self, status, message, unread=0):
+        super().__init__(message)
+        self.status = status
+        self.unread = unread  # request body bytes not consumed yet
+
+class VerifyServer:
+    """
+    Asyncio HTTP front end for image and video verification.
+
+    Endpoints:
+        POST /verify/image, POST /verify/video: request body is the raw file;
+            responds with JSON {valid, reason, canonical_hash, cached, seconds}
+        GET /health: pool sizes and in-flight counts
+
+    Uploads are streamed to a temporary file in READ_CHUNK_SIZE steps.
+    Decoding and canonicalization run in pre-warmed process pools. Each
+    kind admits at most `max_in_flight` requests at once; the body of a
+    waiting request is not read until it is admitted, so TCP flow control
+    pushes back on clients, and requests that wait longer than
+    QUEUE_TIMEOUT_SECONDS get 503. An admitted upload that sends nothing
+    for READ_TIMEOUT_SECONDS gets 408 and frees its slot.
+    """
+
+    def __init__(self, image_workers=None, video_workers=None, max_in_flight=None, upload_dir=None):
+        cpus = os.cpu_count() or 1
+        self.workers = {"image": image_workers or cpus, "video": video_workers or max(1, cpus // 2)}
+        self.max_in_flight = max_in_flight
+        self.upload_dir = upload_dir
+        self.pools = {}
+        self.slots = {}
+        self.stats = {kind: {"in_flight": 0, "completed": 0, "rejected": 0} for kind in PIPELINE_ROOTS}
+
+    async def start(self, host="127.0.0.1", port=8080):
+        loop = asyncio.get_running_loop()
+        for kind, workers in self.workers.items():
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(kind,))
+            # Start every worker now instead of on the first request
+            await asyncio.gather(*(loop.run_in_executor(pool, _ping) for _ in range(workers)))
+            self.pools[kind] = pool
+            self.slots[kind] = asyncio.Semaphore(self.max_in_flight or workers * 2)
+
+        self.server = await asyncio.start_server(self._handle, host, port, limit=MAX_HEADER_BYTES)
+        return self.server
+
+    def close(self):
+        self.server.close()
+        for pool in self.pools.values():
+            pool.shutdown(cancel_futures=True)
+
+    async def _handle(self, reader, writer):
+        unread = 0
+        try:
+            try:
+                status, body = await self._dispatch(reader)
+            except HttpError as e:
+                status, body, unread = e.status, {"error": str(e)}, e.unread
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                status, body = 400, {"error": "Malformed request"}
+            except Exception as e:
+                status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+            await self._respond(writer, status, body)
+            if unread:
+                await self._discard(reader, unread)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _discard(self, reader, remaining):
+        """Drop an unread request body, chunk by chunk, within DISCARD_TIMEOUT_SECONDS."""
+        async def drain():
+            nonlocal remaining
+            while remaining > 0:
+                chunk = await reader.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+        try:
+            await asyncio.wait_for(drain(), DISCARD_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _respond(self, writer, status, body):
+        payload = b"" if body is None else json.dumps(body).encode()
+        headers = [
+            f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(payload)}",
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+            "Access-Control-Allow-Headers: Content-Type",
+            "Connection: close",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + payload)
+        await writer.drain()
+
+    async def _dispatch(self, reader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        path = urlsplit(target).path
+        if method == "OPTIONS":
+            return 204, None
+        if path == "/health":
+            if method != "GET":
+                raise HttpError(405, "Use GET")
+            return 200, {"status": "ok", "workers": self.workers, "requests": self.stats}
+
+        kind = {"/verify/image": "image", "/verify/video": "video"}.get(path)
+        if kind is None:
+            raise HttpError(404, f"Unknown path: {path}")
+        if method != "POST":
+            raise HttpError(405, "Use POST with the file as the request body")
+        return 200, await self._verify_upload(kind, reader, headers)
+
+    async def _verify_upload(self, kind, reader, headers):
+        if "content-length" not in headers:
+            raise HttpError(411, "Content-Length is required")
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length <= 0:
+            raise HttpError(400, "Empty upload")
+        if length > MAX_UPLOAD_BYTES[kind]:
+            raise HttpError(413, f"Upload exceeds {MAX_UPLOAD_BYTES[kind]} bytes", unread=length)
+
+        stats = self.stats[kind]
+        slots = self.slots[kind]
+        try:
+            await asyncio.wait_for(slots.acquire(), QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            stats["rejected"] += 1
+            raise HttpError(503, "Server busy, retry later", unread=length)
+
+        stats["in_flight"] += 1
+        fd, upload_path = tempfile.mkstemp(suffix=UPLOAD_SUFFIXES[kind], dir=self.upload_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                remaining = length
+                while remaining:
+                    try:
+                        chunk = await asyncio.wait_for(reader.read(min(READ_CHUNK_SIZE, remaining)), READ_TIMEOUT_SECONDS)
+                    except asyncio.TimeoutError:
+                        raise HttpError(408, "Upload stalled")
+                    if not chunk:
+                        raise HttpError(400, "Upload ended early")
+                    f.write(chunk)
+                    remaining -= len(chunk)
+
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.pools[kind], _verify_in_worker, kind, upload_path)
+            stats["completed"] += 1
+            return result
+        finally:
+            stats["in_flight"] -= 1
+            slots.release()
+            os.remove(upload_path)
+
+async def serve(host, port, **kwargs):
+    server = VerifyServer(**kwargs)
+    await server.start(host, port)
+    print(f"✅ Verification service listening on http://{host}:{port}")
+    try:
+        async with server.server:
+            await server.server.serve_forever()
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TrueShot verification HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--image-workers", type=int, default=None, help="Image worker processes (default: CPU count)")
+    parser.add_argument("--video-workers", type=int, default=None, help="Video worker processes (default: half the CPUs)")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Admitted requests per kind (default: 2 per worker)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(
+            args.host,
+            args.port,
+            image_workers=args.image_workers,
+            video_workers=args.video_workers,
+            max_in_flight=args.max_in_flight
+        ))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,41 @@
+import numpy as np
+
+class FrameAccumulator:
+    """
+    Running per-second frame sum.
+
+    Frames are added into a single preallocated integer buffer as they are
+    decoded, so memory stays at one frame regardless of fps. The integer sum
+    is exact, so the finalized average is bit-identical to
+    np.mean(frames, axis=0).astype(np.uint8).
+    """
+
+    def __init__(self):
+        self._sum = None
+        self._mean = None
+        self.count = 0
+
+    def add(self, frame):
+        """Add one uint8 frame to the running sum."""
+        if self.count == 0 and (self._sum is None or self._sum.shape != frame.shape):
+            self._sum = np.zeros(frame.shape, dtype=np.uint32)
+            self._mean = np.empty(frame.shape, dtype=np.float64)
+        if self.count == 0:
+            np.copyto(self._sum, frame)
+        else:
+            np.add(self._sum, frame, out=self._sum)
+        self.count += 1
+
+    def average(self):
+        """
+        Finalize the average of the accumulated frames and reset the count.
+
+        Returns:
+            uint8 frame, or None if no frames were added
+        """
+        if self.count == 0:
+            return None
+        np.true_divide(self._sum, self.count, out=self._mean)
+        averaged = self._mean.astype(np.uint8)
+        self.count = 0
+        return averaged
@@ -0,0 +1,125 @@
+import functools
+import re
+import shutil
+import subprocess
+
+import numpy as np
+
+from utils.constants import CANONICAL_FRAME_SIZE, FFMPEG_BINARY, FFMPEG_DECODE_THREADS
+
+# Optional: a bundled ffmpeg binary when none is installed
+try:
+    import imageio_ffmpeg
+    HAS_IMAGEIO_FFMPEG = True
+except ImportError:
+    HAS_IMAGEIO_FFMPEG = False
+
+# Scale and pixel format of the ffmpeg-area-v1 profile. These decide the
+# canonical pixels, so any change here needs a new profile version.
+# bitexact/accurate_rnd keep swscale off CPU-specific approximations
+SCALE_FILTER = "scale={width}:{height}:flags=area+accurate_rnd+bitexact,format=bgr24"
+
+def find_ffmpeg():
+    """
+    Locate the ffmpeg binary: FFMPEG_BINARY, then PATH, then imageio-ffmpeg.
+
+    Raises:
+        ValueError: If no ffmpeg is available
+    """
+    if FFMPEG_BINARY:
+        return FFMPEG_BINARY
+    found = shutil.which("ffmpeg")
+    if found:
+        return found
+    if HAS_IMAGEIO_FFMPEG:
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    raise ValueError("ffmpeg is required for the ffmpeg-area-v1 profile but was not found")
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_build():
+    """
+    Version of the ffmpeg binary and of its libswscale.
+
+    ffmpeg-area-v1 pixels are only reproducible with the same scaler, so
+    captures record this under "decoder" in the signed parameters.
+
+    Returns:
+        Dict with "ffmpeg" and "swscale" version strings
+
+    Raises:
+        ValueError: If no ffmpeg is available or its version cannot be read
+    """
+    try:
+        output = subprocess.run(
+            [find_ffmpeg(), "-hide_banner", "-version"], capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise ValueError(f"Cannot run ffmpeg: {e}")
+    version = re.search(r"^ffmpeg version (\S+)", output, re.MULTILINE)
+    swscale = re.search(r"^libswscale\s+(\d+)\.\s*(\d+)\.\s*(\d+)", output, re.MULTILINE)
+    if not version or not swscale:
+        raise ValueError("Cannot read the ffmpeg version")
+    return {"ffmpeg": version.group(1), "swscale": ".".join(swscale.groups())}
+
+class FfmpegFrameReader:
+    """
+    Frame reader with the read() / grab() / release() interface of
+    cv2.VideoCapture, backed by an ffmpeg process.
+
+    ffmpeg decodes with its own thread pool and scales every frame to
+    256x256 BGR before it leaves the decoder, so full-resolution frames
+    never reach Python. Frames are read from the pipe straight into one
+    reused buffer; read() returns that buffer, valid until the next call.
+    """
+
+    def __init__(self, video_path, start_frame=0, threads=FFMPEG_DECODE_THREADS):
+        """
+        Args:
+            video_path: Path to video file
+            start_frame: Index of the first frame to return (frames before
+                it are decoded but dropped before scaling)
+            threads: Decoder threads (0 lets ffmpeg choose)
+        """
+        width, height = CANONICAL_FRAME_SIZE
+        filters = []
+        if start_frame:
+            filters.append(f"select=gte(n\\,{start_frame})")
+        filters.append(SCALE_FILTER.format(width=width, height=height))
+
+        command = [
+            find_ffmpeg(), "-nostdin", "-loglevel", "error",
+            "-threads", str(threads), "-i", str(video_path),
+            "-map", "0:v:0", "-vf", ",".join(filters),
+            # One output frame per decoded frame (no duplication or dropping)
+            "-fps_mode", "passthrough",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1",
+        ]
+        self._process = subprocess.Popen(
+            command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        self._frame = np.empty((height, width, 3), dtype=np.uint8)
+        self._view = memoryview(self._frame).cast("B")
+
+    def _next(self):
+        filled = 0
+        size = len(self._view)
+        while filled < size:
+            got = self._process.stdout.readinto(self._view[filled:])
+            if not got:
+                return False
+            filled += got
+        return True
+
+    def grab(self):
+        return self._next()
+
+    def read(self):
+        if not self._next():
+            return False, None
+        return True, self._frame
+
+    def release(self):
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.stdout.close()
+        self._process.wait()
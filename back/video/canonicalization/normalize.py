@@ -12,3 +12,49 @@ def normalize_brightness(img):
 
     ycrcb_norm = cv2.merge([y, cr, cb])
     return cv2.cvtColor(ycrcb_norm, cv2.COLOR_YCrCb2BGR)
+
+def stretch_luminance(img):
+    """
+    Fused min/max luminance stretch (resize-first profile).
+
+    Computes luma once, maps it through a 256-entry LUT of per-level
+    offsets and adds the offset to all three channels. Equivalent in intent
+    to normalize_brightness but without the YCrCb round trip; the exact
+    output differs, so it is only used by the profile that signs it.
+    """
+    y = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    lo, hi, _, _ = cv2.minMaxLoc(y)
+
+    out = img.astype(np.int16)
+    out += luminance_offsets(lo, hi)[y][:, :, None]
+    return np.clip(out, 0, 255).astype(np.uint8)
+
+def luminance_offsets(lo, hi):
+    """
+    Per-level offsets of the resize-first luminance stretch.
+
+    Same mapping as cv2.normalize(NORM_MINMAX): a flat image maps to 0.
+
+    Returns:
+        int16 array of 256 offsets to add to each channel
+    """
+    levels = np.arange(256, dtype=np.float64)
+    scale = 255.0 / (hi - lo) if hi > lo else 0.0
+    stretched = np.clip(np.rint((levels - lo) * scale), 0, 255)
+    return (stretched - levels).astype(np.int16)
+
+def normalize_lut(lo, hi):
+    """
+    Lookup table reproducing normalize_brightness's luminance mapping for
+    an image whose luma spans [lo, hi].
+
+    Runs cv2.normalize itself over the levels clamped to [lo, hi], so the
+    table has the same min/max and goes through the same conversion code,
+    and applying it is bit-identical to normalizing the image. Entries
+    outside [lo, hi] are never looked up.
+
+    Returns:
+        uint8 array of 256 levels
+    """
+    levels = np.clip(np.arange(256), lo, hi).astype(np.uint8).reshape(1, 256)
+    return cv2.normalize(levels, None, alpha=0, beta=255, norm_type=cv2.NORM_MINMAX).reshape(256)
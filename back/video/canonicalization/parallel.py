@@ -0,0 +1,91 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from utils.constants import CANONICAL_PROFILE_DECODER_SCALE
+from .combine import combine_seconds
+from .process_video import iter_canonical_seconds, open_video, profile_from_params, sampling_from_params
+
+# Clips shorter than this many seconds per worker are processed serially;
+# the per-worker seek and process start-up would cost more than it saves
+MIN_SECONDS_PER_SEGMENT = 2
+
+def split_segments(total_seconds, workers):
+    """
+    Split [0, total_seconds) into contiguous second-aligned ranges.
+
+    The last range is open-ended (None) so frames past the container's
+    reported frame count are still read.
+    """
+    count = max(1, min(workers, total_seconds // MIN_SECONDS_PER_SEGMENT))
+    bounds = [round(i * total_seconds / count) for i in range(count + 1)]
+    segments = [(bounds[i], bounds[i + 1]) for i in range(count)]
+    segments[-1] = (segments[-1][0], None)
+    return segments
+
+def _process_segment(video_path, canonical, start_second, end_second):
+    """Worker: decode one segment and return its canonical per-second frames."""
+    return list(iter_canonical_seconds(video_path, canonical, start_second, end_second))
+
+def iter_canonical_seconds_parallel(video_path, canonical=None, workers=None):
+    """
+    Yield canonical per-second frames like iter_canonical_seconds, decoding
+    second-aligned segments in worker processes.
+
+    Each worker seeks to its own range and canonicalizes its seconds; the
+    segments are yielded in order as they finish, so the sequence is
+    identical to the serial one.
+
+    Args:
+        video_path: Path to video file
+        canonical: Canonicalization parameters from the signed message
+        workers: Number of worker processes (defaults to os.cpu_count())
+
+    Yields:
+        uint8 frames of shape (256, 256, 3), in order
+    """
+    # Reject unsupported versions and profiles before starting workers
+    sampling_from_params(canonical)
+    if profile_from_params(canonical) == CANONICAL_PROFILE_DECODER_SCALE:
+        # ffmpeg already decodes with its own threads, and a worker could
+        # only reach its segment by decoding everything before it
+        yield from iter_canonical_seconds(video_path, canonical)
+        return
+    workers = workers or os.cpu_count() or 1
+
+    cap, fps = open_video(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    total_seconds = int(math.ceil(frame_count / fps)) if frame_count > 0 else 0
+    segments = split_segments(total_seconds, workers) if total_seconds else []
+    if len(segments) < 2:
+        yield from iter_canonical_seconds(video_path, canonical)
+        return
+
+    produced = False
+    with ProcessPoolExecutor(max_workers=len(segments)) as executor:
+        futures = [
+            executor.submit(_process_segment, video_path, canonical, start, end)
+            for start, end in segments
+        ]
+        for future in futures:
+            for frame in future.result():
+                produced = True
+                yield frame
+
+    if not produced:
+        raise ValueError("No frames extracted from video")
+
+def process_video_file_parallel(video_path, canonical=None, workers=None):
+    """
+    Process video file like process_video_file, decoding second-aligned
+    segments in worker processes (see iter_canonical_seconds_parallel).
+
+    Returns:
+        Combined canonicalized matrix representing all seconds
+    """
+    # Combine all seconds into a single matrix
+    return combine_seconds(list(iter_canonical_seconds_parallel(video_path, canonical, workers)))
@@ -1,31 +1,58 @@
-import numpy as np
-from .normalize import normalize_brightness
+from utils import metrics
+from utils.constants import (
+    CANONICAL_FRAME_SIZE,
+    CANONICAL_PROFILE_DECODER_SCALE,
+    CANONICAL_PROFILE_NORMALIZE_FIRST,
+    CANONICAL_PROFILE_RESIZE_FIRST,
+)
+from .normalize import normalize_brightness, stretch_luminance
 from .resize import resize_image
+from .batch import canonicalize_batch
 from .combine import combine_seconds
 
-def canonicalize(frames_per_second):
+@metrics.timed("canonicalize")
+def canonicalize_frame(frame, profile=CANONICAL_PROFILE_NORMALIZE_FIRST):
+    """
+    Canonicalize a single second's representative frame (normalize + resize).
+
+    The resize-first profile downscales first and stretches luminance on
+    the 256x256 frame instead. With ffmpeg-area-v1 the frame was already
+    scaled by the decoder, so only the luminance stretch remains.
+    """
+    if profile == CANONICAL_PROFILE_DECODER_SCALE:
+        if frame.shape[:2] != CANONICAL_FRAME_SIZE:
+            raise ValueError("ffmpeg-area-v1 frames must be scaled to 256x256 by the decoder")
+        return stretch_luminance(frame)
+    if profile == CANONICAL_PROFILE_RESIZE_FIRST:
+        return stretch_luminance(resize_image(frame))
+
+    normalized = normalize_brightness(frame)
+    return resize_image(normalized)
+
+def canonicalize(frames_per_second, profile=CANONICAL_PROFILE_NORMALIZE_FIRST):
     """
     Canonicalize video by:
     1. Normalizing brightness for each second's frame
     2. Resizing each frame
     3. Combining all seconds into a single matrix
     
+    All seconds are canonicalized as one (N, H, W, 3) batch, with the same
+    result as canonicalize_frame on each.
+    
     Args:
         frames_per_second: List of frames, one per second
+        profile: Canonical profile
         
     Returns:
         Combined canonicalized video matrix
     """
-    normalized_frames = []
+    if not len(frames_per_second):
+        raise ValueError("No frames to combine")
     
-    for frame in frames_per_second:
-        # Normalize brightness for each second's representative frame
-        normalized = normalize_brightness(frame)
-        # Resize each frame
-        resized = resize_image(normalized)
-        normalized_frames.append(resized)
+    # Normalize brightness and resize every second's representative frame at once
+    normalized_frames = canonicalize_batch(frames_per_second, profile)
     
     # Combine all seconds into a single matrix
-    combined_matrix = combine_seconds(normalized_frames)
+    combined_matrix = combine_seconds(list(normalized_frames))
     
     return combined_matrix
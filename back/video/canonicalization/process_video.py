@@ -1,65 +1,384 @@
+import math
+
 import cv2
-import numpy as np
-from .pipeline import canonicalize
+from utils import metrics
+from utils.constants import (
+    CANONICAL_PROFILE_DECODER_SCALE,
+    CANONICAL_PROFILE_NORMALIZE_FIRST,
+    CANONICAL_PROFILE_RESIZE_FIRST,
+    CANONICAL_VERSION_FULL,
+    CANONICAL_VERSION_SAMPLED,
+)
+from .accumulate import FrameAccumulator
+from .combine import combine_seconds
+from .ffmpeg_source import FfmpegFrameReader, ffmpeg_build
+from .pipeline import canonicalize_frame
+
+# Relative fps difference still treated as the same rate by
+# LiveCanonicalizer.matches_file (container timebase rounding)
+FPS_MATCH_TOLERANCE = 1e-4
 
-def process_video_file(video_path):
+def canonical_params(samples_per_second=None, profile=CANONICAL_PROFILE_NORMALIZE_FIRST):
     """
-    Process video file to extract frames per second, canonicalize, and combine.
-    
+    Build the canonicalization parameters recorded in the signed message.
+
     Args:
-        video_path: Path to video file
-        
+        samples_per_second: Frames averaged per second, or None to average every frame
+        profile: Canonical profile (order of normalize and resize)
+
     Returns:
-        Combined canonicalized matrix representing all seconds
+        Parameter dict, or None for the legacy full-average normalize-first version
+
+    Raises:
+        ValueError: For ffmpeg-area-v1 when ffmpeg is not available
     """
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError(f"Failed to open video file: {video_path}")
-    
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    if fps <= 0:
-        fps = 30  # Default fallback
-    
-    frames_per_second = []
+    profile_from_params({"profile": profile})  # reject unknown profiles
+    if samples_per_second is None:
+        if profile == CANONICAL_PROFILE_NORMALIZE_FIRST:
+            return None
+        canonical = {"version": CANONICAL_VERSION_FULL}
+    else:
+        if int(samples_per_second) <= 0:
+            raise ValueError("samples_per_second must be a positive integer")
+        canonical = {
+            "version": CANONICAL_VERSION_SAMPLED,
+            "samples_per_second": int(samples_per_second)
+        }
+    # Omitted for the legacy profile so those messages stay unchanged
+    if profile != CANONICAL_PROFILE_NORMALIZE_FIRST:
+        canonical["profile"] = profile
+    # ffmpeg-area-v1 pixels depend on the scaler build; recorded so a
+    # verifier with a different ffmpeg can say why hashes differ
+    if profile == CANONICAL_PROFILE_DECODER_SCALE:
+        canonical["decoder"] = ffmpeg_build()
+    return canonical
+
+def decoder_mismatch(canonical):
+    """
+    Explain a likely cause of a content mismatch for ffmpeg-area-v1 videos.
+
+    Args:
+        canonical: Canonicalization parameters from the signed message
+
+    Returns:
+        Note naming both ffmpeg builds if the signed one differs from the
+        local one, else None
+    """
+    signed = (canonical or {}).get("decoder")
+    if not signed or profile_from_params(canonical) != CANONICAL_PROFILE_DECODER_SCALE:
+        return None
+    try:
+        local = ffmpeg_build()
+    except ValueError:
+        return None
+    if signed == local:
+        return None
+    return (
+        f"signed with ffmpeg {signed.get('ffmpeg')} (swscale {signed.get('swscale')}), "
+        f"verified with ffmpeg {local['ffmpeg']} (swscale {local['swscale']}); "
+        "ffmpeg-area-v1 needs the same ffmpeg build"
+    )
+
+def profile_from_params(canonical):
+    """
+    Read the canonical profile from signed canonicalization parameters.
+
+    Args:
+        canonical: Parameter dict from the signed message, or None
+
+    Returns:
+        Profile name (normalize-first when absent)
+    """
+    profile = (canonical or {}).get("profile", CANONICAL_PROFILE_NORMALIZE_FIRST)
+    if profile not in (CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST,
+                       CANONICAL_PROFILE_DECODER_SCALE):
+        raise ValueError(f"Unsupported canonical profile: {profile}")
+    return profile
+
+def sampling_from_params(canonical):
+    """
+    Read the per-second sample count from signed canonicalization parameters.
+
+    Args:
+        canonical: Parameter dict from the signed message, or None
+
+    Returns:
+        Number of frames to average per second, or None to average every frame
+    """
+    if not canonical:
+        return None
+    version = canonical.get("version", CANONICAL_VERSION_FULL)
+    if version == CANONICAL_VERSION_FULL:
+        return None
+    if version == CANONICAL_VERSION_SAMPLED:
+        return int(canonical["samples_per_second"])
+    raise ValueError(f"Unsupported canonicalization version: {version}")
+
+def fit_sampling(canonical, fps):
+    """
+    Clamp the signed per-second sample count to what a video of `fps` has.
+
+    A second holds at most int(fps) whole frames (at least one), so a
+    larger count could not be honoured; captures sign the clamped value.
+
+    Args:
+        canonical: Canonicalization parameters (see canonical_params)
+        fps: Frame rate of the recording
+
+    Returns:
+        The parameters, with samples_per_second lowered if needed
+    """
+    samples_per_second = sampling_from_params(canonical)
+    limit = max(int(fps), 1)
+    if samples_per_second is None or samples_per_second <= limit:
+        return canonical
+    return dict(canonical, samples_per_second=limit)
+
+def sample_offsets(fps, samples_per_second):
+    """
+    Frame offsets within a second that are decoded when sampling.
+
+    Offsets are spaced evenly over the nominal fps, so the same frames are
+    picked on capture and verify for a given file.
+
+    Raises:
+        ValueError: If the video has fewer frames per second than
+            samples_per_second (offsets would repeat, so fewer frames would
+            be averaged than the signed count says)
+    """
+    step = fps / samples_per_second
+    offsets = frozenset(int(j * step) for j in range(samples_per_second))
+    if len(offsets) < samples_per_second:
+        raise ValueError(f"Cannot sample {samples_per_second} frames per second from a {fps:g} fps video")
+    return offsets
+
+def iter_second_frames(cap, fps, samples_per_second=None, start_frame=0, end_second=None):
+    """
+    Yield one representative (averaged) frame per second of video.
+
+    Frames are summed into a FrameAccumulator as they are decoded, so only
+    one frame plus the running sum is held in memory at a time. When
+    samples_per_second is set, only those evenly spaced frames are decoded
+    with read(); the rest are skipped with grab() and never retrieved.
+
+    Args:
+        cap: Opened cv2.VideoCapture
+        fps: Frames per second used to bucket frames into seconds
+        samples_per_second: Frames averaged per second, or None for all frames
+        start_frame: Index of the frame the capture is positioned at
+            (must be the first frame of a second)
+        end_second: Stop before this second, or None to read to the end
+
+    Yields:
+        Averaged uint8 frame for each second, in order
+    """
+    offsets = sample_offsets(fps, samples_per_second) if samples_per_second else None
+    accumulator = FrameAccumulator()
     current_second = -1
-    frames_in_current_second = []
-    
-    frame_number = 0
-    
+    second_start = start_frame
+    frame_number = start_frame
+
     while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
         # Calculate which second this frame belongs to
         frame_second = int(frame_number / fps)
-        
+        if end_second is not None and frame_second >= end_second:
+            break
+
         if frame_second != current_second:
-            # We've moved to a new second
-            if frames_in_current_second:
-                # Average frames in the previous second to get representative frame
-                second_matrix = np.mean(frames_in_current_second, axis=0).astype(np.uint8)
-                frames_per_second.append(second_matrix)
-            
+            # We've moved to a new second: finalize the previous one
+            if accumulator.count:
+                metrics.count("frames_decoded", accumulator.count)
+                yield accumulator.average()
             current_second = frame_second
-            frames_in_current_second = [frame]
-        else:
-            frames_in_current_second.append(frame)
-        
+            second_start = frame_number
+
+        if offsets is None or (frame_number - second_start) in offsets:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            accumulator.add(frame)
+        elif not cap.grab():
+            break
+
         frame_number += 1
-    
-    cap.release()
-    
+
     # Handle the last second if we have frames
-    if frames_in_current_second:
-        second_matrix = np.mean(frames_in_current_second, axis=0).astype(np.uint8)
-        frames_per_second.append(second_matrix)
-    
-    if not frames_per_second:
+    if accumulator.count:
+        metrics.count("frames_decoded", accumulator.count)
+        yield accumulator.average()
+
+def open_video(video_path):
+    """
+    Open a video file for decoding.
+
+    Returns:
+        Tuple of (cv2.VideoCapture, fps)
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Failed to open video file: {video_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if fps <= 0:
+        fps = 30  # Default fallback
+
+    return cap, fps
+
+def first_frame_of_second(second, fps):
+    """Index of the first frame that process_video_file buckets into `second`."""
+    frame = max(int(math.ceil(second * fps)), 0)
+    while int(frame / fps) < second:
+        frame += 1
+    while frame > 0 and int((frame - 1) / fps) >= second:
+        frame -= 1
+    return frame
+
+def seek_to_frame(cap, video_path, start_frame):
+    """
+    Position the capture at start_frame.
+
+    Falls back to grabbing forward from a fresh capture when the backend
+    cannot seek frame-accurately, so decoded ranges never drift.
+
+    Returns:
+        The positioned cv2.VideoCapture (may be a new object)
+    """
+    if start_frame == 0:
+        return cap
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == start_frame:
+        return cap
+
+    cap.release()
+    cap, _ = open_video(video_path)
+    for _ in range(start_frame):
+        if not cap.grab():
+            break
+    return cap
+
+def iter_canonical_seconds(video_path, canonical=None, start_second=0, end_second=None):
+    """
+    Yield the canonical 256x256 frame of each second as soon as it is produced.
+
+    Concatenating the yielded frames' bytes gives exactly the bytes of
+    process_video_file's combined matrix, so they can be fed straight into
+    an incremental hash without building the matrix.
+
+    Args:
+        video_path: Path to video file
+        canonical: Canonicalization parameters from the signed message
+            (see canonical_params); None averages every frame
+        start_second: First second to decode (the capture seeks straight to it)
+        end_second: Stop before this second, or None to read to the end
+
+    Yields:
+        C-contiguous uint8 frames of shape (256, 256, 3), in order
+
+    Raises:
+        ValueError: If the video cannot be opened or yields no frames
+            (a range starting past the end simply yields nothing)
+    """
+    samples_per_second = sampling_from_params(canonical)
+    profile = profile_from_params(canonical)
+
+    cap, fps = open_video(video_path)
+    start_frame = first_frame_of_second(start_second, fps)
+    produced = False
+    try:
+        if profile == CANONICAL_PROFILE_DECODER_SCALE:
+            # OpenCV only supplies the frame rate; ffmpeg decodes and scales
+            cap.release()
+            cap = FfmpegFrameReader(video_path, start_frame)
+        else:
+            cap = seek_to_frame(cap, video_path, start_frame)
+        for frame in iter_second_frames(cap, fps, samples_per_second, start_frame, end_second):
+            produced = True
+            yield canonicalize_frame(frame, profile)
+    finally:
+        cap.release()
+
+    if not produced and start_second == 0:
         raise ValueError("No frames extracted from video")
-    
-    # Canonicalize: normalize, resize, and combine all seconds
-    combined_matrix = canonicalize(frames_per_second)
-    
-    return combined_matrix
 
+class LiveCanonicalizer:
+    """
+    Push-based counterpart of iter_canonical_seconds for frames that arrive
+    one at a time, e.g. tee'd from the camera while they are being recorded.
+
+    Uses the same per-second bucketing, sampling and averaging, so for a
+    lossless recording the canonical seconds equal those obtained by
+    re-decoding the written file. Implements the frame sink interface of
+    capture.camera.capture_video (start / add / finish).
+    """
+
+    def __init__(self, canonical=None, on_second=None):
+        """
+        Args:
+            canonical: Canonicalization parameters (see canonical_params);
+                after start(), self.canonical holds them with the sample
+                count fitted to the frame rate (see fit_sampling)
+            on_second: Optional callback for each canonical second; by
+                default seconds are collected in self.seconds
+        """
+        self.canonical = canonical
+        self.samples_per_second = sampling_from_params(canonical)
+        self.profile = profile_from_params(canonical)
+        if self.profile == CANONICAL_PROFILE_DECODER_SCALE:
+            raise ValueError("The ffmpeg-area-v1 profile scales in the decoder and needs the recorded file")
+        self.seconds = []
+        self.on_second = on_second or self.seconds.append
+        self.fps = None
+
+    def start(self, fps):
+        self.fps = fps
+        self.canonical = fit_sampling(self.canonical, fps)
+        self.samples_per_second = sampling_from_params(self.canonical)
+        self._offsets = sample_offsets(fps, self.samples_per_second) if self.samples_per_second else None
+        self._accumulator = FrameAccumulator()
+        self._current_second = -1
+        self._second_start = 0
+        self._frame_number = 0
+
+    def add(self, frame):
+        # Calculate which second this frame belongs to
+        frame_second = int(self._frame_number / self.fps)
+        if frame_second != self._current_second:
+            self._emit()
+            self._current_second = frame_second
+            self._second_start = self._frame_number
+
+        if self._offsets is None or (self._frame_number - self._second_start) in self._offsets:
+            self._accumulator.add(frame)
+        self._frame_number += 1
+
+    def finish(self):
+        self._emit()
+
+    def _emit(self):
+        if self._accumulator.count:
+            self.on_second(canonicalize_frame(self._accumulator.average(), self.profile))
+
+    def matches_file(self, video_path):
+        """
+        Check that re-decoding video_path would bucket frames the same way
+        (the container must report the fps the frames were bucketed with).
+        """
+        cap, fps = open_video(video_path)
+        cap.release()
+        # Containers store fps as a rounded rational, so compare with a tolerance
+        return math.isclose(fps, self.fps, rel_tol=FPS_MATCH_TOLERANCE)
+
+def process_video_file(video_path, canonical=None):
+    """
+    Process video file to extract frames per second, canonicalize, and combine.
+
+    Args:
+        video_path: Path to video file
+        canonical: Canonicalization parameters from the signed message
+            (see canonical_params); None averages every frame
+
+    Returns:
+        Combined canonicalized matrix representing all seconds
+    """
+    # Combine all seconds into a single matrix
+    return combine_seconds(list(iter_canonical_seconds(video_path, canonical)))
@@ -1,8 +1,138 @@
 import cv2
-import time
 import os
+import queue
+import threading
+import time
+
+from utils import metrics
+from .sources import CameraSource
+
+_END = object()
+
+def record(source, output_path, duration_seconds=None, fourcc="mp4v", frame_sink=None,
+           queue_size=64, drop_when_full=None, progress=True, video_writer=None):
+    """
+    Record frames from a source with a reader thread and a writer thread.
+
+    The reader only pulls frames off the source and pushes them into a
+    bounded buffer; encoding happens on the writer thread, so a slow
+    encoder no longer stalls the camera. When the buffer is full the new
+    frame is dropped (and counted) instead of blocking the reader, unless
+    the source is not realtime (see drop_when_full).
 
-def capture_video(camera_id=0, duration_seconds=5, output_path=None):
+    Args:
+        source: Frame source with fps, width, height, read() and release()
+            (CameraSource, VideoFileSource, SyntheticSource)
+        output_path: Path to save the video file
+        duration_seconds: Stop reading after this long (None = until the source ends)
+        fourcc: Codec FourCC for the VideoWriter
+        frame_sink: Optional object with start(fps), add(frame) and finish();
+            every written frame is also passed to it (e.g. LiveCanonicalizer)
+        queue_size: Maximum number of frames buffered between the threads
+        drop_when_full: Drop frames when the buffer is full; otherwise the
+            reader waits (for offline sources where every frame matters).
+            None = drop only for realtime sources (source.realtime, True
+            when the source has no such attribute, like CameraSource)
+        progress: Print a line per recorded second
+        video_writer: Object with write(frame) and release() used instead of
+            a cv2.VideoWriter (e.g. storage/fragmented_mp4.py::FragmentedMp4Writer);
+            output_path and fourcc are then ignored
+
+    Returns:
+        Stats dict: frames_read, frames_written, frames_dropped, elapsed,
+        achieved_fps, read_fps, max_queue_depth, mean_queue_depth
+    """
+    if drop_when_full is None:
+        drop_when_full = getattr(source, "realtime", True)
+    fps = source.fps
+    out = video_writer or cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc), fps, (source.width, source.height))
+    if frame_sink is not None:
+        frame_sink.start(fps)
+
+    frames = queue.Queue(maxsize=queue_size)
+    stats = {
+        "frames_read": 0,
+        "frames_written": 0,
+        "frames_dropped": 0,
+        "max_queue_depth": 0,
+    }
+    depth_total = [0]
+    errors = []
+
+    def reader():
+        start_time = time.perf_counter()
+        try:
+            while True:
+                frame = source.read()
+                if frame is None:
+                    break
+                if duration_seconds is not None and time.perf_counter() - start_time >= duration_seconds:
+                    break
+                stats["frames_read"] += 1
+
+                depth = frames.qsize()
+                depth_total[0] += depth
+                stats["max_queue_depth"] = max(stats["max_queue_depth"], depth)
+
+                if drop_when_full:
+                    try:
+                        frames.put_nowait(frame)
+                    except queue.Full:
+                        stats["frames_dropped"] += 1
+                else:
+                    frames.put(frame)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            stats["read_elapsed"] = time.perf_counter() - start_time
+            frames.put(_END)
+
+    def writer():
+        second_frames = max(int(fps), 1)
+        while True:
+            frame = frames.get()
+            if frame is _END:
+                break
+            if errors:
+                continue  # drain so the reader is never blocked
+            try:
+                out.write(frame)
+                if frame_sink is not None:
+                    frame_sink.add(frame)
+            except Exception as e:
+                errors.append(e)
+                continue
+            stats["frames_written"] += 1
+            if progress and stats["frames_written"] % second_frames == 0:
+                print(f"Recorded {stats['frames_written'] // second_frames} seconds")
+
+    start_time = time.perf_counter()
+    threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=writer, daemon=True)]
+    with metrics.stage("capture"):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    elapsed = time.perf_counter() - start_time
+    metrics.count("frames_captured", stats["frames_written"])
+    metrics.count("frames_dropped", stats["frames_dropped"])
+
+    source.release()
+    out.release()
+    if frame_sink is not None:
+        frame_sink.finish()
+    if errors:
+        raise errors[0]
+
+    read_elapsed = stats.pop("read_elapsed")
+    stats["elapsed"] = elapsed
+    stats["achieved_fps"] = stats["frames_written"] / elapsed if elapsed > 0 else 0.0
+    stats["read_fps"] = stats["frames_read"] / read_elapsed if read_elapsed > 0 else 0.0
+    stats["mean_queue_depth"] = depth_total[0] / stats["frames_read"] if stats["frames_read"] else 0.0
+    return stats
+
+def capture_video(camera_id=0, duration_seconds=5, output_path=None, fourcc="mp4v", frame_sink=None,
+                  source=None, queue_size=64, drop_when_full=None):
     """
     Capture video for specified duration and save as video file.
     
@@ -10,54 +140,32 @@ def capture_video(camera_id=0, duration_seconds=5, output_path=None):
         camera_id: Camera device ID
         duration_seconds: Duration to record
         output_path: Path to save the video file (e.g., "storage/video.mp4")
+        fourcc: Codec FourCC for the VideoWriter
+        frame_sink: Optional object with start(fps), add(frame) and finish();
+            every written frame is also passed to it (e.g. LiveCanonicalizer)
+        source: Frame source to record instead of opening camera_id
+        queue_size: Frames buffered between the reader and writer threads
+        drop_when_full: Drop frames when the buffer is full (None = only for
+            realtime sources; see record)
     
     Returns:
         Path to the saved video file
     """
-    cap = cv2.VideoCapture(camera_id)
-    if not cap.isOpened():
-        raise RuntimeError("Camera not accessible")
-    
-    # Get camera properties
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    if fps <= 0:
-        fps = 30  # Default fallback
-    
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    if source is None:
+        source = CameraSource(camera_id)
     
     if output_path is None:
         output_path = "storage/video.mp4"
     
     # Ensure directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    # Define codec and create VideoWriter
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
     
     print(f"Recording {duration_seconds} seconds of video...")
-    start_time = time.time()
-    
-    frame_count = 0
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        elapsed = time.time() - start_time
-        if elapsed >= duration_seconds:
-            break
-        
-        out.write(frame)
-        frame_count += 1
-        
-        # Show progress
-        if frame_count % int(fps) == 0:
-            print(f"Recorded {int(elapsed) + 1}/{duration_seconds} seconds")
-    
-    cap.release()
-    out.release()
+    stats = record(source, output_path, duration_seconds, fourcc, frame_sink, queue_size, drop_when_full)
     
+    print(
+        f"Captured {stats['frames_written']} frames at {stats['achieved_fps']:.1f} fps "
+        f"(dropped {stats['frames_dropped']}, max queue depth {stats['max_queue_depth']})"
+    )
     print(f"✅ Video saved to {output_path}")
     return output_path
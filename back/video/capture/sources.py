@@ -0,0 +1,113 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+class CameraSource:
+    """Frames from a webcam (or anything cv2.VideoCapture can open)."""
+
+    def __init__(self, camera_id=0):
+        self.cap = cv2.VideoCapture(camera_id)
+        if not self.cap.isOpened():
+            raise RuntimeError("Camera not accessible")
+
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if self.fps <= 0:
+            self.fps = 30  # Default fallback
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def read(self):
+        """Return the next frame, or None when the source is exhausted."""
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        self.cap.release()
+
+class VideoFileSource(CameraSource):
+    """
+    Frames replayed from a video file.
+
+    With realtime=True frames are paced at the file's fps, like a camera.
+    """
+
+    def __init__(self, video_path, realtime=False):
+        super().__init__(video_path)
+        self.realtime = realtime
+        self._next_time = None
+
+    def read(self):
+        if self.realtime:
+            _pace(self)
+        return super().read()
+
+class SyntheticSource:
+    """
+    Generated frames (a moving gradient) for benchmarking without a camera.
+
+    Args:
+        width, height: Frame size
+        fps: Nominal frame rate
+        realtime: Pace frames at fps like a camera; otherwise as fast as possible
+        max_frames: Stop after this many frames (None = unlimited)
+    """
+
+    def __init__(self, width=1920, height=1080, fps=60, realtime=True, max_frames=None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.realtime = realtime
+        self.max_frames = max_frames
+        self._next_time = None
+        self._count = 0
+
+        ramp = np.linspace(0, 255, width, dtype=np.float32)
+        self._base = np.repeat(np.tile(ramp, (height, 1))[:, :, None], 3, axis=2).astype(np.uint8)
+
+    def read(self):
+        if self.max_frames is not None and self._count >= self.max_frames:
+            return None
+        if self.realtime:
+            _pace(self)
+        frame = np.roll(self._base, self._count * 4, axis=1)
+        self._count += 1
+        return frame
+
+    def release(self):
+        pass
+
+class StoppableSource:
+    """
+    Wraps a source so a signal handler or another thread can end an
+    open-ended recording cleanly (the source then reports its end).
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.fps = source.fps
+        self.width = source.width
+        self.height = source.height
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def read(self):
+        if self._stopped.is_set():
+            return None
+        return self.source.read()
+
+    def release(self):
+        self.source.release()
+
+def _pace(source):
+    """Sleep until the next frame slot of a realtime source."""
+    now = time.perf_counter()
+    if source._next_time is None:
+        source._next_time = now
+    delay = source._next_time - now
+    if delay > 0:
+        time.sleep(delay)
+    source._next_time = max(source._next_time, now - 1.0 / source.fps) + 1.0 / source.fps
@@ -0,0 +1,85 @@
+import secrets
+import time
+
+from hashing.combine import create_message
+from hashing.fragment_chain import chain_link, end_params, fragment_params
+from metadata.collect import collect_metadata
+from signing.sign import sign_message, signing_key_id
+from storage.fragmented_mp4 import FragmentedMp4Writer, build_signature_box
+from .camera import record
+
+class FragmentSigner:
+    """
+    Signs the fragments of one live recording as a hash chain.
+
+    Each message signs one fragment's byte hash and the chain link of the
+    previous message (see hashing/fragment_chain.py); end() signs the
+    fragment count so the recording's end is authenticated too.
+    """
+
+    def __init__(self, fragment_seconds, stream_id=None):
+        self.fragment_seconds = fragment_seconds
+        self.stream_id = stream_id or secrets.token_hex(16)
+        self.key_id = signing_key_id()
+        self.sequence = 0
+        self.previous = None
+
+    def start(self, init_hash):
+        # The first fragment chains to the initialization segment (codec setup)
+        self.previous = init_hash
+
+    def _sign(self, hash_value, hash_format):
+        message = create_message(hash_value, collect_metadata(), key_id=self.key_id, hash_format=hash_format)
+        signature = sign_message(message)
+        self.previous = chain_link(message)
+        return build_signature_box(message, signature)
+
+    def fragment(self, fragment_hash):
+        box = self._sign(
+            fragment_hash,
+            fragment_params(self.stream_id, self.sequence, self.previous, self.fragment_seconds)
+        )
+        self.sequence += 1
+        return box
+
+    def end(self):
+        return self._sign(self.previous, end_params(self.stream_id, self.sequence, self.previous))
+
+def record_stream(source, output_path, fragment_seconds=2, duration_seconds=None, codec="mpeg4",
+                  frame_sink=None, queue_size=64, progress=True):
+    """
+    Record a fragmented MP4 whose fragments are signed while recording.
+
+    Uses the reader/writer threads of capture.camera.record; frames go to
+    ffmpeg instead of a cv2.VideoWriter. Provenance of each fragment is
+    available `fragment_seconds` (plus encoding time) after it starts.
+
+    Args:
+        source: Frame source (see capture/sources.py)
+        output_path: Fragmented MP4 to write
+        fragment_seconds: Seconds per signed fragment
+        duration_seconds: Stop after this long (None = until the source ends)
+        codec: ffmpeg video encoder
+        frame_sink: Optional frame sink (see record)
+        queue_size: Frames buffered between the reader and writer threads
+        progress: Print a line per recorded second
+
+    Returns:
+        record()'s stats dict plus stream_id, fragments and
+        max_signature_interval (longest gap between two signed fragments, seconds)
+    """
+    signer = FragmentSigner(fragment_seconds)
+    writer = FragmentedMp4Writer(
+        output_path, source.width, source.height, source.fps, fragment_seconds, signer, codec=codec
+    )
+    started = time.perf_counter()
+    stats = record(
+        source, output_path, duration_seconds, frame_sink=frame_sink, queue_size=queue_size,
+        progress=progress, video_writer=writer
+    )
+
+    signed_at = [started] + writer.signed_at
+    stats["stream_id"] = signer.stream_id
+    stats["fragments"] = writer.fragments
+    stats["max_signature_interval"] = max(b - a for a, b in zip(signed_at, signed_at[1:])) if writer.fragments else None
+    return stats
@@ -1,8 +1,18 @@
 import json
 
-def create_message(hash_value, metadata):
+def create_message(hash_value, metadata, canonical=None, key_id=None, hash_format=None):
     message = {
         "hash": hash_value,
         "metadata": metadata
     }
+    # Canonicalization parameters are signed so verification reproduces them;
+    # omitted for the legacy full-average version to keep old messages unchanged
+    if canonical is not None:
+        message["canonical"] = canonical
+    # Key id selects the public key at verify time; omitted for the default key
+    if key_id is not None:
+        message["key_id"] = key_id
+    # Hash format (e.g. per-second Merkle root); omitted for a plain SHA-256
+    if hash_format is not None:
+        message["hash_format"] = hash_format
     return json.dumps(message, sort_keys=True).encode()
@@ -1,4 +1,20 @@
 import hashlib
 
+from utils import metrics
+
+@metrics.timed("hash")
 def sha256_hash(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
+
+def sha256_hash_chunks(chunks) -> str:
+    """
+    Hash a sequence of buffers incrementally, without concatenating them.
+
+    Each chunk (bytes or a C-contiguous numpy array) is passed to the hasher
+    through a memoryview, so no copy is made. The digest equals
+    sha256_hash(b"".join(chunks)).
+    """
+    hasher = hashlib.sha256()
+    for chunk in chunks:
+        hasher.update(memoryview(chunk))
+    return hasher.hexdigest()
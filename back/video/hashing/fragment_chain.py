@@ -0,0 +1,33 @@
+import hashlib
+
+# Signed "hash_format" types of live fragmented-MP4 recordings.
+# Each fragment's message signs the SHA-256 of the fragment's bytes
+# (moof + mdat) and the digest of the previous signed message (the init
+# segment's hash for the first fragment), so fragments cannot be dropped,
+# reordered or spliced in from another recording. A final end record
+# signs the fragment count, so truncation is detected too
+FRAGMENT_CHAIN_FORMAT = "fmp4-fragment-chain"
+CHAIN_END_FORMAT = "fmp4-chain-end"
+
+def chain_link(message_bytes) -> str:
+    """Digest of a signed message, referenced by the next message in the chain."""
+    return hashlib.sha256(message_bytes).hexdigest()
+
+def fragment_params(stream_id, sequence, previous, fragment_seconds):
+    """Hash format parameters of one signed fragment."""
+    return {
+        "type": FRAGMENT_CHAIN_FORMAT,
+        "stream": stream_id,
+        "sequence": sequence,
+        "previous": previous,
+        "fragment_seconds": fragment_seconds
+    }
+
+def end_params(stream_id, fragments, previous):
+    """Hash format parameters of the end record closing a recording."""
+    return {
+        "type": CHAIN_END_FORMAT,
+        "stream": stream_id,
+        "fragments": fragments,
+        "previous": previous
+    }
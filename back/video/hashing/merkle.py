@@ -0,0 +1,66 @@
+import base64
+import hashlib
+
+# Signed "hash_format" type for per-second Merkle hashing
+MERKLE_HASH_FORMAT = "merkle-sha256"
+
+# Domain separation so a leaf can never be passed off as an inner node
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+DIGEST_SIZE = 32
+
+def leaf_hash(chunk) -> bytes:
+    """Hash one canonical second (bytes or C-contiguous array) into a Merkle leaf."""
+    hasher = hashlib.sha256(LEAF_PREFIX)
+    hasher.update(memoryview(chunk))
+    return hasher.digest()
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def merkle_root(leaves) -> str:
+    """
+    Merkle root of a list of leaf digests, as hex.
+
+    An odd node at the end of a level is carried up unchanged.
+    """
+    level = list(leaves)
+    if not level:
+        raise ValueError("No leaves to hash")
+
+    while len(level) > 1:
+        parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        level = parents
+    return level[0].hex()
+
+def merkle_params(leaf_count):
+    """Hash format parameters recorded in the signed message."""
+    return {"type": MERKLE_HASH_FORMAT, "leaves": leaf_count}
+
+def encode_leaves(leaves) -> str:
+    """Pack leaf digests into a base64 string for embedding."""
+    return base64.b64encode(b"".join(leaves)).decode()
+
+def decode_leaves(encoded):
+    """Unpack leaf digests produced by encode_leaves."""
+    raw = base64.b64decode(encoded)
+    if len(raw) % DIGEST_SIZE:
+        raise ValueError("Malformed leaf list")
+    return [raw[i:i + DIGEST_SIZE] for i in range(0, len(raw), DIGEST_SIZE)]
+
+def changed_leaves(expected, actual, offset=0):
+    """
+    Indices (seconds) where two leaf lists differ, including missing or extra leaves.
+
+    Args:
+        expected: Signed leaf digests for the compared range
+        actual: Recomputed leaf digests for the same range
+        offset: Second index of the first leaf in both lists
+    """
+    length = max(len(expected), len(actual))
+    return [
+        offset + i for i in range(length)
+        if i >= len(expected) or i >= len(actual) or expected[i] != actual[i]
+    ]
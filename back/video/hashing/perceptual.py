@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+
+# DCT perceptual hash: 64 bits from the lowest 8x8 DCT frequencies of a
+# 32x32 grayscale thumbnail, each set when above the block's median.
+# Re-encoding, rescaling and mild edits flip only a few bits, so copies
+# are found by Hamming distance instead of exact equality
+PHASH_BITS = 64
+_THUMB_SIZE = 32
+_DCT_SIZE = 8
+
+def perceptual_hash(canon):
+    """
+    Perceptual hash of a canonical (256x256 BGR) image.
+
+    Args:
+        canon: Canonical image from canonicalization/pipeline.py
+
+    Returns:
+        64-bit hash as an int
+    """
+    gray = canon if canon.ndim == 2 else cv2.cvtColor(canon, cv2.COLOR_BGR2GRAY)
+    thumb = cv2.resize(gray, (_THUMB_SIZE, _THUMB_SIZE), interpolation=cv2.INTER_AREA)
+    block = cv2.dct(thumb.astype(np.float32))[:_DCT_SIZE, :_DCT_SIZE].ravel()
+    # The DC term is the mean brightness and says nothing about structure
+    bits = block > np.median(block[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def format_phash(value):
+    return f"{value:016x}"
+
+def parse_phash(text):
+    return int(text, 16)
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+def with_perceptual_hashes(seconds, phashes):
+    """
+    Pass canonical seconds through unchanged, appending each one's
+    perceptual hash to `phashes`, so they are computed in the same pass
+    as the cryptographic hash.
+    """
+    for second in seconds:
+        phashes.append(perceptual_hash(second))
+        yield second
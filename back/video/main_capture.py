@@ -1,29 +1,93 @@
+import os
+
 from capture.camera import capture_video
-from canonicalization.process_video import process_video_file
-from hashing.crypto_hash import sha256_hash
+from canonicalization.process_video import (
+    LiveCanonicalizer,
+    canonical_params,
+    fit_sampling,
+    iter_canonical_seconds,
+    open_video,
+)
+from hashing.crypto_hash import sha256_hash_chunks
 from hashing.combine import create_message
-from signing.sign import sign_message
+from hashing.merkle import encode_leaves, leaf_hash, merkle_params, merkle_root
+from hashing.perceptual import with_perceptual_hashes
+from signing.sign import sign_message, signing_key_id
 from metadata.collect import collect_metadata
 from storage.metadata_embed import embed_metadata
-from utils.constants import VIDEO_DURATION_SECONDS
+from storage.phash_index import get_index
+from storage.signature_store import get_registry
+from utils.constants import (
+    CANONICAL_PROFILE,
+    CANONICAL_PROFILE_DECODER_SCALE,
+    CANONICALIZE_DURING_CAPTURE,
+    CAPTURE_FOURCC,
+    FRAME_SAMPLES_PER_SECOND,
+    LOSSLESS_CAPTURE_FOURCC,
+    MERKLE_HASHING,
+    VIDEO_DURATION_SECONDS,
+)
 
-# 1️⃣ Capture video (5 seconds) and save as video file
-video_path = capture_video(duration_seconds=VIDEO_DURATION_SECONDS, output_path="storage/video.mp4")
+canonical = canonical_params(FRAME_SAMPLES_PER_SECOND, CANONICAL_PROFILE)
 
-# 2️⃣ Process video: extract frames per second, canonicalize, combine
-combined_matrix = process_video_file(video_path)
+# ffmpeg-area-v1 scales inside the decoder, so it always re-decodes the file
+if CANONICALIZE_DURING_CAPTURE and CANONICAL_PROFILE != CANONICAL_PROFILE_DECODER_SCALE:
+    # 1️⃣ + 2️⃣ Capture losslessly and canonicalize each frame as it is written,
+    # so the canonical seconds are ready when recording stops
+    live = LiveCanonicalizer(canonical)
+    video_path = capture_video(
+        duration_seconds=VIDEO_DURATION_SECONDS,
+        output_path="storage/video.mp4",
+        fourcc=LOSSLESS_CAPTURE_FOURCC,
+        frame_sink=live
+    )
+    # Sample count fitted to the camera's frame rate (signed below)
+    canonical = live.canonical
+    # Re-decode only if the container would bucket frames differently
+    seconds = live.seconds if live.matches_file(video_path) else iter_canonical_seconds(video_path, canonical)
+else:
+    # 1️⃣ Capture video (5 seconds) and save as video file
+    video_path = capture_video(
+        duration_seconds=VIDEO_DURATION_SECONDS,
+        output_path="storage/video.mp4",
+        fourcc=CAPTURE_FOURCC
+    )
+    # 2️⃣ Process video: extract frames per second and canonicalize
+    # (never sampling more frames per second than the recording has)
+    cap, fps = open_video(video_path)
+    cap.release()
+    canonical = fit_sampling(canonical, fps)
+    seconds = iter_canonical_seconds(video_path, canonical)
 
-# 3️⃣ Hash combined matrix
-hash_val = sha256_hash(combined_matrix.tobytes())
+# 3️⃣ Hash: each canonical second is fed into the hash as soon as it is
+# produced (same digest as hashing the combined matrix); per-second
+# perceptual hashes are taken in the same pass for near-duplicate lookup
+phashes = []
+seconds = with_perceptual_hashes(seconds, phashes)
+if MERKLE_HASHING:
+    # One Merkle leaf per second; the root is signed, the leaves are embedded
+    leaves = [leaf_hash(second) for second in seconds]
+    hash_val = merkle_root(leaves)
+    hash_format = merkle_params(len(leaves))
+    encoded_leaves = encode_leaves(leaves)
+else:
+    hash_val = sha256_hash_chunks(seconds)
+    hash_format = encoded_leaves = None
 
 # 4️⃣ Collect metadata
 metadata = collect_metadata()
 
 # 5️⃣ Create signed message
-message = create_message(hash_val, metadata)
+message = create_message(hash_val, metadata, canonical, key_id=signing_key_id(), hash_format=hash_format)
 signature = sign_message(message)
 
 # 6️⃣ Embed metadata (hash and signature) into video
-embed_metadata(video_path, hash_val, signature, message)
+embed_metadata(video_path, hash_val, signature, message, leaves=encoded_leaves)
+
+# 7️⃣ Register the signature (found by content hash if the metadata is
+# stripped) and index the perceptual hashes so re-encoded copies can be traced back
+source = os.path.abspath(video_path)
+get_registry().add(message, signature, source=source)
+get_index().add_many((phash, hash_val, source, second) for second, phash in enumerate(phashes))
 
 print("✅ Video captured, processed, and signed (metadata embedded)")
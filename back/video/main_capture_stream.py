@@ -0,0 +1,24 @@
+import argparse
+import signal
+
+from capture.sources import CameraSource, StoppableSource
+from capture.stream import record_stream
+from utils.constants import STREAM_CODEC, STREAM_FRAGMENT_SECONDS
+
+if __name__ == "__main__":
+    # Record a fragmented MP4 and sign every fragment as soon as it closes,
+    # so provenance is available during the recording (Ctrl-C to stop)
+    parser = argparse.ArgumentParser(description="TrueShot live capture with per-fragment signatures")
+    parser.add_argument("--output", default="storage/stream.mp4")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to record (default: until Ctrl-C)")
+    parser.add_argument("--fragment-seconds", type=float, default=STREAM_FRAGMENT_SECONDS)
+    parser.add_argument("--camera", type=int, default=0)
+    args = parser.parse_args()
+
+    source = StoppableSource(CameraSource(args.camera))
+    signal.signal(signal.SIGINT, lambda *_: source.stop())
+
+    stats = record_stream(source, args.output, args.fragment_seconds, args.duration, codec=STREAM_CODEC)
+    print(f"✅ Recorded {stats['fragments']} signed fragments to {args.output}")
+    print(f"   Longest wait between signatures: {stats['max_signature_interval'] or 0:.2f}s, "
+          f"dropped frames: {stats['frames_dropped']}")
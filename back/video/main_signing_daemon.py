@@ -0,0 +1,22 @@
+import argparse
+import asyncio
+import json
+
+from signing.daemon import serve
+from signing.daemon_client import SigningClient
+from utils.constants import SIGNING_SOCKET_PATH
+
+if __name__ == "__main__":
+    # Keep the signing key in memory and sign for local capture processes
+    parser = argparse.ArgumentParser(description="TrueShot signing daemon")
+    parser.add_argument("--socket", default=str(SIGNING_SOCKET_PATH), help="Unix socket path")
+    parser.add_argument("--stats", action="store_true", help="Print a running daemon's counters and exit")
+    args = parser.parse_args()
+
+    if args.stats:
+        print(json.dumps(json.loads(SigningClient(args.socket).stats()), indent=2, sort_keys=True))
+    else:
+        try:
+            asyncio.run(serve(args.socket))
+        except KeyboardInterrupt:
+            pass
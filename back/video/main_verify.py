@@ -1,9 +1,14 @@
+import sys
+
 from verify.verify_video import verify_video
 
-# Verify video using embedded metadata (no signature file needed)
-valid, reason = verify_video("storage/video.mp4")
+if __name__ == "__main__":
+    # Verify video using embedded metadata (no signature file needed)
+    video_path = sys.argv[1] if len(sys.argv) > 1 else "storage/video.mp4"
+    valid, reason = verify_video(video_path)
 
-if valid:
-    print("✅", reason)
-else:
-    print("❌", reason)
+    if valid:
+        print("✅", reason)
+    else:
+        print("❌", reason)
+    sys.exit(0 if valid else 1)
@@ -0,0 +1,20 @@
+import argparse
+import sys
+
+from verify.verify_stream import iter_verify_fragments
+
+if __name__ == "__main__":
+    # Verify a live recording fragment by fragment; with --follow, keep
+    # reading while the file is still being written
+    parser = argparse.ArgumentParser(description="Verify a fragmented TrueShot recording")
+    parser.add_argument("path", nargs="?", default="storage/stream.mp4")
+    parser.add_argument("--follow", action="store_true", help="Wait for fragments still being recorded")
+    parser.add_argument("--idle-timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as f:
+        for result in iter_verify_fragments(f, follow=args.follow, idle_timeout=args.idle_timeout):
+            if result["sequence"] is not None:
+                print("✅" if result["valid"] else "❌", f"Fragment {result['sequence']}:", result["reason"])
+    print("✅" if result["valid"] else "❌", result["reason"])
+    sys.exit(0 if result["valid"] else 1)
@@ -0,0 +1,102 @@
+import os
+import socket
+import struct
+import threading
+
+from utils.constants import SIGNING_SOCKET_PATH
+
+# Wire format (both directions): 4-byte big-endian length, then the frame.
+# Request frame: 1-byte op + payload. Response frame: 1-byte status + payload.
+OP_SIGN = b"S"
+OP_KEY_ID = b"K"
+OP_STATS = b"T"
+STATUS_OK = b"\x00"
+STATUS_ERROR = b"\x01"
+
+def pack_frame(data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + data
+
+class DaemonError(RuntimeError):
+    """The signing daemon answered with an error."""
+
+class SigningClient:
+    """
+    Client for the signing daemon (signing/daemon.py).
+
+    Keeps one connection open and reconnects once if it was dropped.
+    Safe to share between threads; requests are sent one at a time.
+    """
+
+    def __init__(self, socket_path=SIGNING_SOCKET_PATH, timeout=10.0):
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self._sock = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._sock = sock
+
+    def _recv_exact(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Signing daemon closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def _request(self, op, payload=b""):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(pack_frame(op + payload))
+                    length = struct.unpack(">I", self._recv_exact(4))[0]
+                    response = self._recv_exact(length)
+                    break
+                except (ConnectionError, BrokenPipeError):
+                    self.close()
+                    if attempt:
+                        raise
+                except BaseException:
+                    # A timeout (or interrupt) can leave a reply in flight;
+                    # never reuse that connection, or the next request
+                    # would read the stale reply
+                    self.close()
+                    raise
+        status, body = response[:1], response[1:]
+        if status != STATUS_OK:
+            raise DaemonError(body.decode(errors="replace"))
+        return body
+
+    def sign(self, message: bytes) -> bytes:
+        return self._request(OP_SIGN, message)
+
+    def signing_key_id(self) -> str:
+        return self._request(OP_KEY_ID).decode()
+
+    def stats(self) -> bytes:
+        """Daemon counters as JSON bytes."""
+        return self._request(OP_STATS)
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+_client = None
+
+def get_daemon_client():
+    """
+    Process-wide client if a signing daemon socket exists, else None.
+    """
+    global _client
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(SIGNING_SOCKET_PATH):
+        return None
+    if _client is None:
+        _client = SigningClient()
+    return _client
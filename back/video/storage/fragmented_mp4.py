@@ -0,0 +1,217 @@
+import base64
+import hashlib
+import json
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+
+from canonicalization.ffmpeg_source import find_ffmpeg
+
+# Top-level 'uuid' box carrying one signed message after each fragment.
+# Players skip unknown top-level boxes, so signed files still play
+TRUESHOT_UUID = bytes.fromhex("5472756553686f74a1f25c0b8e7d4c11")
+
+# Boxes of the initialization segment, hashed into the start of the chain
+INIT_BOXES = (b"ftyp", b"moov")
+
+# ffmpeg's trailing random-access index; its absolute offsets are wrong once
+# signature boxes are inserted, so it is dropped (fragments carry their own
+# moof-relative offsets)
+DROPPED_BOXES = (b"mfra",)
+
+def build_signature_box(message, signature):
+    payload = json.dumps({
+        "message": base64.b64encode(message).decode(),
+        "signature": base64.b64encode(signature).decode()
+    }, sort_keys=True).encode()
+    return struct.pack(">I4s", 8 + 16 + len(payload), b"uuid") + TRUESHOT_UUID + payload
+
+def parse_signature_box(data):
+    """
+    Read a signature box (as returned by read_box, header included).
+
+    Returns:
+        Tuple of (message_bytes, signature_bytes), or None for other uuid boxes
+    """
+    header_size = 16 if struct.unpack(">I", data[:4])[0] == 1 else 8
+    if data[header_size:header_size + 16] != TRUESHOT_UUID:
+        return None
+    fields = json.loads(data[header_size + 16:].decode())
+    return base64.b64decode(fields["message"]), base64.b64decode(fields["signature"])
+
+def _read_exact(f, size, follow, poll_seconds, idle_timeout):
+    chunks = []
+    remaining = size
+    idle_since = None
+    while remaining:
+        chunk = f.read(remaining)
+        if chunk:
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            idle_since = None
+            continue
+        if not follow:
+            break
+        # Growing file: wait for the recorder to append more
+        now = time.monotonic()
+        idle_since = idle_since or now
+        if now - idle_since >= idle_timeout:
+            break
+        time.sleep(poll_seconds)
+    return b"".join(chunks)
+
+def read_box(f, follow=False, poll_seconds=0.1, idle_timeout=10.0):
+    """
+    Read the next top-level box from a file, pipe or growing file.
+
+    Args:
+        f: Binary file object positioned at a box boundary
+        follow: Wait for more data at EOF (for a file still being recorded)
+        poll_seconds: Wait between reads while following
+        idle_timeout: Give up after this many seconds without new data
+
+    Returns:
+        Tuple of (box_type, box_bytes including the header), or None at
+        the end of the stream
+
+    Raises:
+        ValueError: If the stream ends inside a box or a header is malformed
+    """
+    header = _read_exact(f, 8, follow, poll_seconds, idle_timeout)
+    if not header:
+        return None
+    if len(header) < 8:
+        raise ValueError("Stream ends inside a box header")
+    size, box_type = struct.unpack(">I4s", header)
+    if size == 1:
+        large = _read_exact(f, 8, follow, poll_seconds, idle_timeout)
+        if len(large) < 8:
+            raise ValueError("Stream ends inside a box header")
+        header += large
+        size = struct.unpack(">Q", large)[0]
+    elif size == 0:
+        raise ValueError(f"Unbounded {box_type!r} box in a fragmented stream")
+    if size < len(header):
+        raise ValueError(f"Malformed MP4 box {box_type!r}")
+
+    body = _read_exact(f, size - len(header), follow, poll_seconds, idle_timeout)
+    if len(body) < size - len(header):
+        raise ValueError(f"Stream ends inside a {box_type.decode('latin-1')} box")
+    return box_type, header + body
+
+class FragmentedMp4Writer:
+    """
+    Video writer (write / release, like cv2.VideoWriter) producing a
+    fragmented MP4 with a signature after every fragment.
+
+    Frames are piped to ffmpeg as raw BGR; ffmpeg encodes with a keyframe
+    every `fragment_seconds` and emits one moof + mdat fragment per
+    keyframe interval. A reader thread copies ffmpeg's output to
+    output_path box by box, hashing the initialization segment and each
+    fragment, and appends the box returned by the signer as soon as a
+    fragment is complete. The file is playable and verifiable up to the
+    last signed fragment at any time during the recording.
+    """
+
+    def __init__(self, output_path, width, height, fps, fragment_seconds, signer, codec="mpeg4", quality=3):
+        """
+        Args:
+            output_path: Fragmented MP4 to write
+            width, height, fps: Frame geometry and rate of the written frames
+            fragment_seconds: Seconds per fragment (one keyframe interval)
+            signer: Object with start(init_hash), fragment(fragment_hash)
+                and end(), each returning the signature box to append
+                (see capture/stream.py::FragmentSigner)
+            codec: ffmpeg video encoder
+            quality: Encoder quantizer (-q:v; lower is better)
+        """
+        self.signer = signer
+        self.fragments = 0
+        self.signed_at = []  # perf_counter() when each fragment was signed
+        self._error = None
+        self._frame_bytes = width * height * 3
+        gop = max(1, round(fps * fragment_seconds))
+
+        command = [
+            find_ffmpeg(), "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "pipe:0",
+            "-c:v", codec, "-q:v", str(quality), "-pix_fmt", "yuv420p",
+            "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+            "-movflags", "frag_keyframe+empty_moov+default_base_moof",
+            "-f", "mp4", "pipe:1",
+        ]
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._stderr
+        )
+        self._out = open(output_path, "wb")
+        self._reader = threading.Thread(target=self._copy_and_sign, daemon=True)
+        self._reader.start()
+
+    def write(self, frame):
+        if self._error is not None:
+            raise self._error
+        if frame.nbytes != self._frame_bytes:
+            raise ValueError("Frame size does not match the writer")
+        try:
+            self._process.stdin.write(memoryview(frame).cast("B") if frame.flags.c_contiguous else frame.tobytes())
+        except BrokenPipeError:
+            raise self._failure()
+
+    def _failure(self):
+        self._stderr.seek(0)
+        message = self._stderr.read().decode(errors="replace").strip()
+        return RuntimeError(f"ffmpeg failed: {message or 'no output'}")
+
+    def _copy_and_sign(self):
+        try:
+            init = hashlib.sha256()
+            fragment = None
+            while True:
+                box = read_box(self._process.stdout)
+                if box is None:
+                    break
+                box_type, data = box
+                if box_type in DROPPED_BOXES:
+                    continue
+                self._out.write(data)
+
+                if fragment is None and box_type in INIT_BOXES:
+                    init.update(data)
+                    continue
+                if fragment is None:
+                    self.signer.start(init.hexdigest())
+                    fragment = hashlib.sha256()
+                fragment.update(data)
+
+                if box_type == b"mdat":
+                    # Fragment complete: sign it before ffmpeg produces the next
+                    self._out.write(self.signer.fragment(fragment.hexdigest()))
+                    self._out.flush()
+                    self.fragments += 1
+                    self.signed_at.append(time.perf_counter())
+                    fragment = hashlib.sha256()
+        except Exception as e:
+            self._error = e
+            self._process.kill()
+
+    def release(self):
+        """Finish encoding, sign the last fragment and append the end record."""
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._reader.join()
+        returncode = self._process.wait()
+        try:
+            if self._error is not None:
+                raise self._error
+            if returncode != 0:
+                raise self._failure()
+            if self.fragments:
+                self._out.write(self.signer.end())
+        finally:
+            self._out.close()
+            self._stderr.close()
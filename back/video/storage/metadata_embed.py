@@ -1,18 +1,23 @@
 import base64
 import json
-import subprocess
-import os
-import tempfile
 
-def embed_metadata(video_path, hash_value, signature, message_bytes):
+from utils import metrics
+from .mp4_boxes import read_mp4_tags, write_udta_tags
+
+@metrics.timed("embed")
+def embed_metadata(video_path, hash_value, signature, message_bytes, leaves=None):
     """
-    Embed hash and signature into video metadata using ffmpeg.
+    Embed hash and signature into video metadata.
+    Tags are written straight into the MP4's moov/udta box; the sample data
+    (mdat) is never read or copied, so the cost does not grow with clip size.
     
     Args:
         video_path: Path to video file
         hash_value: SHA256 hash string
         signature: Signature bytes
         message_bytes: Original message bytes that was signed
+        leaves: Optional base64 per-second Merkle leaves (see hashing/merkle.py),
+            stored so ranges can be verified and changes localized
         
     Returns:
         Path to video with embedded metadata
@@ -31,54 +36,52 @@ def embed_metadata(video_path, hash_value, signature, message_bytes):
     # Convert to JSON string
     metadata_json = json.dumps(metadata_dict, sort_keys=True)
     
-    # Create temporary output file
-    # Ensure temp file keeps an mp4 extension so ffmpeg picks correct muxer
-    temp_output = video_path + ".tmp.mp4"
+    # Same tags the previous ffmpeg-based writer produced:
+    # a JSON comment and individual fields (for readers that drop comment)
+    tags = [
+        ("comment", metadata_json),
+        ("TrueShot", metadata_json),
+        ("TrueShotHash", hash_value),
+        ("TrueShotSignature", signature_b64),
+        ("TrueShotMessage", message_b64),
+        ("description", "TrueShot verification data"),
+    ]
+    if leaves is not None:
+        tags.append(("TrueShotLeaves", leaves))
     
-    # Use ffmpeg to embed metadata
-    # MP4 metadata is stored in format tags; we write both a JSON comment and individual fields
     try:
-        cmd = [
-            'ffmpeg',
-            '-i', video_path,
-            # Primary JSON blob (most robust)
-            '-metadata', f'comment={metadata_json}',
-            '-metadata', f'TrueShot={metadata_json}',
-            # Redundant individual fields (for readers that drop comment)
-            '-metadata', 'TrueShotHash=' + hash_value,
-            '-metadata', 'TrueShotSignature=' + signature_b64,
-            '-metadata', 'TrueShotMessage=' + message_b64,
-            '-metadata', 'description=TrueShot verification data',
-            '-codec', 'copy',          # Avoid re-encoding
-            '-movflags', 'use_metadata_tags',  # Persist tags in MP4 udta
-            '-y',
-            temp_output
-        ]
-        
-        subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Replace original file with metadata-embedded version
-        os.replace(temp_output, video_path)
-        
-        return video_path
-        
-    except subprocess.CalledProcessError as e:
-        # Clean up temp file if it exists
-        if os.path.exists(temp_output):
-            os.remove(temp_output)
-        raise RuntimeError(f"Failed to embed metadata: {e.stderr or e}")
-    except FileNotFoundError:
-        raise RuntimeError("ffmpeg not found. Please install ffmpeg to embed video metadata.")
+        write_udta_tags(video_path, tags)
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"Failed to embed metadata: {e}")
+    
+    return video_path
 
 
+def extract_leaves(video_path):
+    """
+    Read the embedded per-second Merkle leaves.
+    
+    Returns:
+        Base64 leaf string, or None if the video has none
+    """
+    try:
+        tags, stream_tag_list = read_mp4_tags(video_path)
+    except Exception as e:
+        print(f"Error extracting metadata: {e}")
+        return None
+    
+    for tag_dict in [tags] + stream_tag_list:
+        if tag_dict.get('TrueShotLeaves'):
+            return tag_dict['TrueShotLeaves']
+    return None
+
+
+@metrics.timed("extract")
 def extract_metadata(video_path):
     """
-    Extract hash and signature from video metadata using ffprobe.
+    Extract hash and signature from video metadata.
+    Reads the MP4 atoms directly (moov/udta, moov/meta, trak/udta) by
+    seeking, so only a few KB of the file are touched.
     
     Args:
         video_path: Path to video file
@@ -87,26 +90,8 @@ def extract_metadata(video_path):
         Tuple of (hash_value, signature_bytes, message_bytes) or None if not found
     """
     try:
-        # Use ffprobe to extract metadata
-        cmd = [
-            'ffprobe',
-            '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format',
-            video_path
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Parse JSON output
-        probe_data = json.loads(result.stdout)
-        format_info = probe_data.get('format', {})
-        tags = format_info.get('tags', {}) or {}
+        # Read container-level and per-stream tags
+        tags, stream_tag_list = read_mp4_tags(video_path)
 
         # Helper to read both lowercase/uppercase keys
         def _get_tag(tag_dict, key):
@@ -136,9 +121,7 @@ def extract_metadata(video_path):
         
         # If still not found, inspect stream tags (some muxers store tags per stream)
         if metadata_dict is None:
-            streams = probe_data.get('streams', []) or []
-            for stream in streams:
-                stream_tags = stream.get('tags', {}) or {}
+            for stream_tags in stream_tag_list:
                 comment = _get_tag(stream_tags, 'comment') or _get_tag(stream_tags, 'TrueShot')
                 if comment:
                     try:
@@ -175,11 +158,6 @@ def extract_metadata(video_path):
         
         return hash_value, signature_bytes, message_bytes
         
-    except subprocess.CalledProcessError as e:
-        print(f"Error extracting metadata: {e}")
-        return None
-    except FileNotFoundError:
-        raise RuntimeError("ffprobe not found. Please install ffmpeg to extract video metadata.")
     except Exception as e:
         print(f"Error extracting metadata: {e}")
         return None
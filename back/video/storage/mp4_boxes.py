@@ -0,0 +1,416 @@
+import os
+import struct
+
+# Key namespace and data type used for QuickTime "mdta" string tags
+MDTA_NAMESPACE = b"mdta"
+DATA_TYPE_UTF8 = 1
+
+# iTunes-style ("mdir") atoms that map to ffmpeg tag names
+MDIR_TAG_NAMES = {
+    b"\xa9cmt": "comment",
+    b"desc": "description",
+}
+MDIR_ATOMS = {name: atom for atom, name in MDIR_TAG_NAMES.items()}
+FREEFORM_MEAN = b"com.apple.iTunes"
+
+
+# ---------------------------------------------------------------------------
+# Box primitives
+# ---------------------------------------------------------------------------
+
+def iter_boxes(data, start=0, end=None):
+    """
+    Walk sibling boxes in an in-memory buffer.
+
+    Yields:
+        Tuples of (type, offset, size, header_size)
+    """
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[pos:pos + 8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[pos + 8:pos + 16])[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size or pos + size > end:
+            raise ValueError(f"Malformed MP4 box {box_type!r} at offset {pos}")
+        yield box_type, pos, size, header_size
+        pos += size
+
+def iter_file_boxes(f, start, end):
+    """
+    Walk sibling boxes of an open file by reading only their headers.
+
+    Yields:
+        Tuples of (type, offset, size, header_size)
+    """
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            break
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size or pos + size > end:
+            raise ValueError(f"Malformed MP4 box {box_type!r} at offset {pos}")
+        yield box_type, pos, size, header_size
+        pos += size
+
+def build_box(box_type, payload):
+    """Serialize a box with a 32-bit size header."""
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+def build_full_box(box_type, payload, version=0, flags=0):
+    """Serialize a FullBox (version + 24-bit flags before the payload)."""
+    return build_box(box_type, struct.pack(">I", (version << 24) | flags) + payload)
+
+def meta_children_start(data, offset, header_size):
+    """
+    Offset of the first child of a 'meta' box.
+
+    ISO 'meta' is a FullBox (4 bytes of version/flags); QuickTime 'meta'
+    is a plain container. Tell them apart by looking for a child type.
+    """
+    body = offset + header_size
+    if data[body + 4:body + 8] in (b"hdlr", b"keys", b"ilst"):
+        return body
+    return body + 4
+
+
+# ---------------------------------------------------------------------------
+# Metadata ('meta' box) parsing and building
+# ---------------------------------------------------------------------------
+
+def _data_value(data, start, end):
+    """First UTF-8 'data' value inside an ilst item, or None."""
+    for box_type, offset, size, header_size in iter_boxes(data, start, end):
+        if box_type == b"data":
+            payload = data[offset + header_size:offset + size]
+            type_indicator = struct.unpack(">I", payload[:4])[0] & 0xFFFFFF
+            if type_indicator == DATA_TYPE_UTF8:
+                return payload[8:].decode("utf-8", errors="replace")
+    return None
+
+def _full_box_string(data, offset, size, header_size):
+    return data[offset + header_size + 4:offset + size].decode("utf-8", errors="replace")
+
+def parse_meta(data, offset=0, size=None, header_size=8):
+    """
+    Parse a 'meta' box into its handler and tag items.
+
+    Args:
+        data: Buffer holding the box
+        offset/size/header_size: Location of the 'meta' box in the buffer
+
+    Returns:
+        Tuple of (handler, items) where handler is b"mdta", b"mdir", ... and
+        items is a list of (tag_name or None, raw_item_bytes, value or None)
+        in file order. Items that are not UTF-8 string tags keep a None value
+        and are carried over untouched when the box is rebuilt.
+    """
+    size = len(data) - offset if size is None else size
+    end = offset + size
+    handler = None
+    keys = []
+    ilst = None
+
+    for box_type, child, child_size, child_header in iter_boxes(
+            data, meta_children_start(data, offset, header_size), end):
+        body = child + child_header
+        if box_type == b"hdlr":
+            handler = data[body + 8:body + 12]
+        elif box_type == b"keys":
+            count = struct.unpack(">I", data[body + 4:body + 8])[0]
+            pos = body + 8
+            for _ in range(count):
+                key_size = struct.unpack(">I", data[pos:pos + 4])[0]
+                keys.append(data[pos + 8:pos + key_size].decode("utf-8", errors="replace"))
+                pos += key_size
+        elif box_type == b"ilst":
+            ilst = (body, child + child_size)
+
+    items = []
+    if ilst is None:
+        return handler, items
+
+    for item_type, item, item_size, item_header in iter_boxes(data, *ilst):
+        raw = data[item:item + item_size]
+        body, item_end = item + item_header, item + item_size
+        name = None
+        if handler == MDTA_NAMESPACE:
+            index = struct.unpack(">I", item_type)[0]
+            if 1 <= index <= len(keys):
+                name = keys[index - 1]
+        elif item_type == b"----":
+            for sub_type, sub, sub_size, sub_header in iter_boxes(data, body, item_end):
+                if sub_type == b"name":
+                    name = _full_box_string(data, sub, sub_size, sub_header)
+        else:
+            name = MDIR_TAG_NAMES.get(item_type)
+        value = _data_value(data, body, item_end) if name is not None else None
+        items.append((name, raw, value))
+
+    return handler, items
+
+def _data_box(value):
+    return build_box(b"data", struct.pack(">II", DATA_TYPE_UTF8, 0) + value.encode("utf-8"))
+
+def _hdlr_box(handler):
+    return build_full_box(b"hdlr", struct.pack(">I4s", 0, handler) + b"\x00" * 12 + b"\x00")
+
+def build_mdta_meta(tags, existing_items=()):
+    """
+    Build an ISO 'meta' box with QuickTime 'mdta' keys (ffmpeg's use_metadata_tags layout).
+
+    Args:
+        tags: Ordered (name, value) string tags to set
+        existing_items: Items from parse_meta of the previous mdta box;
+            string tags not overridden by `tags` are kept
+
+    Returns:
+        Serialized 'meta' box
+    """
+    merged = {}
+    for name, _, value in existing_items:
+        if name is not None and value is not None:
+            merged[name] = value
+    merged.update(tags)
+
+    keys_payload = struct.pack(">I", len(merged))
+    ilst_payload = b""
+    for index, (name, value) in enumerate(merged.items(), start=1):
+        key = name.encode("utf-8")
+        keys_payload += struct.pack(">I4s", 8 + len(key), MDTA_NAMESPACE) + key
+        ilst_payload += build_box(struct.pack(">I", index), _data_box(value))
+
+    return build_full_box(
+        b"meta",
+        _hdlr_box(MDTA_NAMESPACE)
+        + build_full_box(b"keys", keys_payload)
+        + build_box(b"ilst", ilst_payload)
+    )
+
+def build_mdir_meta(tags, existing_items, handler=b"mdir"):
+    """
+    Rebuild an iTunes-style 'meta' box with the given tags set.
+
+    Known names map to their atoms (comment -> ©cmt, description -> desc);
+    other names are written as '----' freeform items. Existing items with
+    the same names are replaced; everything else is copied verbatim.
+    """
+    names = {name for name, _ in tags}
+    ilst_payload = b"".join(raw for name, raw, _ in existing_items if name not in names)
+    for name, value in tags:
+        atom = MDIR_ATOMS.get(name)
+        if atom is not None:
+            ilst_payload += build_box(atom, _data_box(value))
+        else:
+            ilst_payload += build_box(
+                b"----",
+                build_full_box(b"mean", FREEFORM_MEAN)
+                + build_full_box(b"name", name.encode("utf-8"))
+                + _data_box(value)
+            )
+
+    return build_full_box(b"meta", _hdlr_box(handler) + build_box(b"ilst", ilst_payload))
+
+
+# ---------------------------------------------------------------------------
+# In-place writer
+# ---------------------------------------------------------------------------
+
+def _top_level_boxes(f):
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    return list(iter_file_boxes(f, 0, file_size)), file_size
+
+def _rebuild_udta(data, udta, tags):
+    """Return new udta payload with `tags` merged into its 'meta' box."""
+    children = []
+    meta_bytes = None
+    if udta is not None:
+        _, offset, size, header_size = udta
+        for box_type, child, child_size, child_header in iter_boxes(data, offset + header_size, offset + size):
+            if box_type == b"meta" and meta_bytes is None:
+                handler, items = parse_meta(data, child, child_size, child_header)
+                if handler == MDTA_NAMESPACE:
+                    meta_bytes = build_mdta_meta(tags, items)
+                else:
+                    meta_bytes = build_mdir_meta(tags, items, handler or b"mdir")
+                children.append(meta_bytes)
+            else:
+                children.append(data[child:child + child_size])
+
+    if meta_bytes is None:
+        children.append(build_mdta_meta(tags))
+    return b"".join(children)
+
+def _rebuild_moov(moov, tags):
+    """Return the serialized moov with `tags` merged into moov/udta/meta."""
+    _, _, size, header_size = next(iter_boxes(moov, 0, len(moov)))
+    children = list(iter_boxes(moov, header_size, size))
+    udta = next((c for c in children if c[0] == b"udta"), None)
+    new_udta = build_box(b"udta", _rebuild_udta(moov, udta, tags))
+
+    payload = b""
+    for child in children:
+        box_type, offset, child_size, _ = child
+        if child is udta:
+            payload += new_udta
+        else:
+            payload += moov[offset:offset + child_size]
+    if udta is None:
+        payload += new_udta
+    return build_box(b"moov", payload)
+
+def _sync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+def _free_runs(boxes):
+    """(offset, size) of each run of adjacent top-level free/skip boxes."""
+    runs = []
+    for box_type, offset, size, _ in boxes:
+        if box_type not in (b"free", b"skip"):
+            continue
+        if runs and sum(runs[-1]) == offset:
+            runs[-1] = (runs[-1][0], runs[-1][1] + size)
+        else:
+            runs.append((offset, size))
+    return runs
+
+def write_udta_tags(path, tags):
+    """
+    Write string tags into moov/udta/meta of an MP4 without copying mdat.
+
+    The old moov is never overwritten. The new moov goes into a run of
+    top-level 'free' boxes it fits in (typically the moov replaced by an
+    earlier write), or else is appended at the end of the file. It is
+    written first as a 'free' box and synced, then retyped to 'moov', and
+    only then is the old moov retyped to 'free'. A crash at any point
+    leaves at least one complete moov, so the file always stays playable.
+    Free boxes left at the end of the file are truncated away. Sample data
+    never moves, so chunk offsets stay valid and the cost is independent
+    of the clip size.
+
+    Args:
+        path: Path to MP4/MOV file
+        tags: Ordered list of (name, value) string tags
+    """
+    with open(path, "r+b") as f:
+        boxes, file_size = _top_level_boxes(f)
+        index = next((i for i, b in enumerate(boxes) if b[0] == b"moov"), None)
+        if index is None:
+            raise ValueError("No moov box found")
+
+        _, moov_offset, moov_size, _ = boxes[index]
+        f.seek(moov_offset)
+        new_moov = _rebuild_moov(f.read(moov_size), tags)
+
+        # Reuse a run of adjacent free boxes the new moov fits in exactly or
+        # with room for a padding 'free' header; otherwise append
+        target, padding = file_size, 0
+        for offset, size in _free_runs(boxes):
+            if len(new_moov) == size or len(new_moov) + 8 <= size:
+                target, padding = offset, size - len(new_moov)
+                break
+
+        f.seek(target)
+        f.write(new_moov[:4] + b"free" + new_moov[8:])
+        if padding:
+            f.write(struct.pack(">I4s", padding, b"free"))
+        _sync(f)
+
+        # Two complete moov boxes briefly exist; either one is valid
+        f.seek(target + 4)
+        f.write(b"moov")
+        _sync(f)
+        f.seek(moov_offset + 4)
+        f.write(b"free")
+        _sync(f)
+
+        # Free boxes left at the end of the file (e.g. the old moov) are cut off
+        boxes, file_size = _top_level_boxes(f)
+        end = file_size
+        for box_type, offset, _, _ in reversed(boxes):
+            if box_type not in (b"free", b"skip"):
+                break
+            end = offset
+        if end < file_size:
+            f.truncate(end)
+
+
+# ---------------------------------------------------------------------------
+# Seek-based reader
+# ---------------------------------------------------------------------------
+
+def _read_box(f, offset, size):
+    f.seek(offset)
+    return f.read(size)
+
+def _meta_tags(data, offset, size, header_size):
+    """String tags of a 'meta' box as a dict."""
+    _, items = parse_meta(data, offset, size, header_size)
+    return {name: value for name, _, value in items if name is not None and value is not None}
+
+def _udta_tags(data):
+    """String tags of a serialized 'udta' box (meta items plus QuickTime ©-atoms)."""
+    tags = {}
+    _, _, size, header_size = next(iter_boxes(data, 0, len(data)))
+    for box_type, offset, child_size, child_header in iter_boxes(data, header_size, size):
+        if box_type == b"meta":
+            tags.update(_meta_tags(data, offset, child_size, child_header))
+        elif box_type in MDIR_TAG_NAMES:
+            # QuickTime user data text: 16-bit length, 16-bit language, text
+            body = offset + child_header
+            length = struct.unpack(">H", data[body:body + 2])[0]
+            tags.setdefault(MDIR_TAG_NAMES[box_type],
+                            data[body + 4:body + 4 + length].decode("utf-8", errors="replace"))
+    return tags
+
+def read_mp4_tags(path):
+    """
+    Read container- and stream-level string tags from an MP4/MOV file.
+
+    Only box headers are read on the way down; the bytes of moov/udta,
+    moov/meta and trak/udta are the only payloads loaded, so sample tables
+    and mdat are skipped by seeking.
+
+    Returns:
+        Tuple of (format_tags dict, list of stream tag dicts)
+    """
+    format_tags = {}
+    stream_tags = []
+
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+
+        moov = next((b for b in iter_file_boxes(f, 0, file_size) if b[0] == b"moov"), None)
+        if moov is None:
+            raise ValueError("No moov box found")
+
+        _, moov_offset, moov_size, moov_header = moov
+        for box_type, offset, size, header_size in iter_file_boxes(
+                f, moov_offset + moov_header, moov_offset + moov_size):
+            if box_type == b"udta":
+                format_tags.update(_udta_tags(_read_box(f, offset, size)))
+            elif box_type == b"meta":
+                format_tags.update(_meta_tags(_read_box(f, offset, size), 0, size, header_size))
+            elif box_type == b"trak":
+                tags = {}
+                for child_type, child, child_size, _ in iter_file_boxes(f, offset + header_size, offset + size):
+                    if child_type == b"udta":
+                        tags.update(_udta_tags(_read_box(f, child, child_size)))
+                stream_tags.append(tags)
+
+    return format_tags, stream_tags
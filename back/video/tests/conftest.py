@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# The pipeline's packages (canonicalization, capture, ...) are top-level
+# imports rooted at back/video, like in the scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def keyring(tmp_path, monkeypatch):
+    """Throwaway Ed25519 key pair as the process-wide keyring (real keys are never touched)."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    import signing.daemon_client as daemon_client
+    import signing.keyring as keyring_module
+
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    (tmp_path / "private_key.pem").write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    (tmp_path / "public_key.pem").write_bytes(private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ))
+    ring = keyring_module.KeyRing(tmp_path / "private_key.pem", tmp_path / "public_key.pem", trusted_dir=None)
+    monkeypatch.setattr(keyring_module, "_default_keyring", ring)
+    # Sign locally even if a signing daemon happens to be running
+    monkeypatch.setattr(daemon_client, "SIGNING_SOCKET_PATH", str(tmp_path / "no-daemon.sock"))
+    return ring
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from canonicalization.batch import canonicalize_batch
+from canonicalization.pipeline import canonicalize_frame
+from utils.constants import CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST
+
+def _frames(height, width):
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (3, height, width, 3), dtype=np.uint8)
+    ramp = np.linspace(20, 90, width, dtype=np.uint8)
+    dim = np.repeat(np.tile(ramp, (height, 1))[:, :, None], 3, axis=2)
+    flat_black = np.zeros((height, width, 3), dtype=np.uint8)
+    flat_grey = np.full((height, width, 3), 128, dtype=np.uint8)
+    return np.concatenate([noise, dim[None], flat_black[None], flat_grey[None]])
+
+@pytest.mark.parametrize("size", [(256, 256), (480, 640), (721, 1283)])
+@pytest.mark.parametrize("profile", [CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST])
+def test_batch_is_bit_identical_to_per_frame(size, profile):
+    frames = _frames(*size)
+    batch = canonicalize_batch(frames, profile)
+    assert len(batch) == len(frames)
+    for frame, canon in zip(frames, batch):
+        assert canon.tobytes() == canonicalize_frame(frame, profile).tobytes()
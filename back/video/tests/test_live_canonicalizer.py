@@ -0,0 +1,40 @@
+import pytest
+
+from canonicalization.process_video import (
+    LiveCanonicalizer,
+    canonical_params,
+    fit_sampling,
+    iter_canonical_seconds,
+    sample_offsets,
+)
+from capture.camera import capture_video
+from capture.sources import SyntheticSource
+from utils.constants import CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST, LOSSLESS_CAPTURE_FOURCC
+
+@pytest.mark.parametrize("samples_per_second", [None, 5, 30])
+@pytest.mark.parametrize("profile", [CANONICAL_PROFILE_NORMALIZE_FIRST, CANONICAL_PROFILE_RESIZE_FIRST])
+def test_live_seconds_match_redecoded_file(tmp_path, samples_per_second, profile):
+    canonical = canonical_params(samples_per_second, profile)
+    live = LiveCanonicalizer(canonical)
+    path = str(tmp_path / "clip.mp4")
+
+    capture_video(
+        duration_seconds=None,
+        output_path=path,
+        fourcc=LOSSLESS_CAPTURE_FOURCC,
+        frame_sink=live,
+        source=SyntheticSource(320, 240, fps=15, realtime=False, max_frames=15 * 3 + 4)
+    )
+
+    assert live.matches_file(path)
+    # More samples than the 15 fps source has are clamped before signing
+    assert live.canonical == fit_sampling(canonical, 15)
+    decoded = list(iter_canonical_seconds(path, live.canonical))
+    assert len(live.seconds) == len(decoded) == 4
+    for live_second, decoded_second in zip(live.seconds, decoded):
+        assert live_second.tobytes() == decoded_second.tobytes()
+
+def test_sampling_more_frames_than_the_video_has_is_rejected():
+    with pytest.raises(ValueError):
+        sample_offsets(29.97, 30)
+    assert fit_sampling(canonical_params(30, CANONICAL_PROFILE_RESIZE_FIRST), 29.97)["samples_per_second"] == 29
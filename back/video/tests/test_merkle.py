@@ -0,0 +1,50 @@
+import hashlib
+
+import pytest
+
+from hashing.merkle import (
+    LEAF_PREFIX,
+    NODE_PREFIX,
+    changed_leaves,
+    decode_leaves,
+    encode_leaves,
+    leaf_hash,
+    merkle_root,
+    node_hash,
+)
+
+LEAVES = [leaf_hash(bytes([i]) * 16) for i in range(5)]
+
+def test_leaves_and_nodes_are_domain_separated():
+    assert leaf_hash(b"abc") == hashlib.sha256(LEAF_PREFIX + b"abc").digest()
+    assert node_hash(LEAVES[0], LEAVES[1]) == hashlib.sha256(NODE_PREFIX + LEAVES[0] + LEAVES[1]).digest()
+    # A leaf whose content is two concatenated digests is not an inner node
+    assert leaf_hash(LEAVES[0] + LEAVES[1]) != node_hash(LEAVES[0], LEAVES[1])
+
+def test_odd_leaf_is_carried_up_unchanged():
+    a, b, c, d, e = LEAVES
+    assert merkle_root([a]) == a.hex()
+    assert merkle_root([a, b, c]) == node_hash(node_hash(a, b), c).hex()
+    assert merkle_root(LEAVES) == node_hash(node_hash(node_hash(a, b), node_hash(c, d)), e).hex()
+
+def test_root_depends_on_every_leaf_and_its_position():
+    root = merkle_root(LEAVES)
+    assert merkle_root(LEAVES[:4]) != root
+    assert merkle_root(LEAVES + [LEAVES[-1]]) != root
+    assert merkle_root([LEAVES[1], LEAVES[0]] + LEAVES[2:]) != root
+    with pytest.raises(ValueError):
+        merkle_root([])
+
+def test_changed_leaves_names_changed_missing_and_extra_seconds():
+    altered = list(LEAVES)
+    altered[2] = leaf_hash(b"edited")
+    assert changed_leaves(LEAVES, LEAVES) == []
+    assert changed_leaves(LEAVES, altered) == [2]
+    assert changed_leaves(LEAVES, LEAVES[:3]) == [3, 4]
+    assert changed_leaves(LEAVES[:3], LEAVES) == [3, 4]
+    assert changed_leaves(LEAVES[1:3], altered[1:3], offset=1) == [2]
+
+def test_leaf_list_round_trips_and_rejects_partial_digests():
+    assert decode_leaves(encode_leaves(LEAVES)) == LEAVES
+    with pytest.raises(ValueError):
+        decode_leaves(encode_leaves(LEAVES)[:-8])
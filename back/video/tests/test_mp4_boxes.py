@@ -0,0 +1,83 @@
+import os
+
+import cv2
+import pytest
+
+import storage.mp4_boxes as mp4_boxes
+from capture.camera import capture_video
+from capture.sources import SyntheticSource
+from storage.mp4_boxes import _top_level_boxes, read_mp4_tags, write_udta_tags
+
+@pytest.fixture
+def clip(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    capture_video(duration_seconds=None, output_path=path,
+                  source=SyntheticSource(160, 120, fps=10, realtime=False, max_frames=20))
+    return path
+
+def _boxes(path):
+    with open(path, "rb") as f:
+        return _top_level_boxes(f)[0]
+
+def _mdat(path):
+    _, offset, size, _ = next(b for b in _boxes(path) if b[0] == b"mdat")
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return offset, f.read(size)
+
+def _frames(path):
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.grab():
+        count += 1
+    cap.release()
+    return count
+
+def test_tags_round_trip_without_moving_sample_data(clip):
+    mdat = _mdat(clip)
+    write_udta_tags(clip, [("TrueShotHash", "abc"), ("comment", "{\"x\": 1}")])
+
+    format_tags, _ = read_mp4_tags(clip)
+    assert format_tags["TrueShotHash"] == "abc"
+    assert format_tags["comment"] == "{\"x\": 1}"
+    assert _mdat(clip) == mdat
+    assert _frames(clip) == 20
+
+def test_rewrites_replace_tags_and_do_not_grow_the_file(clip):
+    sizes = []
+    for i in range(6):
+        write_udta_tags(clip, [("TrueShotHash", "x" * (i % 2) * 40), ("TrueShotMessage", str(i))])
+        sizes.append(os.path.getsize(clip))
+        assert read_mp4_tags(clip)[0]["TrueShotMessage"] == str(i)
+        assert [b[0] for b in _boxes(clip)].count(b"moov") == 1
+    # Once an old moov has been freed, alternating tag sizes reuse that
+    # space instead of appending again
+    assert sizes[4:] == sizes[2:4]
+    assert _frames(clip) == 20
+
+@pytest.mark.parametrize("crash_at", [1, 2, 3])
+def test_interrupted_write_leaves_a_playable_file(clip, monkeypatch, crash_at):
+    write_udta_tags(clip, [("TrueShotHash", "old")])
+    calls = []
+    sync = mp4_boxes._sync
+
+    def crashing_sync(f):
+        sync(f)
+        calls.append(f)
+        if len(calls) == crash_at:
+            raise OSError("power lost")
+    monkeypatch.setattr(mp4_boxes, "_sync", crashing_sync)
+
+    with pytest.raises(OSError):
+        write_udta_tags(clip, [("TrueShotHash", "new" * 20)])
+
+    assert read_mp4_tags(clip)[0]["TrueShotHash"] in ("old", "new" * 20)
+    assert _frames(clip) == 20
+
+def test_file_without_moov_is_rejected(tmp_path):
+    path = tmp_path / "empty.mp4"
+    path.write_bytes(b"\x00\x00\x00\x08free")
+    with pytest.raises(ValueError):
+        write_udta_tags(str(path), [("TrueShotHash", "abc")])
+    with pytest.raises(ValueError):
+        read_mp4_tags(str(path))
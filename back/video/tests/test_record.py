@@ -0,0 +1,30 @@
+import time
+
+from capture.camera import record
+from capture.sources import SyntheticSource
+
+class SlowWriter:
+    """Video writer stand-in that is slower than the source."""
+
+    def __init__(self):
+        self.frames = 0
+
+    def write(self, frame):
+        time.sleep(0.002)
+        self.frames += 1
+
+    def release(self):
+        pass
+
+def test_offline_sources_never_drop_frames():
+    writer = SlowWriter()
+    source = SyntheticSource(64, 48, fps=30, realtime=False, max_frames=60)
+    stats = record(source, None, queue_size=2, progress=False, video_writer=writer)
+    assert stats["frames_dropped"] == 0
+    assert stats["frames_written"] == writer.frames == 60
+
+def test_dropping_can_be_forced_for_offline_sources():
+    source = SyntheticSource(64, 48, fps=30, realtime=False, max_frames=60)
+    stats = record(source, None, queue_size=2, drop_when_full=True, progress=False, video_writer=SlowWriter())
+    assert stats["frames_dropped"] > 0
+    assert stats["frames_written"] + stats["frames_dropped"] == 60
@@ -0,0 +1,89 @@
+import struct
+
+import pytest
+
+from capture.sources import SyntheticSource
+from capture.stream import record_stream
+from verify.verify_stream import iter_verify_fragments, verify_fragmented_video
+
+FRAGMENTS = 4
+
+def _record(path):
+    record_stream(
+        SyntheticSource(160, 120, fps=10, realtime=False, max_frames=10 * FRAGMENTS),
+        str(path), fragment_seconds=1, progress=False
+    )
+    return _split(path.read_bytes())
+
+def _split(data):
+    """(init bytes, [fragment bytes (moof + mdat + signature)], end record bytes)."""
+    boxes = []
+    pos = 0
+    while pos < len(data):
+        size, box_type = struct.unpack(">I4s", data[pos:pos + 8])
+        boxes.append((box_type, data[pos:pos + size]))
+        pos += size
+
+    init = b"".join(box for box_type, box in boxes[:2])
+    assert [box_type for box_type, _ in boxes[:2]] == [b"ftyp", b"moov"]
+    fragments = [b"".join(box for _, box in boxes[i:i + 3]) for i in range(2, len(boxes) - 1, 3)]
+    return init, fragments, boxes[-1][1]
+
+@pytest.fixture
+def recording(tmp_path, keyring):
+    return _record(tmp_path / "stream.mp4")
+
+def _verify(tmp_path, *parts):
+    path = tmp_path / "check.mp4"
+    path.write_bytes(b"".join(parts))
+    return verify_fragmented_video(str(path))
+
+def test_signed_stream_verifies_fragment_by_fragment(tmp_path, recording):
+    init, fragments, end = recording
+    assert len(fragments) == FRAGMENTS
+    assert _verify(tmp_path, init, *fragments, end) == (True, f"All {FRAGMENTS} fragments are authentic")
+
+    with open(tmp_path / "check.mp4", "rb") as f:
+        results = list(iter_verify_fragments(f))
+    assert [r["sequence"] for r in results] == list(range(FRAGMENTS)) + [None]
+    assert all(r["valid"] for r in results)
+
+def test_reordered_fragments_are_rejected(tmp_path, recording):
+    init, fragments, end = recording
+    fragments[1], fragments[2] = fragments[2], fragments[1]
+    valid, reason = _verify(tmp_path, init, *fragments, end)
+    assert not valid
+    assert reason.startswith("Fragment does not follow the previous one")
+
+def test_dropped_fragment_is_rejected(tmp_path, recording):
+    init, fragments, end = recording
+    valid, reason = _verify(tmp_path, init, *fragments[:1], *fragments[2:], end)
+    assert not valid
+    assert reason.startswith("Fragment does not follow the previous one")
+
+def test_fragment_spliced_from_another_recording_is_rejected(tmp_path, recording):
+    init, fragments, end = recording
+    _, other_fragments, _ = _record(tmp_path / "other.mp4")
+    fragments[1] = other_fragments[1]
+    valid, reason = _verify(tmp_path, init, *fragments, end)
+    assert not valid
+    assert reason.startswith("Fragment belongs to another recording")
+
+def test_data_after_the_end_record_is_rejected(tmp_path, recording):
+    init, fragments, end = recording
+    valid, reason = _verify(tmp_path, init, *fragments, end, fragments[-1])
+    assert not valid
+    assert reason.startswith("Unsigned moof box after the end record")
+
+def test_truncated_and_tampered_streams_are_rejected(tmp_path, recording):
+    init, fragments, end = recording
+    valid, reason = _verify(tmp_path, init, *fragments)
+    assert not valid
+    assert reason.startswith("No signed end record")
+
+    tampered = bytearray(fragments[2])
+    mdat = tampered.index(b"mdat") + 20
+    tampered[mdat] ^= 1
+    valid, reason = _verify(tmp_path, init, *fragments[:2], bytes(tampered), *fragments[3:], end)
+    assert not valid
+    assert reason == "Video content mismatch (after 2 authentic fragments)"
@@ -0,0 +1,75 @@
+import pytest
+
+from canonicalization.process_video import canonical_params, iter_canonical_seconds
+from capture.camera import capture_video
+from capture.sources import SyntheticSource
+from hashing.combine import create_message
+from hashing.crypto_hash import sha256_hash_chunks
+from hashing.merkle import encode_leaves, leaf_hash, merkle_params, merkle_root
+from signing.sign import sign_message
+from storage.metadata_embed import embed_metadata
+from utils.constants import CANONICAL_PROFILE, LOSSLESS_CAPTURE_FOURCC
+from verify.signature_only import verify_embedded_signature
+from verify.verify_video import verify_video, verify_video_range
+
+CANONICAL = canonical_params(5, CANONICAL_PROFILE)
+
+def _record(path, seconds):
+    capture_video(
+        duration_seconds=None,
+        output_path=path,
+        fourcc=LOSSLESS_CAPTURE_FOURCC,
+        source=SyntheticSource(320, 240, fps=10, realtime=False, max_frames=10 * seconds)
+    )
+    return path
+
+def _hash(path, merkle):
+    seconds = iter_canonical_seconds(path, CANONICAL)
+    if merkle:
+        leaves = [leaf_hash(second) for second in seconds]
+        return merkle_root(leaves), merkle_params(len(leaves)), encode_leaves(leaves)
+    return sha256_hash_chunks(seconds), None, None
+
+def _sign(path, merkle):
+    hash_val, hash_format, leaves = _hash(path, merkle)
+    message = create_message(hash_val, {"timestamp": 0}, CANONICAL, hash_format=hash_format)
+    return message, sign_message(message), leaves
+
+@pytest.mark.parametrize("merkle", [False, True])
+def test_signed_capture_verifies(tmp_path, keyring, merkle):
+    path = _record(str(tmp_path / "clip.mp4"), 2)
+    message, signature, leaves = _sign(path, merkle)
+    embed_metadata(path, _hash(path, merkle)[0], signature, message, leaves=leaves)
+
+    assert verify_video(path) == (True, "Video is authentic")
+    assert verify_embedded_signature(path)[0]
+
+@pytest.mark.parametrize("merkle", [False, True])
+def test_embedded_hash_must_match_the_signed_message(tmp_path, keyring, merkle):
+    # A genuine message and signature copied onto another clip, with the
+    # unsigned TrueShotHash field (and leaves) set to that clip's content
+    message, signature, _ = _sign(_record(str(tmp_path / "signed.mp4"), 2), merkle)
+    path = _record(str(tmp_path / "other.mp4"), 3)
+    other_hash, _, other_leaves = _hash(path, merkle)
+    embed_metadata(path, other_hash, signature, message, leaves=other_leaves)
+
+    valid, reason = verify_video(path)
+    assert not valid
+    assert reason == "Embedded hash does not match the signed message"
+    assert not verify_embedded_signature(path)[0]
+    if merkle:
+        assert not verify_video_range(path, 0, 1)[0]
+
+def test_missing_or_malformed_signature_file_is_a_reason(tmp_path):
+    path = _record(str(tmp_path / "clip.mp4"), 1)
+    missing = str(tmp_path / "missing.json")
+    assert verify_video(path, missing) == (
+        False, f"No metadata found in video and signature file not found: {missing}"
+    )
+
+    malformed = tmp_path / "malformed.json"
+    malformed.write_text('{"message": "e30="}')
+    valid, reason = verify_video(path, str(malformed))
+    assert not valid
+    assert reason.startswith("Error reading signature file:")
+    assert verify_embedded_signature(path, str(malformed))[0] is False
@@ -6,6 +6,71 @@ VIDEO_ROOT = Path(__file__).resolve().parents[1]
 PRIVATE_KEY_PATH = VIDEO_ROOT / "private_key.pem"
 PUBLIC_KEY_PATH = VIDEO_ROOT / "public_key.pem"
 
+# Extra trusted public keys (one *.pem per signing device), indexed by key id
+TRUSTED_KEYS_DIR = VIDEO_ROOT / "trusted_keys"
+
 # Video capture settings
 VIDEO_DURATION_SECONDS = 5
+CAPTURE_FOURCC = "mp4v"
+
+# Live capture (main_capture_stream.py): fragmented MP4 with one signed
+# fragment per STREAM_FRAGMENT_SECONDS, encoded by ffmpeg with this encoder
+STREAM_FRAGMENT_SECONDS = 2
+STREAM_CODEC = "mpeg4"
+
+# Canonicalize frames while they are recorded instead of re-decoding the file.
+# mp4v is lossy, so decoded pixels differ from the captured ones and the live
+# hash would not verify; this mode therefore records with a lossless codec.
+CANONICALIZE_DURING_CAPTURE = False
+LOSSLESS_CAPTURE_FOURCC = "FFV1"
 CANONICAL_FRAME_SIZE = (256, 256)
+
+# Canonicalization versions recorded in the signed message
+# 1: average every frame of each second (legacy; no "canonical" field unless a profile is set)
+# 2: average only FRAME_SAMPLES_PER_SECOND evenly spaced frames of each second
+CANONICAL_VERSION_FULL = 1
+CANONICAL_VERSION_SAMPLED = 2
+
+# Frames averaged per second at capture time (None keeps the full-average version)
+FRAME_SAMPLES_PER_SECOND = None
+
+# Sign a Merkle root over per-second hashes instead of one SHA-256 of the
+# whole clip (enables range verification and tamper localization)
+MERKLE_HASHING = False
+
+# Canonical profiles (order of the canonicalization steps), recorded in the
+# signed message under "canonical"; messages without one use normalize-first
+# normalize-first: brightness normalize at full resolution, then resize (legacy)
+# resize-first: resize to 256x256, then a fused luminance stretch on the small image
+CANONICAL_PROFILE_NORMALIZE_FIRST = "normalize-first"
+CANONICAL_PROFILE_RESIZE_FIRST = "resize-first"
+
+# ffmpeg-area-v1: ffmpeg decodes and scales every frame to 256x256 (area
+# filter, canonicalization/ffmpeg_source.py), then the resize-first luminance
+# stretch; verification needs ffmpeg and skips full-resolution frames entirely
+CANONICAL_PROFILE_DECODER_SCALE = "ffmpeg-area-v1"
+
+# Profile used for new captures
+CANONICAL_PROFILE = CANONICAL_PROFILE_RESIZE_FIRST
+
+# ffmpeg used by the ffmpeg-area-v1 profile (None: ffmpeg on PATH, then the
+# imageio-ffmpeg binary if installed) and its decoder threads (0 = automatic)
+FFMPEG_BINARY = None
+FFMPEG_DECODE_THREADS = 0
+
+# Persistent cache of verification results (see verify/cache.py)
+VERIFY_CACHE_PATH = VIDEO_ROOT / "storage" / "verify_cache.sqlite3"
+VERIFY_CACHE_MAX_ENTRIES = 10000
+
+# Unix socket of the signing daemon (main_signing_daemon.py); while it
+# exists, sign_message asks the daemon instead of loading the key locally
+SIGNING_SOCKET_PATH = VIDEO_ROOT / "signing.sock"
+
+# Perceptual-hash index of signed originals (see storage/phash_index.py);
+# copies within PHASH_MATCH_RADIUS differing bits (of 64) count as matches
+PHASH_INDEX_PATH = VIDEO_ROOT / "storage" / "phash_index.sqlite3"
+PHASH_MATCH_RADIUS = 10
+
+# Registry of signed messages, indexed by canonical hash, key id and time
+# (see storage/signature_store.py); replaces per-capture signature.json files
+SIGNATURE_REGISTRY_PATH = VIDEO_ROOT / "storage" / "signatures.sqlite3"
@@ -0,0 +1,209 @@
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+# Off unless enabled, so instrumented code only pays for a flag check.
+# TRUESHOT_METRICS=1 enables timers/counters, TRUESHOT_METRICS_MEMORY=1 also
+# tracks peak memory per stage, TRUESHOT_METRICS_LOG=1 logs every stage.
+ENABLED = os.environ.get("TRUESHOT_METRICS") == "1"
+TRACK_MEMORY = os.environ.get("TRUESHOT_METRICS_MEMORY") == "1"
+LOG_STAGES = os.environ.get("TRUESHOT_METRICS_LOG") == "1"
+
+logger = logging.getLogger("trueshot.metrics")
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_labels = contextvars.ContextVar("trueshot_metric_labels", default=())
+_memory_stack = contextvars.ContextVar("trueshot_metric_memory", default=())
+_NOOP = contextlib.nullcontext()
+
+def enable(memory=False, log=False):
+    """
+    Turn instrumentation on.
+
+    Args:
+        memory: Track peak Python/numpy memory per stage (tracemalloc; slower)
+        log: Emit one structured (JSON) log record per finished stage
+    """
+    global ENABLED, TRACK_MEMORY, LOG_STAGES
+    ENABLED, TRACK_MEMORY, LOG_STAGES = True, memory, log
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+def size_bucket(path):
+    """Coarse file size label so latency can be broken down by size."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return "unknown"
+    for limit, label in ((1 << 20, "<1MB"), (10 << 20, "1-10MB"), (100 << 20, "10-100MB")):
+        if size < limit:
+            return label
+    return ">100MB"
+
+def file_type(path):
+    return os.path.splitext(str(path))[1].lstrip(".").lower() or "unknown"
+
+@contextlib.contextmanager
+def _labelled(labels):
+    token = _labels.set(tuple(sorted(dict(_labels.get(), **labels).items())))
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+def labels(**labels):
+    """Attach labels (e.g. file_type, size) to every stage inside the block."""
+    if not ENABLED:
+        return _NOOP
+    return _labelled({k: str(v) for k, v in labels.items()})
+
+def file_labels(path):
+    """labels() with the file type and size bucket of path (not even stat'ed when disabled)."""
+    if not ENABLED:
+        return _NOOP
+    return _labelled({"file_type": file_type(path), "size": size_bucket(path)})
+
+@contextlib.contextmanager
+def _timed_stage(name):
+    key = (name, _labels.get())
+    memory = TRACK_MEMORY and tracemalloc.is_tracing()
+    if memory:
+        # Nested stages reset the peak, so each frame keeps the highest
+        # absolute peak seen so far and passes it up on exit
+        current, peak = tracemalloc.get_traced_memory()
+        stack = _memory_stack.get()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]
+        token = _memory_stack.set(stack + (frame,))
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        peak_bytes = None
+        if memory:
+            _memory_stack.reset(token)
+            absolute_peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+            peak_bytes = absolute_peak - frame[0]
+            stack = _memory_stack.get()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], absolute_peak)
+
+        with _lock:
+            entry = _stages.get(key)
+            if entry is None:
+                entry = _stages[key] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "peak_bytes": 0}
+            entry["count"] += 1
+            entry["seconds"] += elapsed
+            entry["max_seconds"] = max(entry["max_seconds"], elapsed)
+            if peak_bytes is not None:
+                entry["peak_bytes"] = max(entry["peak_bytes"], peak_bytes)
+
+        if LOG_STAGES:
+            record = {"stage": name, "seconds": round(elapsed, 6), **dict(key[1])}
+            if peak_bytes is not None:
+                record["peak_bytes"] = peak_bytes
+            logger.info(json.dumps(record, sort_keys=True))
+
+def stage(name):
+    """Context manager timing one pipeline stage (a no-op when disabled)."""
+    if not ENABLED:
+        return _NOOP
+    return _timed_stage(name)
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _timed_stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name, value=1):
+    """Add to a counter (e.g. frames_decoded), labelled like the current stage."""
+    if not ENABLED:
+        return
+    key = (name, _labels.get())
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def snapshot():
+    """
+    Current metrics as plain data.
+
+    Returns:
+        Dict with "stages" and "counters" lists; each item has a name,
+        its labels and the values
+    """
+    with _lock:
+        stages = [
+            {"stage": name, "labels": dict(labels), **values}
+            for (name, labels), values in sorted(_stages.items())
+        ]
+        counters = [
+            {"counter": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+    return {"stages": stages, "counters": counters}
+
+def _prometheus_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for k, v in sorted(labels.items())
+    )
+    return "{" + ",".join(escaped) + "}"
+
+def prometheus_text(prefix="trueshot"):
+    """Metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    series = {
+        "stage_calls_total": ("counter", "Finished calls per stage", "count"),
+        "stage_seconds_total": ("counter", "Total seconds spent per stage", "seconds"),
+        "stage_seconds_max": ("gauge", "Slowest single call per stage", "max_seconds"),
+        "stage_peak_memory_bytes": ("gauge", "Peak traced memory during the stage", "peak_bytes"),
+    }
+    if not any(item["peak_bytes"] for item in data["stages"]):
+        del series["stage_peak_memory_bytes"]  # memory tracking was off
+    lines = []
+    for metric, (kind, help_text, field) in series.items():
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for item in data["stages"]:
+            labels = dict(item["labels"], stage=item["stage"])
+            lines.append(f"{prefix}_{metric}{_prometheus_labels(labels)} {item[field]}")
+
+    for name in sorted({item["counter"] for item in data["counters"]}):
+        lines.append(f"# TYPE {prefix}_{name}_total counter")
+        for item in data["counters"]:
+            if item["counter"] == name:
+                lines.append(f"{prefix}_{name}_total{_prometheus_labels(item['labels'])} {item['value']}")
+    return "\n".join(lines) + "\n"
+
+if TRACK_MEMORY and ENABLED:
+    tracemalloc.start()
@@ -0,0 +1,95 @@
+import os
+
+from canonicalization.process_video import canonical_params, fit_sampling, iter_canonical_seconds, open_video
+from hashing.perceptual import perceptual_hash
+from storage.phash_index import get_index
+from utils.constants import CANONICAL_PROFILE, FRAME_SAMPLES_PER_SECOND, PHASH_MATCH_RADIUS
+from verify.verify_video import verify_video
+
+def video_perceptual_hashes(video_path, canonical=None):
+    """
+    Perceptual hash of every canonical second of any video (signed or not).
+
+    Args:
+        video_path: Path to video file
+        canonical: Canonicalization parameters (defaults to those of new captures)
+
+    Returns:
+        List of 64-bit ints, one per second
+    """
+    if canonical is None:
+        cap, fps = open_video(video_path)
+        cap.release()
+        canonical = fit_sampling(canonical_params(FRAME_SAMPLES_PER_SECOND, CANONICAL_PROFILE), fps)
+    return [perceptual_hash(second) for second in iter_canonical_seconds(video_path, canonical)]
+
+def find_originals(video_path, radius=PHASH_MATCH_RADIUS, index=None):
+    """
+    Find signed originals that a video is a (possibly re-encoded, trimmed
+    or edited) copy of. Every second is looked up on its own and the hits
+    are grouped by original.
+
+    Args:
+        video_path: Video to trace; it does not need to carry a payload
+        radius: Maximum Hamming distance between per-second perceptual hashes
+        index: PerceptualIndex (defaults to the pipeline's index)
+
+    Returns:
+        List of dicts (canonical_hash, source, matched_seconds, query_seconds,
+        mean_distance), most matched seconds first
+    """
+    index = index or get_index()
+    phashes = video_perceptual_hashes(video_path)
+
+    originals = {}
+    for query_second, phash in enumerate(phashes):
+        best = {}
+        for match in index.search(phash, radius):
+            # Count each original at most once per query second
+            previous = best.get(match["canonical_hash"])
+            if previous is None or match["distance"] < previous["distance"]:
+                best[match["canonical_hash"]] = match
+        for canonical_hash, match in best.items():
+            entry = originals.setdefault(canonical_hash, {
+                "canonical_hash": canonical_hash,
+                "source": match["source"],
+                "matched_seconds": 0,
+                "query_seconds": len(phashes),
+                "total_distance": 0,
+            })
+            entry["matched_seconds"] += 1
+            entry["total_distance"] += match["distance"]
+
+    results = []
+    for entry in originals.values():
+        entry["mean_distance"] = entry.pop("total_distance") / entry["matched_seconds"]
+        results.append(entry)
+    return sorted(results, key=lambda e: (-e["matched_seconds"], e["mean_distance"], e["canonical_hash"]))
+
+def register_signed_video(video_path, index=None, workers=None):
+    """
+    Add an existing signed video to the perceptual index, after checking
+    that it verifies. The per-second hashes are computed during the same
+    decode as verification.
+
+    Returns:
+        Tuple of (registered: bool, reason: str)
+    """
+    phashes = []
+    details = {}
+    valid, reason = verify_video(
+        video_path, workers=workers, details=details,
+        on_second=lambda second: phashes.append(perceptual_hash(second))
+    )
+    if not valid:
+        return False, reason
+    if not phashes:
+        # Verified through the signature registry, which skips on_second
+        phashes = video_perceptual_hashes(video_path)
+
+    # Merkle-hashed videos are indexed under their signed root
+    source = os.path.abspath(video_path)
+    (index or get_index()).add_many(
+        (phash, details["canonical_hash"], source, second) for second, phash in enumerate(phashes)
+    )
+    return True, "Registered"
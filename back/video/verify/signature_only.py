@@ -0,0 +1,95 @@
+import json
+import os
+
+from signing.verify import verify_signature
+from storage.metadata_embed import extract_metadata
+from storage.signature_store import load_signature_file
+from utils import metrics
+
+# Imports nothing that decodes frames (no OpenCV or numpy), so short-lived
+# processes can run this check cheaply
+
+def load_signed_payload(video_path, signature_path=None, details=None):
+    """
+    Find the signed message for a video (embedded metadata or signature file).
+
+    Args:
+        video_path: Path to video file
+        signature_path: Optional path to signature JSON file
+        details: Optional dict that receives where the payload came from
+            under "payload" (embedded or file)
+
+    Returns:
+        Tuple of (stored_hash, signature, stored_message), or a failure reason string
+    """
+    details = {} if details is None else details
+
+    # Try to extract metadata from video
+    metadata_result = extract_metadata(video_path)
+
+    if metadata_result:
+        # Metadata found in video
+        details["payload"] = "embedded"
+        return metadata_result
+    elif signature_path:
+        # Fallback to separate signature file (backward compatibility)
+        if not os.path.exists(signature_path):
+            return f"No metadata found in video and signature file not found: {signature_path}"
+        try:
+            stored_message, signature = load_signature_file(signature_path)
+            # Extract hash from message
+            stored_hash = json.loads(stored_message.decode())["hash"]
+        except Exception as e:
+            return f"Error reading signature file: {e}"
+        details["payload"] = "file"
+        return stored_hash, signature, stored_message
+
+    return "No metadata found in video and no signature file provided"
+
+def parse_signed_payload(stored_hash, stored_message):
+    """
+    Parse a verified signed message and check the embedded hash against it.
+
+    Only the message is covered by the signature; the hash stored next to
+    it is not, so it is never trusted on its own.
+
+    Args:
+        stored_hash: Hash read alongside the message
+        stored_message: Signed message bytes (signature already checked)
+
+    Returns:
+        Signed payload dict, or a failure reason string
+    """
+    try:
+        signed_payload = json.loads(stored_message.decode())
+        signed_hash = signed_payload["hash"]
+    except (ValueError, KeyError, TypeError):
+        return "Signed message is malformed"
+    if stored_hash != signed_hash:
+        return "Embedded hash does not match the signed message"
+    return signed_payload
+
+def verify_embedded_signature(video_path, signature_path=None):
+    """
+    Check that a video carries a TrueShot payload with a valid signature,
+    without decoding frames. Does not prove the frames match the signed hash.
+    Only the MP4 box headers are read, so files without a payload are
+    rejected without touching the sample data.
+
+    Returns:
+        Tuple of (is_valid: bool, reason: str)
+    """
+    with metrics.file_labels(video_path), metrics.stage("verify_signature_only"):
+        loaded = load_signed_payload(video_path, signature_path)
+        if isinstance(loaded, str):
+            return False, loaded
+        stored_hash, signature, stored_message = loaded
+
+        if not verify_signature(stored_message, signature):
+            return False, "Invalid signature (forged or wrong key)"
+
+        signed_payload = parse_signed_payload(stored_hash, stored_message)
+        if isinstance(signed_payload, str):
+            return False, signed_payload
+
+        return True, "Embedded signature is valid"
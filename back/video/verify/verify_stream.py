@@ -0,0 +1,148 @@
+import hashlib
+import json
+
+from hashing.fragment_chain import CHAIN_END_FORMAT, FRAGMENT_CHAIN_FORMAT, chain_link
+from signing.verify import verify_signature
+from storage.fragmented_mp4 import DROPPED_BOXES, INIT_BOXES, parse_signature_box, read_box
+
+def iter_verify_fragments(f, follow=False, idle_timeout=10.0):
+    """
+    Verify a signed fragmented MP4 box by box, as it arrives.
+
+    Each fragment is reported as soon as its signature box has been read,
+    so a recording can be checked while it is still being written (or
+    received). Checking stops at the first broken link; nothing after it
+    can be trusted.
+
+    Args:
+        f: Binary file object (file, pipe or socket file) at the start of the stream
+        follow: Wait for more data at EOF (file still being recorded)
+        idle_timeout: With follow, give up after this many seconds without data
+
+    Yields:
+        Dicts with sequence, valid, reason and, when valid, timestamp
+        (capture time the fragment was signed). The last item has
+        sequence None and summarizes the stream: valid only if every
+        fragment verified and the signed end record was found, with
+        nothing but dropped boxes after it
+    """
+    init = hashlib.sha256()
+    fragment = None
+    previous = None
+    stream_id = None
+    sequence = 0
+
+    def fail(reason):
+        return {"sequence": sequence, "valid": False, "reason": reason}
+
+    def summary(valid, reason):
+        return {"sequence": None, "valid": valid, "reason": reason, "fragments": sequence}
+
+    while True:
+        try:
+            box = read_box(f, follow=follow, idle_timeout=idle_timeout)
+        except ValueError as e:
+            yield fail(str(e))
+            yield summary(False, f"{e} (after {sequence} authentic fragments)")
+            return
+        if box is None:
+            break
+        box_type, data = box
+        if box_type in DROPPED_BOXES:
+            continue
+
+        try:
+            signed = parse_signature_box(data) if box_type == b"uuid" else None
+        except (ValueError, KeyError, TypeError):
+            reason = "Malformed signature record"
+            yield fail(reason)
+            yield summary(False, f"{reason} (after {sequence} authentic fragments)")
+            return
+        if signed is None:
+            if fragment is None and previous is None and box_type in INIT_BOXES:
+                init.update(data)
+                continue
+            if previous is None:
+                previous = init.hexdigest()
+            if fragment is None:
+                fragment = hashlib.sha256()
+            fragment.update(data)
+            continue
+
+        message, signature = signed
+        if not verify_signature(message, signature):
+            reason = "Invalid signature (forged or wrong key)"
+            yield fail(reason)
+            yield summary(False, f"{reason} (after {sequence} authentic fragments)")
+            return
+        payload = json.loads(message.decode())
+        hash_format = payload.get("hash_format") or {}
+        stream_id = stream_id or hash_format.get("stream")
+
+        if hash_format.get("stream") != stream_id:
+            reason = "Fragment belongs to another recording"
+        elif hash_format.get("previous") != (previous or init.hexdigest()):
+            reason = "Fragment does not follow the previous one (dropped, reordered or inserted)"
+        elif hash_format.get("type") == CHAIN_END_FORMAT:
+            if fragment is not None:
+                reason = "Unsigned data before the end record"
+            elif hash_format.get("fragments") != sequence:
+                reason = "End record does not match the fragment count"
+            else:
+                # The end record must end the file: anything after it
+                # (e.g. appended fragments) would play but is not signed
+                reason = _check_trailing(f)
+                if reason is None:
+                    yield summary(True, f"All {sequence} fragments are authentic")
+                    return
+                yield summary(False, f"{reason} (after {sequence} authentic fragments)")
+                return
+        elif hash_format.get("type") != FRAGMENT_CHAIN_FORMAT:
+            reason = f"Unsupported hash format: {hash_format.get('type')}"
+        elif hash_format.get("sequence") != sequence:
+            reason = "Fragment sequence number out of order"
+        elif fragment is None or payload["hash"] != fragment.hexdigest():
+            reason = "Video content mismatch"
+        else:
+            yield {
+                "sequence": sequence,
+                "valid": True,
+                "reason": "Fragment is authentic",
+                "timestamp": payload.get("metadata", {}).get("timestamp")
+            }
+            previous = chain_link(message)
+            fragment = None
+            sequence += 1
+            continue
+
+        yield fail(reason)
+        yield summary(False, f"{reason} (after {sequence} authentic fragments)")
+        return
+
+    if fragment is not None:
+        yield fail("Fragment has no signature")
+    yield summary(False, f"No signed end record after {sequence} authentic fragments (recording interrupted or still in progress)")
+
+def _check_trailing(f):
+    """Return a failure reason if anything but dropped boxes follows the end record."""
+    while True:
+        try:
+            box = read_box(f)
+        except ValueError as e:
+            return str(e)
+        if box is None:
+            return None
+        if box[0] not in DROPPED_BOXES:
+            return f"Unsigned {box[0].decode('latin-1')} box after the end record"
+
+def verify_fragmented_video(video_path, follow=False):
+    """
+    Verify a complete signed fragmented MP4.
+
+    Returns:
+        Tuple of (is_valid: bool, reason: str)
+    """
+    with open(video_path, "rb") as f:
+        for result in iter_verify_fragments(f, follow=follow):
+            if result["sequence"] is None:
+                return result["valid"], result["reason"]
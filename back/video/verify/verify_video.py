@@ -1,55 +1,240 @@
-import base64
+import hashlib
 import json
 
-from canonicalization.process_video import process_video_file
-from hashing.crypto_hash import sha256_hash
+from canonicalization.parallel import iter_canonical_seconds_parallel
+from canonicalization.process_video import (
+    canonical_params,
+    decoder_mismatch,
+    fit_sampling,
+    iter_canonical_seconds,
+    open_video,
+)
+from hashing.crypto_hash import sha256_hash_chunks
+from hashing.merkle import MERKLE_HASH_FORMAT, changed_leaves, decode_leaves, leaf_hash, merkle_root
 from signing.verify import verify_signature
-from storage.metadata_embed import extract_metadata
+from storage.metadata_embed import extract_leaves
+from storage.signature_store import get_registry, registry_exists
+from utils import metrics
+from utils.constants import CANONICAL_PROFILE, FRAME_SAMPLES_PER_SECOND
+from verify.signature_only import (  # noqa: F401 (verify_embedded_signature is re-exported)
+    load_signed_payload,
+    parse_signed_payload,
+    verify_embedded_signature,
+)
 
-def verify_video(video_path, signature_path=None):
+def _iter_seconds(video_path, canonical, workers=None, on_second=None):
+    if workers and workers > 1:
+        seconds = iter_canonical_seconds_parallel(video_path, canonical, workers)
+    else:
+        seconds = iter_canonical_seconds(video_path, canonical)
+    if on_second is None:
+        return seconds
+    return _tap(seconds, on_second)
+
+def _tap(seconds, on_second):
+    for second in seconds:
+        on_second(second)
+        yield second
+
+def _trusted_leaves(video_path, signed_payload):
+    """
+    Embedded per-second leaves, if they reproduce the signed Merkle root.
+
+    The leaf list itself is not signed; it is only trusted when its root
+    and count match the signed message.
+
+    Returns:
+        List of leaf digests, or None if missing or not matching
+    """
+    encoded = extract_leaves(video_path)
+    if not encoded:
+        return None
+    try:
+        leaves = decode_leaves(encoded)
+    except ValueError:
+        return None
+
+    hash_format = signed_payload["hash_format"]
+    if len(leaves) != hash_format.get("leaves") or merkle_root(leaves) != signed_payload["hash"]:
+        return None
+    return leaves
+
+def _mismatch_reason(changed, canonical=None):
+    if changed is None:
+        reason = "Video content mismatch"
+    else:
+        reason = "Video content mismatch at seconds " + ", ".join(str(s) for s in changed)
+    note = decoder_mismatch(canonical)
+    return f"{reason} ({note})" if note else reason
+
+def verify_video(video_path, signature_path=None, workers=None, details=None, on_second=None):
     """
     Verify video authenticity by extracting metadata from video itself.
-    If signature_path is provided, it will be used as fallback.
-    
+    If signature_path is provided, it will be used as fallback; otherwise
+    videos without metadata are looked up in the signature registry.
+    For Merkle-hashed videos a mismatch names the seconds that changed.
+
     Args:
         video_path: Path to video file to verify
         signature_path: Optional path to signature JSON file (for backward compatibility)
-        
+        workers: Decode second-aligned segments in this many processes
+            (None or 1 decodes serially; the result is identical either way)
+        details: Optional dict that receives the recomputed canonical_hash
+            (only set once the video was decoded and hashed) and the payload
+            source under "payload" (embedded, file or registry); on a content
+            mismatch, "decoder_mismatch" holds the decoder note (or None)
+        on_second: Optional callable receiving each canonical second as it
+            is produced (e.g. to compute perceptual hashes in the same pass);
+            not called when the signature comes from the registry
+
     Returns:
         Tuple of (is_valid: bool, reason: str)
     """
-    # Process video: extract frames per second, canonicalize, combine
-    combined_matrix = process_video_file(video_path)
-    
-    # Compute hash from combined matrix
-    recomputed_hash = sha256_hash(combined_matrix.tobytes())
-
-    # Try to extract metadata from video
-    metadata_result = extract_metadata(video_path)
-    
-    if metadata_result:
-        # Metadata found in video
-        stored_hash, signature, stored_message = metadata_result
-    elif signature_path:
-        # Fallback to separate signature file (backward compatibility)
-        with open(signature_path) as f:
-            data = json.load(f)
-        
-        stored_message = base64.b64decode(data["message"])
-        signature = base64.b64decode(data["signature"])
-        
-        # Extract hash from message
-        signed_payload = json.loads(stored_message.decode())
-        stored_hash = signed_payload["hash"]
-    else:
-        return False, "No metadata found in video and no signature file provided"
+    with metrics.file_labels(video_path), metrics.stage("verify"):
+        return _verify_video(video_path, signature_path, workers, details, on_second)
+
+def _verify_video(video_path, signature_path, workers, details, on_second):
+    details = {} if details is None else details
+    loaded = load_signed_payload(video_path, signature_path, details)
+    if isinstance(loaded, str):
+        if signature_path is None and registry_exists():
+            return _verify_from_registry(video_path, workers, details)
+        return False, loaded
+    stored_hash, signature, stored_message = loaded
 
     # 1️⃣ Verify signature on ORIGINAL message
     if not verify_signature(stored_message, signature):
         return False, "Invalid signature (forged or wrong key)"
 
-    # 2️⃣ Compare hashes
-    if stored_hash != recomputed_hash:
-        return False, "Video content mismatch"
+    signed_payload = parse_signed_payload(stored_hash, stored_message)
+    if isinstance(signed_payload, str):
+        return False, signed_payload
+    signed_hash = signed_payload["hash"]
+    canonical = signed_payload.get("canonical")
+    hash_format = signed_payload.get("hash_format")
+
+    # 2️⃣ Reprocess video with the signed canonicalization parameters,
+    # hashing each canonical second as it is produced
+    try:
+        if hash_format and hash_format.get("type") == MERKLE_HASH_FORMAT:
+            leaves = [leaf_hash(second) for second in _iter_seconds(video_path, canonical, workers, on_second)]
+            recomputed_hash = merkle_root(leaves)
+        elif hash_format:
+            return False, f"Unsupported hash format: {hash_format.get('type')}"
+        else:
+            recomputed_hash = sha256_hash_chunks(_iter_seconds(video_path, canonical, workers, on_second))
+    except ValueError as e:
+        return False, f"Failed to process video: {e}"
+    details["canonical_hash"] = recomputed_hash
+
+    # 3️⃣ Compare hashes
+    if signed_hash != recomputed_hash:
+        details["decoder_mismatch"] = decoder_mismatch(canonical)
+        if hash_format:
+            expected = _trusted_leaves(video_path, signed_payload)
+            if expected is not None:
+                return False, _mismatch_reason(changed_leaves(expected, leaves), canonical)
+        return False, _mismatch_reason(None, canonical)
 
     return True, "Video is authentic"
+
+def _verify_from_registry(video_path, workers, details):
+    """
+    Verify a video without embedded metadata by looking up its recomputed
+    hash in the signature registry.
+
+    The signed canonicalization parameters are unknown, so the video is
+    decoded with those of new captures and, failing a match, with the
+    legacy ones. Each pass yields both the plain SHA-256 and the Merkle
+    root, so either hash format is found.
+    """
+    registry = get_registry()
+    try:
+        cap, fps = open_video(video_path)
+    except ValueError as e:
+        return False, f"Failed to process video: {e}"
+    cap.release()
+    current = fit_sampling(canonical_params(FRAME_SAMPLES_PER_SECOND, CANONICAL_PROFILE), fps)
+    forged = False
+    for canonical in ([current, None] if current is not None else [None]):
+        hasher = hashlib.sha256()
+        leaves = []
+        try:
+            for second in _iter_seconds(video_path, canonical, workers):
+                hasher.update(memoryview(second))
+                leaves.append(leaf_hash(second))
+        except ValueError as e:
+            return False, f"Failed to process video: {e}"
+
+        for recomputed_hash, merkle in ((hasher.hexdigest(), False), (merkle_root(leaves), True)):
+            for stored_message, signature in registry.find(recomputed_hash):
+                signed_payload = json.loads(stored_message.decode())
+                hash_format = signed_payload.get("hash_format")
+                is_merkle = bool(hash_format) and hash_format.get("type") == MERKLE_HASH_FORMAT
+                if signed_payload.get("canonical") != canonical or is_merkle != merkle:
+                    continue
+                if verify_signature(stored_message, signature):
+                    details["payload"] = "registry"
+                    details["canonical_hash"] = recomputed_hash
+                    return True, "Video is authentic"
+                forged = True
+
+    if forged:
+        return False, "Invalid signature (forged or wrong key)"
+    return False, "No metadata found in video and no registered signature matches its content"
+
+def verify_video_range(video_path, start_second=0, end_second=None, signature_path=None):
+    """
+    Verify only seconds [start_second, end_second) of a Merkle-hashed video.
+
+    Only that range is decoded. The embedded per-second leaves are checked
+    against the signed Merkle root, and the recomputed leaves of the range
+    are compared with them.
+
+    Args:
+        video_path: Path to video file to verify
+        start_second: First second to check
+        end_second: Stop before this second (None = to the end)
+        signature_path: Optional path to signature JSON file
+
+    Returns:
+        Tuple of (is_valid: bool, reason: str, changed_seconds: list of int)
+    """
+    loaded = load_signed_payload(video_path, signature_path)
+    if isinstance(loaded, str):
+        return False, loaded, []
+    stored_hash, signature, stored_message = loaded
+
+    if not verify_signature(stored_message, signature):
+        return False, "Invalid signature (forged or wrong key)", []
+
+    signed_payload = parse_signed_payload(stored_hash, stored_message)
+    if isinstance(signed_payload, str):
+        return False, signed_payload, []
+    hash_format = signed_payload.get("hash_format")
+    if not hash_format or hash_format.get("type") != MERKLE_HASH_FORMAT:
+        return False, "Range verification needs a Merkle-hashed video", []
+
+    expected = _trusted_leaves(video_path, signed_payload)
+    if expected is None:
+        return False, "Embedded per-second hashes are missing or do not match the signed root", []
+
+    end_second = len(expected) if end_second is None else min(end_second, len(expected))
+    if not 0 <= start_second < end_second:
+        return False, "Empty or invalid range", []
+
+    try:
+        actual = [
+            leaf_hash(second)
+            for second in iter_canonical_seconds(
+                video_path, signed_payload.get("canonical"), start_second, end_second
+            )
+        ]
+    except ValueError as e:
+        return False, f"Failed to process video: {e}", []
+
+    changed = changed_leaves(expected[start_second:end_second], actual, start_second)
+    if changed:
+        return False, _mismatch_reason(changed, signed_payload.get("canonical")), changed
+
+    return True, f"Seconds {start_second}-{end_second - 1} are authentic", []